@@ -0,0 +1,68 @@
+"""
+Archive codecs: compression speed, ratio and decompression speed of every
+tar codec the registry can use here, at a few levels each, on the same mix
+of compressible text and incompressible binary data as the pack benchmark.
+
+Usage (from the repository root):
+    python -m benchmarks.archive_codecs [--mib 64] [--workers 8]
+"""
+import argparse
+import io
+import os
+import time
+
+from src.services.codec_registry import CODECS
+from src.services.codec_registry import Codec
+
+READ_SIZE: int = 1024 * 1024
+
+
+def make_data(mib: int) -> bytes:
+    line: bytes = b"2026-10-18 12:00:00 INFO request served in 12ms path=/api/v1/items status=200\n"
+    chunks: list[bytes] = []
+    for _ in range(max(1, mib // 4)):
+        chunks.append(line * (3 * 1024 * 1024 // len(line)) + os.urandom(1024 * 1024))
+    return b"".join(chunks)
+
+
+def levels_of(codec: Codec) -> list[int]:
+    # Fastest, default and strongest level, without repeats
+    return sorted({codec.levels.start, codec.default_level, codec.levels.stop - 1})
+
+
+def measure(codec: Codec, level: int, data: bytes, workers: int) -> None:
+    out = io.BytesIO()
+    start: float = time.perf_counter()
+    with codec.writer(out, level, workers) as writer:
+        writer.write(data)
+    compressed: float = time.perf_counter() - start
+    out.seek(0)
+    start = time.perf_counter()
+    with codec.reader(out) as stream:
+        while stream.read(READ_SIZE):
+            pass
+    decompressed: float = time.perf_counter() - start
+    mib: float = len(data) / 1024 / 1024
+    print(
+        f"  {codec.name:<8} level {level:>2}  compress {mib / compressed:8.1f} MiB/s  "
+        f"ratio {writer.bytes_out / len(data):.3f}  decompress {mib / decompressed:8.1f} MiB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mib", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    data: bytes = make_data(args.mib)
+    print(f"{len(data) / 1024 / 1024:.0f} MiB, {args.workers} workers")
+    for codec in CODECS.values():
+        if codec.requires is not None:
+            print(f"  {codec.name:<8} skipped, needs the {codec.requires} module")
+            continue
+        for level in levels_of(codec):
+            measure(codec, level, data, args.workers)
+
+
+if __name__ == "__main__":
+    main()
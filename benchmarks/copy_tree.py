@@ -0,0 +1,70 @@
+"""
+Recursive copy: shutil.copytree against ParallelCopier on a tree of many
+small files and on a tree of a few large files.
+
+Usage (from the repository root):
+    python -m benchmarks.copy_tree [--small-files 20000] [--large-files 4] [--large-mb 256] [--workers 8]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.services.copy_engine import ParallelCopier
+
+
+def make_small_tree(root: Path, files: int) -> None:
+    for i in range(files):
+        directory = root / f"dir{i // 500:04d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"file{i:06d}.txt").write_bytes(os.urandom(2048))
+
+
+def make_large_tree(root: Path, files: int, size_mb: int) -> None:
+    root.mkdir(parents=True)
+    block: bytes = os.urandom(1024 * 1024)
+    for i in range(files):
+        with (root / f"blob{i}.bin").open("wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+
+
+def tree_size(root: Path) -> int:
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+
+
+def measure(name: str, copy: Callable[[Path, Path], object], source: Path, scratch: Path) -> None:
+    dest = scratch / f"{source.name}-{name}"
+    size: int = tree_size(source)
+    start: float = time.perf_counter()
+    copy(source, dest)
+    elapsed: float = time.perf_counter() - start
+    print(f"  {name:<10} {elapsed:7.2f}s  {size / 2**20 / elapsed:8.1f} MiB/s")
+    shutil.rmtree(dest)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small-files", type=int, default=20_000)
+    parser.add_argument("--large-files", type=int, default=4)
+    parser.add_argument("--large-mb", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dir", type=Path, default=None, help="scratch directory on the disk to test")
+    args = parser.parse_args()
+    copier = ParallelCopier(args.workers)
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        scratch = Path(tmp)
+        trees: dict[str, Path] = {"small": scratch / "small", "large": scratch / "large"}
+        make_small_tree(trees["small"], args.small_files)
+        make_large_tree(trees["large"], args.large_files, args.large_mb)
+        for label, source in trees.items():
+            print(f"{label} files:")
+            measure("copytree", shutil.copytree, source, scratch)
+            measure("parallel", lambda source, dest: copier.copy_many([(source, dest)]), source, scratch)
+
+
+if __name__ == "__main__":
+    main()
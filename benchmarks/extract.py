@@ -0,0 +1,67 @@
+"""
+Extraction: shutil.unpack_archive against the parallel extractors, for a
+whole archive and for pulling a single file out of it.
+
+Usage (from the repository root):
+    python -m benchmarks.extract [--files 2000] [--mib 256] [--workers 8]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.services.extract_engine import MemberFilter
+from src.services.extract_engine import extract_tar
+from src.services.extract_engine import extract_zip
+from src.services.pack_engine import pack_tar
+from src.services.pack_engine import pack_zip
+
+
+def make_tree(root: Path, files: int, mib: int) -> None:
+    line: bytes = b"2026-10-18 12:00:00 INFO request served in 12ms path=/api/v1/items status=200\n"
+    size: int = mib * 1024 * 1024 // files
+    for i in range(files):
+        directory = root / f"dir{i // 100:03d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"file{i:05d}.log").write_bytes((line * (size // len(line) + 1))[:size])
+
+
+def measure(name: str, extract: Callable[[Path], object], scratch: Path) -> None:
+    dest: Path = scratch / name
+    dest.mkdir()
+    start: float = time.perf_counter()
+    extract(dest)
+    elapsed: float = time.perf_counter() - start
+    print(f"  {name:<22} {elapsed:7.2f}s")
+    shutil.rmtree(dest)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--mib", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dir", type=Path, default=None, help="scratch directory on the disk to test")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        scratch = Path(tmp)
+        os.chdir(scratch)
+        make_tree(Path("data"), args.files, args.mib)
+        for name, pack in (("data.tar.gz", pack_tar), ("data.zip", pack_zip)):
+            with open(name, "wb") as out:
+                pack(Path("data"), out)
+        one = MemberFilter(["data/dir000/file00000.log"])
+        print(f"{args.files} files, {args.mib} MiB, {args.workers} workers")
+        measure("unpack_archive tar.gz", lambda dest: shutil.unpack_archive("data.tar.gz", dest, filter="data"), scratch)
+        measure("parallel tar.gz", lambda dest: extract_tar(Path("data.tar.gz"), dest, workers=args.workers), scratch)
+        measure("one file tar.gz", lambda dest: extract_tar(Path("data.tar.gz"), dest, one, args.workers), scratch)
+        measure("unpack_archive zip", lambda dest: shutil.unpack_archive("data.zip", dest), scratch)
+        measure("parallel zip", lambda dest: extract_zip(Path("data.zip"), dest, workers=args.workers), scratch)
+        measure("one file zip", lambda dest: extract_zip(Path("data.zip"), dest, one, args.workers), scratch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Peak RSS and throughput of grep's line scanner: the old
+read_text().splitlines() approach against the streaming chunked reader.
+
+Usage (from the repository root):
+    python -m benchmarks.grep_memory [--size-mb 512]
+"""
+import argparse
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.services.grep_engine import scan_file
+from src.services.matcher import compile_matcher
+
+
+def legacy_scan(file: Path, pattern: str) -> int:
+    compiled_pattern: re.Pattern = re.compile(pattern)
+    file_contents: str = file.read_text(encoding="utf-8", errors="ignore")
+    return sum(1 for line in file_contents.splitlines() if compiled_pattern.search(line))
+
+
+def streaming_scan(file: Path, pattern: str) -> int:
+    return sum(1 for _ in scan_file(file, compile_matcher(pattern, False)))
+
+
+def make_log(path: Path, size_mb: int) -> None:
+    line: bytes = b"2024-01-01 12:00:00 [INFO] request served in 12ms from worker-7\n"
+    block: bytes = line * (1024 * 1024 // len(line)) + b"2024-01-01 12:00:01 [ERROR] needle\n"
+    with path.open("wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def run_variant(variant: str, file: Path) -> None:
+    scan = legacy_scan if variant == "legacy" else streaming_scan
+    start: float = time.perf_counter()
+    matches: int = scan(file, "needle")
+    elapsed: float = time.perf_counter() - start
+    peak_rss_mb: float = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    size_mb: float = file.stat().st_size / (1024 * 1024)
+    print(f"{variant:<10} matches={matches:<6} peak_rss={peak_rss_mb:8.1f} MB  "
+          f"throughput={size_mb / elapsed:8.1f} MB/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--variant", choices=["legacy", "streaming"])
+    parser.add_argument("--file", type=Path)
+    args = parser.parse_args()
+    if args.variant:
+        run_variant(args.variant, args.file)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        file = Path(tmp) / "big.log"
+        make_log(file, args.size_mb)
+        for variant in ("legacy", "streaming"):
+            # Each variant runs in a fresh interpreter so ru_maxrss is not shared.
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.grep_memory", "--variant", variant, "--file", str(file)],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+history -s: build time and query latency of the trigram search index on a
+large synthetic history, against a linear scan of the file.
+
+Usage (from the repository root):
+    python -m benchmarks.history_search [--entries 200000]
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.services.history_service import HistoryService
+
+
+WORDS: list[str] = ["ls", "cd", "cp", "mv", "rm", "grep", "tar", "zip", "cat", "git", "make", "python3"]
+QUERIES: list[str] = ["grep -r", "git stat", "projekt", "tar build"]
+
+
+def make_history(path: Path, entries: int) -> None:
+    rng = random.Random(0)
+    with path.open("w") as f:
+        for _ in range(entries):
+            args = " ".join(f"project{rng.randrange(5000)}/{rng.choice(WORDS)}" for _ in range(rng.randrange(1, 4)))
+            f.write(f"{rng.choice(WORDS)} {args}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=200_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / ".history"
+        make_history(path, args.entries)
+        service = HistoryService(path)
+        start: float = time.perf_counter()
+        service.search_ranked("warm up")
+        print(f"index build    {time.perf_counter() - start:8.3f}s  ({args.entries} entries)")
+        for query in QUERIES:
+            start = time.perf_counter()
+            service.search_ranked(query)
+            ranked: float = time.perf_counter() - start
+            start = time.perf_counter()
+            list(service.search(query))
+            scan: float = time.perf_counter() - start
+            print(f"{query!r:<14} ranked {ranked * 1000:7.1f} ms   scan {scan * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
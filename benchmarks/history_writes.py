@@ -0,0 +1,55 @@
+"""
+Concurrent history appends: several processes logging to one history file
+with the old open/append/close per command against HistoryService.
+
+Usage (from the repository root):
+    python -m benchmarks.history_writes [--sessions 8] [--commands 5000] [--flush-every 16]
+"""
+import argparse
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src.services.history_service import HistoryService
+
+
+def reopen_per_command(history_file: Path, session: int, commands: int, flush_every: int) -> None:
+    for i in range(commands):
+        with history_file.open("a", encoding="utf-8") as h:
+            h.write(f"session {session} command {i}\n")
+
+
+def history_service(history_file: Path, session: int, commands: int, flush_every: int) -> None:
+    service = HistoryService(history_file, flush_every=flush_every)
+    for i in range(commands):
+        service.append_command_to_history(f"session {session} command {i}")
+    service.close()
+
+
+def measure(name: str, log, sessions: int, commands: int, flush_every: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        history_file = Path(tmp) / ".history"
+        history_file.touch()
+        start: float = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=sessions) as pool:
+            list(pool.map(log, [history_file] * sessions, range(sessions), [commands] * sessions, [flush_every] * sessions))
+        elapsed: float = time.perf_counter() - start
+        lines: list[str] = history_file.read_text().splitlines()
+        intact: int = sum(1 for line in lines if line.startswith("session ") and " command " in line)
+        print(f"  {name:<22} {elapsed:6.2f}s  {len(lines) / elapsed:9.0f} commands/s  {intact}/{sessions * commands} intact")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--commands", type=int, default=5000)
+    parser.add_argument("--flush-every", type=int, default=16)
+    args = parser.parse_args()
+    measure("open per command", reopen_per_command, args.sessions, args.commands, 1)
+    measure("service, flush each", history_service, args.sessions, args.commands, 1)
+    measure(f"service, batch {args.flush_every}", history_service, args.sessions, args.commands, args.flush_every)
+
+
+if __name__ == "__main__":
+    main()
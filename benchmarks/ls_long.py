@@ -0,0 +1,58 @@
+"""
+ls -l on a large synthetic directory: the old iterdir + os.stat +
+getpwuid/getgrgid per entry against the scandir listing with cached
+owner and group names.
+
+Usage (from the repository root):
+    python -m benchmarks.ls_long [--entries 100000]
+"""
+import argparse
+import logging
+import os
+import stat
+import tempfile
+import time
+from datetime import datetime
+from grp import getgrgid
+from pathlib import Path
+from pwd import getpwuid
+
+from src.services.history_service import HistoryService
+from src.services.linux_console import LinuxConsoleService
+
+
+def legacy_ls_long(path: Path) -> list[str]:
+    directory_contents: list[str] = []
+    for entry in path.iterdir():
+        entry_info: os.stat_result = os.stat(entry.absolute())
+        permissions: str = stat.filemode(entry_info.st_mode)
+        owner: str = getpwuid(entry_info.st_uid).pw_name
+        group: str = getgrgid(entry_info.st_gid).gr_name
+        mod_date: str = datetime.fromtimestamp(entry_info.st_mtime).strftime("%b %d %H:%M")
+        directory_contents.append(
+            f"{permissions} {entry_info.st_nlink} {owner} {group} {entry_info.st_size} {mod_date} {entry.name}\n"
+        )
+    return directory_contents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+    service = LinuxConsoleService(logging.getLogger("bench"), HistoryService())
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for i in range(args.entries):
+            (directory / f"file{i:07d}.txt").touch()
+        for name, run in (
+            ("legacy", lambda: legacy_ls_long(directory)),
+            ("scandir", lambda: service.ls(directory, all_files=True, long_form=True)),
+        ):
+            start: float = time.perf_counter()
+            lines: int = len(run())
+            elapsed: float = time.perf_counter() - start
+            print(f"{name:<8} {lines} entries in {elapsed:.3f}s ({lines / elapsed:,.0f} entries/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Packing: shutil.make_archive against the parallel gztar and zip engines on
+a tree of compressible text and incompressible binary files.
+
+Usage (from the repository root):
+    python -m benchmarks.pack [--mib 256] [--workers 8] [--level 6]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.services.pack_engine import pack_tar
+from src.services.pack_engine import pack_zip
+
+
+def make_tree(root: Path, mib: int) -> int:
+    line: bytes = b"2026-10-18 12:00:00 INFO request served in 12ms path=/api/v1/items status=200\n"
+    total: int = 0
+    for i in range(mib // 4):
+        directory = root / f"dir{i // 16:03d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        # Three quarters text that compresses well, a quarter random that doesn't
+        data: bytes = line * (3 * 1024 * 1024 // len(line)) + os.urandom(1024 * 1024)
+        (directory / f"file{i:04d}.log").write_bytes(data)
+        total += len(data)
+    return total
+
+
+def measure(name: str, pack: Callable[[], Path], size: int) -> None:
+    start: float = time.perf_counter()
+    archive: Path = pack()
+    elapsed: float = time.perf_counter() - start
+    ratio: float = archive.stat().st_size / size
+    print(f"  {name:<16} {elapsed:7.2f}s  {size / elapsed / 1024 / 1024:8.1f} MiB/s  ratio {ratio:.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mib", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--level", type=int, default=6)
+    parser.add_argument("--dir", type=Path, default=None, help="scratch directory on the disk to test")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        scratch = Path(tmp)
+        size: int = make_tree(scratch / "data", args.mib)
+        print(f"{size / 1024 / 1024:.0f} MiB, level {args.level}, {args.workers} workers")
+        os.chdir(scratch)
+
+        def engine(pack, output: str) -> Callable[[], Path]:
+            def run() -> Path:
+                with open(output, "wb") as out:
+                    pack(Path("data"), out, args.level, args.workers)
+                return Path(output)
+            return run
+
+        # make_archive has no level option: gztar is always level 9, zip always zlib's default 6
+        measure("make_archive gz", lambda: Path(shutil.make_archive("base", "gztar", base_dir="data")), size)
+        measure("parallel gztar", engine(pack_tar, "parallel.tar.gz"), size)
+        measure("make_archive zip", lambda: Path(shutil.make_archive("base", "zip", base_dir="data")), size)
+        measure("parallel zip", engine(pack_zip, "parallel.zip"), size)
+
+
+if __name__ == "__main__":
+    main()
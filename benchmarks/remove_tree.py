@@ -0,0 +1,48 @@
+"""
+Recursive delete: shutil.rmtree against ParallelDeleter on a tree of many
+small files.
+
+Usage (from the repository root):
+    python -m benchmarks.remove_tree [--files 50000] [--workers 8]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.services.delete_engine import ParallelDeleter
+
+
+def make_tree(root: Path, files: int) -> int:
+    for i in range(files):
+        directory = root / f"dir{i // 500:04d}" / "obj"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"file{i:06d}.o").touch()
+    return files + 2 * ((files + 499) // 500) + 1
+
+
+def measure(name: str, remove: Callable[[Path], object], scratch: Path, files: int) -> None:
+    root = scratch / name
+    entries: int = make_tree(root, files)
+    start: float = time.perf_counter()
+    remove(root)
+    elapsed: float = time.perf_counter() - start
+    print(f"  {name:<10} {elapsed:7.2f}s  {entries / elapsed:10.0f} entries/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dir", type=Path, default=None, help="scratch directory on the disk to test")
+    args = parser.parse_args()
+    deleter = ParallelDeleter(args.workers)
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        measure("rmtree", shutil.rmtree, Path(tmp), args.files)
+        measure("parallel", deleter.remove_tree, Path(tmp), args.files)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,6 @@ import typer # type: ignore
 from src.enums.file_mode import FileReadMode
 from src.services.init_services import init_services
 
-console_service = init_services()
-
 def register_cat(app):
     @app.command()
     def cat(
@@ -21,6 +19,7 @@ def register_cat(app):
         """
         Cat a file
         """
+        console_service = init_services()
         command: str = "cat"
         if mode:
             command += " -b"
@@ -4,8 +4,6 @@ import typer # type: ignore
 
 from src.services.init_services import init_services
 
-console_service = init_services()
-
 def register_cd(app):
     @app.command()
     def cd(
@@ -16,6 +14,7 @@ def register_cd(app):
         """
         Change the shell working directory
         """
+        console_service = init_services()
         try:
             console_service.cd(path)
         except OSError as e:
@@ -1,29 +1,31 @@
 from typer_shell import make_typer_shell # type: ignore
 
-from src.commands.ls import register_ls
-from src.commands.cd import register_cd
-from src.commands.cat import register_cat
-from src.commands.cp import register_cp
-from src.commands.mv import register_mv
-from src.commands.rm import register_rm
-from src.commands.tar import register_tar
-from src.commands.zip import register_zip
-from src.commands.grep import register_grep
-from src.commands.history import register_history
+from src.commands.lazy import register_lazy
+
+# name, "module:registrar" and help text; a command's module is imported the first time it runs
+COMMANDS: tuple[tuple[str, str, str], ...] = (
+    ("ls", "src.commands.ls:register_ls", "List all files in a directory/directories."),
+    ("cd", "src.commands.cd:register_cd", "Change the shell working directory"),
+    ("cat", "src.commands.cat:register_cat", "Cat a file"),
+    ("cp", "src.commands.cp:register_cp", "Copy SOURCE to DEST, or multiple SOURCE(s) to DIRECTORY."),
+    ("mv", "src.commands.mv:register_mv", "Rename SOURCE to DEST, or move SOURCE to DIRECTORY"),
+    ("rm", "src.commands.rm:register_rm", "Remove the file(s)"),
+    ("tar", "src.commands.tar:register_tar", "Create a compressed tar archive (.tar.gz, .tar.xz, .tar.bz2, .tar.zst, .tar.lz4) from file"),
+    ("untar", "src.commands.tar:register_untar", "Unarchive a compressed tar archive, its format is detected from the content"),
+    ("zip", "src.commands.zip:register_zip", "Create archive .zip from file"),
+    ("unzip", "src.commands.zip:register_unzip", "Unarchive .zip archive"),
+    ("grep", "src.commands.grep:register_grep", "Search for pattern in each file"),
+    ("history", "src.commands.history:register_history", "Display the history list"),
+    ("undo", "src.commands.undo:register_undo", "Undo the last cp, mv or rm, again to go further back"),
+    ("redo", "src.commands.undo:register_redo", "Redo the last undone cp, mv or rm"),
+    ("index", "src.commands.index:register_index", "Manage trigram indexes used by grep"),
+)
 
 def create_app():
     app = make_typer_shell(prompt="$~ ")
 
     # Register all commands
-    app = register_ls(app)
-    app = register_cd(app)
-    app = register_cat(app)
-    app = register_cp(app)
-    app = register_mv(app)
-    app = register_rm(app)
-    app = register_tar(app)
-    app = register_zip(app)
-    app = register_grep(app)
-    app = register_history(app)
+    for name, target, help in COMMANDS:
+        app = register_lazy(app, name, target, help)
 
     return app
@@ -2,16 +2,31 @@ from pathlib import Path
 
 import typer # type: ignore
 
+from src.enums.reflink_mode import ReflinkMode
+from src.services.copy_engine import DEFAULT_COPY_WORKERS
 from src.services.init_services import init_services
 
-console_service = init_services()
-
 def register_cp(app):
     @app.command()
     def cp(
         recursive: bool = typer.Option(
             False, "-r", "--recursive", help="copy directories recursively"
         ),
+        jobs: int = typer.Option(
+            DEFAULT_COPY_WORKERS, "-j", "--jobs", min=1, help="copy files of a directory with N threads"
+        ),
+        resumable: bool = typer.Option(
+            False, "--resumable", help="copy files in checkpointed chunks, resuming an interrupted copy (files only, not directories; ignored with --reflink/--link)"
+        ),
+        verify: bool = typer.Option(
+            False, "--verify", help="check every chunk of a --resumable copy with sha256"
+        ),
+        reflink: ReflinkMode = typer.Option(
+            ReflinkMode.never, "--reflink", help="clone file data with FICLONE: auto falls back to a copy, always fails instead"
+        ),
+        link: bool = typer.Option(
+            False, "-l", "--link", help="hard link files instead of copying, falling back to a copy"
+        ),
         sources: list[Path] = typer.Argument(
             ...
         ),
@@ -22,20 +37,34 @@ def register_cp(app):
         """
         Copy SOURCE to DEST, or multiple SOURCE(s) to DIRECTORY.
         """
+        console_service = init_services()
         command = "cp"
         if recursive:
             command += " -r"
+        if resumable:
+            command += " --resumable"
+        if verify:
+            command += " --verify"
+        if reflink != ReflinkMode.never:
+            command += f" --reflink={reflink.value}"
+        if link:
+            command += " --link"
         for source in sources:
             command += f" {source}"
-            try:
-                console_service.cp(
-                                            recursive,
-                                            source,
-                                            dest
-                )
-            except OSError as e:
-                typer.echo(e)
         command += f" {dest}"
+        try:
+            console_service.cp(
+                                        recursive,
+                                        sources,
+                                        dest,
+                                        jobs,
+                                        resumable,
+                                        verify,
+                                        reflink,
+                                        link
+            )
+        except OSError as e:
+            typer.echo(e)
         console_service._history.append_command_to_history(command)
 
     return app
@@ -3,9 +3,9 @@ from pathlib import Path
 
 import typer # type: ignore
 
+from src.enums.binary_files import BinaryFiles
 from src.services.init_services import init_services
-
-console_service = init_services()
+from src.services.walker import IgnoreRules
 
 def register_grep(app):
     @app.command()
@@ -16,22 +16,64 @@ def register_grep(app):
         ignorecase: bool = typer.Option(
             False, "-i", "-ignore-case", help="ignore case distinctions in patterns and data"
         ),
+        jobs: int = typer.Option(
+            1, "-j", "--jobs", min=1, help="search files with N worker processes"
+        ),
+        binary_files: BinaryFiles = typer.Option(
+            BinaryFiles.binary, "--binary-files", help="how to handle files that contain NUL bytes"
+        ),
+        skip_binary: bool = typer.Option(
+            False, "-I", help="equivalent to --binary-files=without-match"
+        ),
+        include: list[str] = typer.Option(
+            [], "--include", help="search only files whose name matches GLOB"
+        ),
+        exclude: list[str] = typer.Option(
+            [], "--exclude", help="skip files whose name matches GLOB"
+        ),
+        exclude_dirs: list[str] = typer.Option(
+            [], "--exclude-dir", help="skip directories whose name matches GLOB"
+        ),
+        use_gitignore: bool = typer.Option(
+            False, "--gitignore", help="skip paths ignored by .gitignore files"
+        ),
+        archives: bool = typer.Option(
+            False, "--archives", help="search the members of .tar.gz and .zip files, reported as archive!member"
+        ),
         pattern: str = typer.Argument(...),
         files: list[Path] = typer.Argument(default=Path("."))
     ) -> None:
         """
         Search for pattern in each file
         """
+        console_service = init_services()
         command = "grep"
         if recursive:
             command += " -r"
         if ignorecase:
             command += " -i"
+        if jobs > 1:
+            command += f" -j {jobs}"
+        if skip_binary:
+            binary_files = BinaryFiles.without_match
+        if binary_files != BinaryFiles.binary:
+            command += f" --binary-files={binary_files.value}"
+        for glob in include:
+            command += f" --include={glob}"
+        for glob in exclude:
+            command += f" --exclude={glob}"
+        for glob in exclude_dirs:
+            command += f" --exclude-dir={glob}"
+        if use_gitignore:
+            command += " --gitignore"
+        if archives:
+            command += " --archives"
         command += f" {pattern}"
         for file in files:
             command += f" {file}"
         try:
-            contents = console_service.grep(recursive, ignorecase, pattern, files)
+            rules = IgnoreRules(include, exclude, exclude_dirs, use_gitignore)
+            contents = console_service.grep(recursive, ignorecase, pattern, files, jobs, binary_files, rules, archives)
             sys.stdout.writelines(contents)
         except Exception as e:
             typer.echo(e)
@@ -4,19 +4,35 @@ import typer # type: ignore
 
 from src.services.init_services import init_services
 
-console_service = init_services()
-
 def register_history(app):
     @app.command()
-    def history():
+    def history(
+        last: int | None = typer.Argument(
+            None, min=1, help="show only the last N entries"
+        ),
+        find: str | None = typer.Option(
+            None, "-f", "--find", help="show only entries containing TEXT"
+        ),
+        search: str | None = typer.Option(
+            None, "-s", "--search", help="fuzzy search, best matches first (the N most relevant, 20 by default)"
+        )
+    ):
         """
         Display the history list
         """
+        console_service = init_services()
+        command: str = "history"
+        if find is not None:
+            command += f" -f {find}"
+        if search is not None:
+            command += f" -s {search}"
+        if last is not None:
+            command += f" {last}"
         try:
-            command_history: list[str] = console_service.history()
+            command_history: list[str] = console_service.history(last, find, search)
             sys.stdout.writelines(command_history)
         except Exception as e:
             typer.echo(e)
-        console_service._history.append_command_to_history("history")
+        console_service._history.append_command_to_history(command)
 
     return app
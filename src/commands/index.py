@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import typer # type: ignore
+
+from src.services.init_services import init_services
+
+def register_index(app):
+    index_app = typer.Typer(help="Manage trigram indexes used by grep")
+
+    @index_app.command()
+    def build(
+        directory: Path = typer.Argument(default=Path("."))
+    ) -> None:
+        """
+        Build or incrementally refresh the trigram index of DIRECTORY
+        """
+        console_service = init_services()
+        command: str = f"index build {directory}"
+        try:
+            stats = console_service.build_index(directory)
+            typer.echo(f"Indexed {directory}: {stats}")
+        except OSError as e:
+            typer.echo(e)
+        console_service._history.append_command_to_history(command)
+
+    app.add_typer(index_app, name="index")
+    return app
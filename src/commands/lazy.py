@@ -0,0 +1,53 @@
+from functools import partial
+from importlib import import_module
+
+import click
+import typer # type: ignore
+from typer.core import TyperCommand # type: ignore
+
+
+class LazyCommand(TyperCommand):
+    """
+    Stand-in for a shell command whose module is imported on first use.
+
+    Only the name and help text are known up front, everything that needs
+    the real parameters (parsing, --help, completion) is delegated to the
+    command built by the module's register_* function.
+    """
+
+    def __init__(self, *, target: str, **kwargs):
+        super().__init__(**kwargs)
+        self._target = target
+        self._command: click.Command | None = None
+
+    def load(self) -> click.Command:
+        if self._command is None:
+            module_name, registrar_name = self._target.split(":")
+            registrar = getattr(import_module(module_name), registrar_name)
+            group: click.Group = typer.main.get_group(registrar(typer.Typer()))
+            command: click.Command | None = group.get_command(click.Context(group), self.name)
+            if command is None:
+                raise click.ClickException(f"{self._target} does not register {self.name}")
+            self._command = command
+        return self._command
+
+    def main(self, *args, **kwargs):
+        return self.load().main(*args, **kwargs)
+
+    def make_context(self, info_name, args, parent=None, **extra) -> click.Context:
+        return self.load().make_context(info_name, args, parent=parent, **extra)
+
+    def get_help(self, ctx: click.Context) -> str:
+        return self.load().get_help(ctx)
+
+    def shell_complete(self, ctx: click.Context, incomplete: str):
+        return self.load().shell_complete(ctx, incomplete)
+
+
+def _not_loaded() -> None:
+    ...
+
+
+def register_lazy(app, name: str, target: str, help: str):
+    app.command(name=name, help=help, cls=partial(LazyCommand, target=target))(_not_loaded)
+    return app
@@ -5,8 +5,6 @@ import typer # type: ignore
 
 from src.services.init_services import init_services
 
-console_service = init_services()
-
 def register_ls(app):
     @app.command()
     def ls(
@@ -18,22 +16,29 @@ def register_ls(app):
         ),
         all_files: bool = typer.Option(
             False, "-a", "--all", help="do not ignore entries starting with ."
+        ),
+        sort: bool = typer.Option(
+            False, "--sort", help="sort entries by name"
         )
     ) -> None:
         """
         List all files in a directory/directories.
         """
+        console_service = init_services()
         command:str = "ls"
         if long_form:
             command += " -l"
         if all_files:
             command += " -a"
+        if sort:
+            command += " --sort"
         for path in paths:
             command += f" {path}"
             try:
-                content = console_service.ls(path,
+                content = console_service.iter_ls(path,
                                                     all_files,
-                                                    long_form
+                                                    long_form,
+                                                    sort
                                                     )
                 sys.stdout.write(f"{path}: \n")
                 sys.stdout.writelines(content)
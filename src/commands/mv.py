@@ -4,8 +4,6 @@ import typer # type: ignore
 
 from src.services.init_services import init_services
 
-console_service = init_services()
-
 def register_mv(app):
     @app.command()
     def mv(
@@ -19,6 +17,7 @@ def register_mv(app):
         """
         Rename SOURCE to DEST, or move SOURCE to DIRECTORY
         """
+        console_service = init_services()
         command = f"mv {source} {dest}"
         try:
 
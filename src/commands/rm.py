@@ -2,33 +2,41 @@ from pathlib import Path
 
 import typer # type: ignore
 
+from src.services.delete_engine import DEFAULT_DELETE_WORKERS
 from src.services.init_services import init_services
 
-console_service = init_services()
-
 def register_rm(app):
     @app.command()
     def rm(
         recursive: bool = typer.Option(False, "-r", "--recursive", help="remove directories and their contents recursively"),
+        jobs: int = typer.Option(
+            DEFAULT_DELETE_WORKERS, "-j", "--jobs", min=1, help="unlink files of a directory with N threads"
+        ),
+        permanent: bool = typer.Option(
+            False, "--permanent", help="delete right away instead of moving to the trash, can't be undone"
+        ),
         paths: list[Path] = typer.Argument(..., )
     ) -> None:
         """
         Remove the file(s)
         """
+        console_service = init_services()
         command: str = "rm"
         if recursive:
             command += " -r"
+        if permanent:
+            command += " --permanent"
         for path in paths:
             command += f" {path}"
-            try:
-                console_service.rm(
-                                            recursive,
-                                            path
-                )
-            except OSError as e:
-               typer.echo(e)
-            except PermissionError as e:
-                typer.echo(e)
+        try:
+            console_service.rm(
+                                        recursive,
+                                        paths,
+                                        jobs,
+                                        permanent
+            )
+        except OSError as e:
+            typer.echo(e)
         console_service._history.append_command_to_history(command)
 
     return app
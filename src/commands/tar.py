@@ -1,24 +1,63 @@
+import sys
 from pathlib import Path
 
 import typer # type: ignore
 
 from src.enums.archive_format import ArchiveFormat
+from src.services.codec_registry import format_from_name
+from src.services.extract_engine import DEFAULT_EXTRACT_WORKERS
+from src.services.extract_engine import MemberFilter
 from src.services.init_services import init_services
-
-console_service = init_services()
+from src.services.parallel_compress import DEFAULT_COMPRESS_WORKERS
 
 def register_tar(app):
     @app.command()
     def tar(
+        archive_format: ArchiveFormat | None = typer.Option(
+            None, "--format", help="compression of the tar, taken from the archive name when omitted, gztar otherwise"
+        ),
+        level: int | None = typer.Option(
+            None, "-l", "--level", min=0, max=22, help="compression level, clamped to what the format supports"
+        ),
+        jobs: int = typer.Option(
+            DEFAULT_COMPRESS_WORKERS, "-j", "--jobs", min=1, help="compress with N threads"
+        ),
+        list_members: bool = typer.Option(
+            False, "-t", "--list", help="list the members of the compressed tar given as FOLDER instead of packing"
+        ),
+        verbose: bool = typer.Option(
+            False, "-v", "--verbose", help="with -t, show mode, owner, size and date of each member"
+        ),
         folder: Path = typer.Argument(...),
-        archive_name: Path = typer.Argument(...)
+        archive_name: Path | None = typer.Argument(
+            None, help="archive to write, the format's extension is added when missing, - streams it to stdout"
+        )
     ) -> None:
         """
-        Create archive .tar.gz from file
+        Create a compressed tar archive (.tar.gz, .tar.xz, .tar.bz2, .tar.zst, .tar.lz4) from file
         """
-        command: str = f"tar {folder} {archive_name}"
+        if not list_members and archive_name is None:
+            raise typer.BadParameter("archive name is required unless listing with -t", param_hint="ARCHIVE_NAME")
+        if archive_format == ArchiveFormat.zipfile:
+            raise typer.BadParameter("use the zip command for zip archives", param_hint="--format")
+        console_service = init_services()
+        command: str = "tar"
+        if list_members:
+            command += " -tv" if verbose else " -t"
+        else:
+            if archive_format is not None:
+                command += f" --format {archive_format.value}"
+            if level is not None:
+                command += f" -l {level}"
+        command += f" {folder}"
         try:
-            console_service.pack(folder, archive_name, ArchiveFormat.gztar)
+            if list_members:
+                sys.stdout.writelines(console_service.list_archive(folder, ArchiveFormat.gztar, verbose))
+            else:
+                command += f" {archive_name}"
+                if archive_format is None:
+                    archive_format = format_from_name(archive_name) or ArchiveFormat.gztar
+                console_service.pack(folder, archive_name, archive_format, level, jobs)
         except OSError as e:
             typer.echo(e)
         console_service._history.append_command_to_history(command)
@@ -28,16 +67,30 @@ def register_tar(app):
 def register_untar(app):
     @app.command()
     def untar(
+        jobs: int = typer.Option(
+            DEFAULT_EXTRACT_WORKERS, "-j", "--jobs", min=1, help="write files with N threads while the archive streams in"
+        ),
+        include: list[str] = typer.Option(
+            [], "--include", help="extract only members whose path, directory or any name in it matches GLOB"
+        ),
+        exclude: list[str] = typer.Option(
+            [], "--exclude", help="skip members whose path, directory or any name in it matches GLOB"
+        ),
         archive: Path = typer.Argument(...),
         dest: Path = typer.Argument(default=Path("."))
     ) -> None:
         """
-        Unarchive .tar.gz archive
+        Unarchive a compressed tar archive, its format is detected from the content
         """
-        command: str = f"untar {archive} {dest}"
+        console_service = init_services()
+        command: str = "untar"
+        for glob in include:
+            command += f" --include={glob}"
+        for glob in exclude:
+            command += f" --exclude={glob}"
+        command += f" {archive} {dest}"
         try:
-
-            console_service.unpack(archive, dest, ArchiveFormat.gztar)
+            console_service.unpack(archive, dest, ArchiveFormat.gztar, MemberFilter(include, exclude), jobs)
         except OSError as e:
             typer.echo(e)
         console_service._history.append_command_to_history(command)
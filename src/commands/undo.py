@@ -2,11 +2,13 @@ import typer # type: ignore
 
 from src.services.init_services import init_services
 
-console_service = init_services()
-
 def register_undo(app):
     @app.command()
     def undo():
+        """
+        Undo the last cp, mv or rm, again to go further back
+        """
+        console_service = init_services()
         try:
             console_service.undo()
         except Exception as e:
@@ -14,3 +16,18 @@ def register_undo(app):
         console_service._history.append_command_to_history("undo")
 
     return app
+
+def register_redo(app):
+    @app.command()
+    def redo():
+        """
+        Redo the last undone cp, mv or rm
+        """
+        console_service = init_services()
+        try:
+            console_service.redo()
+        except Exception as e:
+            typer.echo(e)
+        console_service._history.append_command_to_history("redo")
+
+    return app
@@ -1,24 +1,39 @@
+import sys
 from pathlib import Path
 
 import typer # type: ignore
 
 from src.enums.archive_format import ArchiveFormat
+from src.services.extract_engine import DEFAULT_EXTRACT_WORKERS
+from src.services.extract_engine import MemberFilter
 from src.services.init_services import init_services
-
-console_service = init_services()
+from src.services.parallel_compress import DEFAULT_COMPRESS_LEVEL
+from src.services.parallel_compress import DEFAULT_COMPRESS_WORKERS
 
 def register_zip(app):
     @app.command()
     def zip(
+        level: int = typer.Option(
+            DEFAULT_COMPRESS_LEVEL, "-l", "--level", min=0, max=9, help="compression level, 0 stores, 9 compresses best"
+        ),
+        jobs: int = typer.Option(
+            DEFAULT_COMPRESS_WORKERS, "-j", "--jobs", min=1, help="compress with N threads"
+        ),
         folder: Path = typer.Argument(...),
-        archive_name: Path = typer.Argument(...)
+        archive_name: Path = typer.Argument(
+            ..., help="archive to write, .zip is added when missing, - streams it to stdout"
+        )
     ) -> None:
         """
         Create archive .zip from file
         """
-        command: str = f"zip {folder} {archive_name}"
+        console_service = init_services()
+        command: str = "zip"
+        if level != DEFAULT_COMPRESS_LEVEL:
+            command += f" -l {level}"
+        command += f" {folder} {archive_name}"
         try:
-            console_service.pack(folder, archive_name, ArchiveFormat.zipfile)
+            console_service.pack(folder, archive_name, ArchiveFormat.zipfile, level, jobs)
         except OSError as e:
             typer.echo(e)
         console_service._history.append_command_to_history(command)
@@ -28,15 +43,38 @@ def register_zip(app):
 def register_unzip(app):
     @app.command()
     def unzip(
+        list_members: bool = typer.Option(
+            False, "-l", "--list", help="list the members with their size and date instead of extracting"
+        ),
+        jobs: int = typer.Option(
+            DEFAULT_EXTRACT_WORKERS, "-j", "--jobs", min=1, help="decompress members with N threads"
+        ),
+        include: list[str] = typer.Option(
+            [], "--include", help="extract only members whose path, directory or any name in it matches GLOB"
+        ),
+        exclude: list[str] = typer.Option(
+            [], "--exclude", help="skip members whose path, directory or any name in it matches GLOB"
+        ),
         archive: Path = typer.Argument(...),
         dest: Path = typer.Argument(default=Path("."))
     ) -> None:
         """
         Unarchive .zip archive
         """
-        command: str = f"unzip {archive} {dest}"
+        console_service = init_services()
+        command: str = "unzip"
+        if list_members:
+            command += " -l"
+        for glob in include:
+            command += f" --include={glob}"
+        for glob in exclude:
+            command += f" --exclude={glob}"
+        command += f" {archive} {dest}"
         try:
-            console_service.unpack(archive, dest, ArchiveFormat.zipfile)
+            if list_members:
+                sys.stdout.writelines(console_service.list_archive(archive, ArchiveFormat.zipfile))
+            else:
+                console_service.unpack(archive, dest, ArchiveFormat.zipfile, MemberFilter(include, exclude), jobs)
         except OSError as e:
             typer.echo(e)
         console_service._history.append_command_to_history(command)
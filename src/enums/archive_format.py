@@ -3,7 +3,15 @@ from enum import Enum
 class ArchiveFormat(str, Enum):
     zipfile = ("zip")
     gztar = ("gztar")
+    xztar = ("xztar")
+    bztar = ("bztar")
+    zstdtar = ("zstdtar")
+    lz4tar = ("lz4tar")
 
 class ExtensionName(str, Enum):
     zipfile = (".zip")
     gztar = (".tar.gz")
+    xztar = (".tar.xz")
+    bztar = (".tar.bz2")
+    zstdtar = (".tar.zst")
+    lz4tar = (".tar.lz4")
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class BinaryFiles(str, Enum):
+    binary = ("binary")
+    without_match = ("without-match")
+    text = ("text")
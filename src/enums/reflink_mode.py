@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class ReflinkMode(str, Enum):
+    never = ("never")
+    auto = ("auto")
+    always = ("always")
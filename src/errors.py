@@ -1,3 +1,11 @@
 
 class WrongFormatError(OSError):
     pass
+
+
+class CodecUnavailableError(OSError):
+    pass
+
+
+class JournalEntryGoneError(FileNotFoundError):
+    pass
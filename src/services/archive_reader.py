@@ -0,0 +1,66 @@
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO
+from typing import Generator
+from typing import Iterator
+
+from src.enums.archive_format import ArchiveFormat
+from src.errors import WrongFormatError
+from src.services.codec_registry import Codec
+from src.services.codec_registry import codec_for
+from src.services.codec_registry import detect_format
+
+
+@contextmanager
+def open_tar_stream(archive: Path, archive_format: ArchiveFormat | None = None) -> Iterator[tarfile.TarFile]:
+    """
+    Open a compressed tar for one forward pass, through the codec its magic
+    bytes name. The codec readers go on across concatenated members, which
+    tarfile's own r|gz does not, so multi-member archives read through.
+    """
+    archive_format = archive_format or detect_format(archive)
+    if archive_format is None or archive_format == ArchiveFormat.zipfile:
+        raise WrongFormatError(f"{archive} is not a compressed tar archive")
+    codec: Codec = codec_for(archive_format)
+    try:
+        with open(archive, "rb") as raw, codec.reader(raw) as stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+            yield tar
+    except (tarfile.ReadError, tarfile.CompressionError, *codec.errors) as e:
+        raise WrongFormatError(f"Can't read {archive}: {e}") from e
+
+
+def iter_tar_entries(archive: Path) -> Generator[tarfile.TarInfo]:
+    with open_tar_stream(archive) as tar:
+        yield from tar
+
+
+def iter_zip_entries(archive: Path) -> Generator[zipfile.ZipInfo]:
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            yield from zf.infolist()
+    except zipfile.BadZipFile as e:
+        raise WrongFormatError(f"Can't read {archive}: {e}") from e
+
+
+def iter_member_streams(archive: Path, archive_format: ArchiveFormat) -> Generator[tuple[str, BinaryIO]]:
+    """
+    Yield (name, stream) for each regular file in the archive, in archive
+    order. A stream is only valid until the next one is yielded.
+    """
+    if archive_format != ArchiveFormat.zipfile:
+        # The name only said it's a tar, the codec comes from the content
+        with open_tar_stream(archive) as tar:
+            for member in tar:
+                if member.isreg():
+                    yield member.name, tar.extractfile(member)
+        return
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            for info in sorted(zf.infolist(), key=lambda info: info.header_offset):
+                if not info.is_dir():
+                    with zf.open(info) as stream:
+                        yield info.filename, stream
+    except zipfile.BadZipFile as e:
+        raise WrongFormatError(f"Can't read {archive}: {e}") from e
@@ -1,22 +1,51 @@
 from abc import ABC, abstractmethod
 from os import PathLike
-from typing import Literal, Generator, Sequence
+from typing import TYPE_CHECKING, Literal, Generator, Iterator, Sequence
 
+from src.enums.binary_files import BinaryFiles
 from src.enums.file_mode import FileReadMode
+from src.enums.reflink_mode import ReflinkMode
 from src.enums.archive_format import ArchiveFormat
 
+if TYPE_CHECKING:
+    from src.services.extract_engine import ExtractStats
+    from src.services.extract_engine import MemberFilter
+    from src.services.pack_engine import PackStats
+    from src.services.trigram_index import IndexStats
+    from src.services.walker import IgnoreRules
+
 
 class OSConsoleServiceBase(ABC):
     @abstractmethod
     def ls(self, path: PathLike[str] | str, all_files: bool, long_form: bool) -> list[str]:
         ...
 
+    @abstractmethod
+    def iter_ls(
+        self,
+        path: PathLike[str] | str,
+        all_files: bool,
+        long_form: bool,
+        sort: bool = False
+    ) -> Iterator[str]:
+        ...
+
     @abstractmethod
     def cd(self, path: PathLike[str] | str) -> None:
         ...
 
     @abstractmethod
-    def cp(self, recursive: bool, source: PathLike[str] | str, dest: PathLike[str] | str) -> None:
+    def cp(
+        self,
+        recursive: bool,
+        source: PathLike[str] | str | Sequence[PathLike[str] | str],
+        dest: PathLike[str] | str,
+        jobs: int | None = None,
+        resumable: bool = False,
+        verify: bool = False,
+        reflink: ReflinkMode = ReflinkMode.never,
+        link: bool = False
+    ) -> None:
         ...
 
     @abstractmethod
@@ -32,7 +61,13 @@ class OSConsoleServiceBase(ABC):
         ...
 
     @abstractmethod
-    def rm(self, recursive: bool, path: PathLike[str] | str) -> None:
+    def rm(
+        self,
+        recursive: bool,
+        path: PathLike[str] | str | Sequence[PathLike[str] | str],
+        jobs: int | None = None,
+        permanent: bool = False
+    ) -> None:
         ...
 
     @abstractmethod
@@ -40,8 +75,10 @@ class OSConsoleServiceBase(ABC):
         self,
         folder: PathLike[str] | str,
         archive_name: PathLike[str] | str,
-        archive_format: Literal[ArchiveFormat.gztar, ArchiveFormat.zipfile]
-    ) -> None:
+        archive_format: ArchiveFormat,
+        level: int | None = None,
+        jobs: int | None = None
+    ) -> "PackStats":
         ...
 
     @abstractmethod
@@ -49,8 +86,19 @@ class OSConsoleServiceBase(ABC):
         self,
         archive: PathLike[str] | str,
         dest: PathLike[str] | str,
-        archive_format: Literal[ArchiveFormat.gztar, ArchiveFormat.zipfile]
-    ) -> None:
+        archive_format: ArchiveFormat,
+        members: "MemberFilter | None" = None,
+        jobs: int | None = None
+    ) -> "ExtractStats":
+        ...
+
+    @abstractmethod
+    def list_archive(
+        self,
+        archive: PathLike[str] | str,
+        archive_format: ArchiveFormat,
+        long_form: bool = False
+    ) -> Generator[str, None, None]:
         ...
 
     @abstractmethod
@@ -59,26 +107,31 @@ class OSConsoleServiceBase(ABC):
         recursive: bool,
         ignorecase: bool,
         pattern: str,
-        files: Sequence[PathLike[str] | str]
+        files: Sequence[PathLike[str] | str],
+        jobs: int = 1,
+        binary_files: BinaryFiles = BinaryFiles.binary,
+        rules: "IgnoreRules | None" = None,
+        archives: bool = False
     ) -> Generator[str, None, None]:
         ...
 
     @abstractmethod
-    def history(self) -> list[str]:
+    def build_index(self, directory: PathLike[str] | str) -> "IndexStats":
         ...
 
     @abstractmethod
-    def undo(self) -> None:
-        ...
-
-    @abstractmethod
-    def undo_mv(self, command: str) -> None:
+    def history(
+        self,
+        last: int | None = None,
+        find: str | None = None,
+        search: str | None = None
+    ) -> list[str]:
         ...
 
     @abstractmethod
-    def undo_cp(self, command: str) -> None:
+    def undo(self) -> None:
         ...
 
     @abstractmethod
-    def undo_rm(self, command: str) -> None:
+    def redo(self) -> None:
         ...
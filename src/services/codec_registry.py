@@ -0,0 +1,178 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import BinaryIO
+from typing import Callable
+
+from src.enums.archive_format import ArchiveFormat
+from src.enums.archive_format import ExtensionName
+from src.errors import CodecUnavailableError
+from src.services.parallel_compress import COMPRESS_BLOCK_SIZE
+from src.services.parallel_compress import DEFAULT_COMPRESS_WORKERS
+from src.services.parallel_compress import ParallelBlockWriter
+from src.services.parallel_compress import gzip_member
+
+# Optional codecs, registered either way so their archives are still recognised
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+MAGIC_SIZE: int = 8
+# xz gains from bigger blocks than the other codecs, its window is larger
+XZ_BLOCK_SIZE: int = 8 * 1024 * 1024
+ZIP_MAGICS: tuple[bytes, ...] = (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")
+
+
+class Codec:
+    """
+    A compression format for tar streams. Archives are written as
+    independently compressed blocks, which every codec here reads back as
+    one stream, so any of them compresses on several threads.
+    """
+
+    def __init__(
+        self,
+        archive_format: ArchiveFormat,
+        extensions: tuple[str, ...],
+        magic: bytes,
+        compress_block: Callable[[bytes, int], bytes],
+        open_reader: Callable[[BinaryIO], BinaryIO],
+        levels: range,
+        default_level: int,
+        block_size: int = COMPRESS_BLOCK_SIZE,
+        errors: tuple[type[Exception], ...] = (),
+        requires: str | None = None
+    ):
+        self.archive_format = archive_format
+        self.extensions = extensions
+        self.magic = magic
+        self.compress_block = compress_block
+        self.open_reader = open_reader
+        self.levels = levels
+        self.default_level = default_level
+        self.block_size = block_size
+        self.errors = errors
+        # Name of the missing module when the codec can't be used here
+        self.requires = requires
+
+    @property
+    def name(self) -> str:
+        return self.archive_format.value
+
+    def level(self, level: int | None) -> int:
+        if level is None:
+            return self.default_level
+        return min(max(level, self.levels.start), self.levels.stop - 1)
+
+    def writer(self, out: BinaryIO, level: int | None = None, workers: int = DEFAULT_COMPRESS_WORKERS) -> ParallelBlockWriter:
+        level = self.level(level)
+        return ParallelBlockWriter(out, lambda block: self.compress_block(block, level), workers, self.block_size)
+
+    def reader(self, raw: BinaryIO) -> BinaryIO:
+        return self.open_reader(raw)
+
+
+CODECS: dict[ArchiveFormat, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    CODECS[codec.archive_format] = codec
+
+
+def codec_for(archive_format: ArchiveFormat) -> Codec:
+    codec: Codec | None = CODECS.get(archive_format)
+    if codec is None:
+        raise CodecUnavailableError(f"{archive_format.value} is not a compressed tar format")
+    if codec.requires is not None:
+        raise CodecUnavailableError(f"{codec.name} archives need the {codec.requires} module, install it to use them")
+    return codec
+
+
+def format_from_name(path: Path | str) -> ArchiveFormat | None:
+    name: str = str(path).lower()
+    if name.endswith(ExtensionName.zipfile):
+        return ArchiveFormat.zipfile
+    for codec in CODECS.values():
+        if name.endswith(codec.extensions):
+            return codec.archive_format
+    return None
+
+
+def detect_format(path: Path) -> ArchiveFormat | None:
+    """
+    Tell the format from the first bytes of the file rather than its name.
+    Compressed streams are taken to hold a tar, which tarfile verifies.
+    """
+    try:
+        with open(path, "rb") as f:
+            head: bytes = f.read(MAGIC_SIZE)
+    except (IsADirectoryError, FileNotFoundError):
+        return None
+    if head.startswith(ZIP_MAGICS):
+        return ArchiveFormat.zipfile
+    for codec in CODECS.values():
+        if head.startswith(codec.magic):
+            return codec.archive_format
+    return None
+
+
+def _xz_block(block: bytes, level: int) -> bytes:
+    # A block never refers past its own start, a dictionary beyond its size only costs memory
+    dict_size: int = min(max(len(block), 4096), XZ_BLOCK_SIZE)
+    return lzma.compress(block, format=lzma.FORMAT_XZ, filters=[
+        {"id": lzma.FILTER_LZMA2, "preset": level, "dict_size": dict_size}
+    ])
+
+
+def _zstd_block(block: bytes, level: int) -> bytes:
+    if zstd is not None:
+        return zstd.compress(block, level=level)
+    return zstandard.ZstdCompressor(level=level).compress(block)
+
+
+def _zstd_reader(raw: BinaryIO) -> BinaryIO:
+    if zstd is not None:
+        return zstd.ZstdFile(raw)
+    return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+
+
+register_codec(Codec(
+    ArchiveFormat.gztar, (ExtensionName.gztar, ".tgz"), b"\x1f\x8b",
+    gzip_member, lambda raw: gzip.GzipFile(fileobj=raw),
+    range(0, 10), 6, errors=(gzip.BadGzipFile, EOFError)
+))
+register_codec(Codec(
+    ArchiveFormat.xztar, (ExtensionName.xztar, ".txz"), b"\xfd7zXZ\x00",
+    _xz_block, lambda raw: lzma.LZMAFile(raw),
+    range(0, 10), 6, XZ_BLOCK_SIZE, errors=(lzma.LZMAError, EOFError)
+))
+register_codec(Codec(
+    ArchiveFormat.bztar, (ExtensionName.bztar, ".tbz2", ".tbz"), b"BZh",
+    bz2.compress, lambda raw: bz2.BZ2File(raw),
+    range(1, 10), 9, errors=(EOFError,)
+))
+register_codec(Codec(
+    ArchiveFormat.zstdtar, (ExtensionName.zstdtar, ".tzst"), b"\x28\xb5\x2f\xfd",
+    _zstd_block, _zstd_reader,
+    range(1, 23), 3, 4 * COMPRESS_BLOCK_SIZE,
+    errors=tuple(module.ZstdError for module in (zstd, zstandard) if module is not None) + (EOFError,),
+    requires=None if zstd is not None or zstandard is not None else "zstandard"
+))
+register_codec(Codec(
+    ArchiveFormat.lz4tar, (ExtensionName.lz4tar,), b"\x04\x22\x4d\x18",
+    lambda block, level: lz4_frame.compress(block, compression_level=level),
+    lambda raw: lz4_frame.LZ4FrameFile(raw, "rb"),
+    range(0, 17), 0, errors=(RuntimeError, EOFError),
+    requires=None if lz4_frame is not None else "lz4"
+))
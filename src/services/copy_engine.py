@@ -0,0 +1,262 @@
+import errno
+import fcntl
+import os
+import shutil
+import stat
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from functools import partial
+from pathlib import Path
+from typing import Callable
+from typing import Sequence
+
+from src.enums.reflink_mode import ReflinkMode
+from src.services.pools import DEFAULT_IO_WORKERS
+from src.services.walker import walk
+
+
+DEFAULT_COPY_WORKERS: int = DEFAULT_IO_WORKERS
+LARGE_FILE_SIZE: int = 8 * 1024 * 1024
+KERNEL_COPY_CHUNK: int = 1024 * 1024 * 1024
+# Small files are handed to the pool in batches so per-task overhead does not dominate
+SMALL_FILE_BATCH: int = 128
+# copy_file_range refuses these combinations (old kernels, cross-fs, special files), shutil handles them
+KERNEL_COPY_FALLBACK_ERRNOS: frozenset[int] = frozenset(
+    {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ETXTBSY}
+)
+# ioctl(2) request from linux/fs.h that shares the source extents with the destination
+FICLONE: int = 0x40049409
+# Filesystems without reflink support, cross-device clones and special files
+REFLINK_FALLBACK_ERRNOS: frozenset[int] = frozenset(
+    {errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.EBADF, errno.ENOSYS}
+)
+# Cross-device targets, filesystems without hardlinks and the per-inode link limit
+HARDLINK_FALLBACK_ERRNOS: frozenset[int] = frozenset(
+    {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP, errno.ENOSYS}
+)
+
+
+class CopyStats:
+    def __init__(self):
+        self.files: int = 0
+        self.bytes: int = 0
+        self.started: float = time.perf_counter()
+        self.seconds: float = 0.0
+        self.methods: dict[str, int] = {}
+
+    def add(self, files: int, copied_bytes: int) -> None:
+        self.files += files
+        self.bytes += copied_bytes
+
+    def add_method(self, method: str) -> None:
+        self.methods[method] = self.methods.get(method, 0) + 1
+
+    def finish(self) -> "CopyStats":
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    @property
+    def throughput(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        methods: str = ", ".join(f"{method}: {count}" for method, count in sorted(self.methods.items()))
+        return (
+            f"{self.files} files, {self.bytes / 2**20:.1f} MiB in {self.seconds:.2f}s "
+            f"({self.throughput / 2**20:.1f} MiB/s{'; ' + methods if methods else ''})"
+        )
+
+
+def kernel_copy(source: str, dest: str) -> int:
+    with open(source, "rb") as fsrc, open(dest, "wb") as fdst:
+        copied: int = 0
+        while sent := os.copy_file_range(fsrc.fileno(), fdst.fileno(), KERNEL_COPY_CHUNK):
+            copied += sent
+    return copied
+
+
+def reflink(source: str, dest: str) -> None:
+    with open(source, "rb") as fsrc, open(dest, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def hardlink(source: str, dest: str) -> None:
+    try:
+        os.link(source, dest)
+    except FileExistsError:
+        # cp overwrites an existing destination, link(2) refuses to
+        os.remove(dest)
+        os.link(source, dest)
+
+
+def copy_file(
+    source: str,
+    dest: str,
+    size: int,
+    reflink_mode: ReflinkMode = ReflinkMode.never,
+    link: bool = False
+) -> tuple[int, str]:
+    if link:
+        try:
+            hardlink(source, dest)
+            return size, "hardlink"
+        except OSError as e:
+            if e.errno not in HARDLINK_FALLBACK_ERRNOS:
+                raise
+    if reflink_mode != ReflinkMode.never:
+        try:
+            reflink(source, dest)
+            shutil.copystat(source, dest)
+            return size, "reflink"
+        except OSError as e:
+            if reflink_mode == ReflinkMode.always or e.errno not in REFLINK_FALLBACK_ERRNOS:
+                raise
+    if size >= LARGE_FILE_SIZE:
+        try:
+            copied: int = kernel_copy(source, dest)
+            shutil.copystat(source, dest)
+            return copied, "copy_file_range"
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_FALLBACK_ERRNOS:
+                raise
+    # shutil.copyfile already goes through sendfile on Linux
+    shutil.copy2(source, dest)
+    return size, "copy"
+
+
+def copy_batch(
+    batch: list[tuple[str, str, int]],
+    reflink_mode: ReflinkMode = ReflinkMode.never,
+    link: bool = False
+) -> tuple[list[tuple[str, str, str]], int, list[tuple[str, str, str]]]:
+    copied_files: list[tuple[str, str, str]] = []
+    copied: int = 0
+    errors: list[tuple[str, str, str]] = []
+    for source, dest, size in batch:
+        try:
+            copied_bytes, method = copy_file(source, dest, size, reflink_mode, link)
+            copied += copied_bytes
+            copied_files.append((source, dest, method))
+        except OSError as e:
+            errors.append((source, dest, str(e)))
+    return copied_files, copied, errors
+
+
+class ParallelCopier:
+    def __init__(
+        self,
+        workers: int = DEFAULT_COPY_WORKERS,
+        reflink_mode: ReflinkMode = ReflinkMode.never,
+        link: bool = False,
+        on_copied: Callable[[str, str, str], None] | None = None
+    ):
+        self.workers = workers
+        self.copy_batch = partial(copy_batch, reflink_mode=reflink_mode, link=link)
+        self.on_copied = on_copied
+
+    def copy_many(
+        self,
+        pairs: Sequence[tuple[Path, Path]],
+        source_stats: Sequence[os.stat_result] | None = None
+    ) -> CopyStats:
+        """
+        SOURCE_STATS, when the caller already has them, saves statting
+        every source again.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            run = _CopyRun(pool, self.workers, self.copy_batch, self.on_copied)
+            for i, (source, dest) in enumerate(pairs):
+                source_stat: os.stat_result = os.stat(source) if source_stats is None else source_stats[i]
+                if stat.S_ISDIR(source_stat.st_mode):
+                    run.add_tree(source, dest)
+                else:
+                    run.add_file(str(source), str(dest), source_stat.st_size)
+            return run.finish()
+
+
+class _CopyRun:
+    def __init__(
+        self,
+        pool: ThreadPoolExecutor,
+        workers: int,
+        copy_batch: Callable[[list[tuple[str, str, int]]], tuple],
+        on_copied: Callable[[str, str, str], None] | None
+    ):
+        self.pool = pool
+        self.workers = workers
+        self.copy_batch = copy_batch
+        self.on_copied = on_copied
+        self.stats = CopyStats()
+        self.errors: list[tuple[str, str, str]] = []
+        self.directories: list[tuple[str, str]] = []
+        self.in_flight: set[Future] = set()
+        self.batch: list[tuple[str, str, int]] = []
+
+    def add_tree(self, source: Path, dest: Path) -> None:
+        try:
+            os.mkdir(dest)
+        except OSError as e:
+            self.errors.append((str(source), str(dest), str(e)))
+            return
+        self.directories.append((str(source), str(dest)))
+        for entry in walk(source, include_dirs=True, onerror=partial(self._unreadable, source, dest)):
+            target: str = os.path.join(dest, os.path.relpath(entry.path, source))
+            try:
+                if entry.is_symlink():
+                    os.symlink(os.readlink(entry.path), target)
+                elif entry.is_dir():
+                    os.mkdir(target)
+                    self.directories.append((entry.path, target))
+                else:
+                    self.add_file(entry.path, target, entry.stat().st_size)
+            except OSError as e:
+                self.errors.append((entry.path, target, str(e)))
+
+    def _unreadable(self, source: Path, dest: Path, error: OSError) -> None:
+        # The directory was created empty, so the copy is incomplete and has to fail
+        target: str = os.path.join(dest, os.path.relpath(error.filename, source))
+        self.errors.append((error.filename, target, str(error)))
+
+    def add_file(self, source: str, dest: str, size: int) -> None:
+        if size >= LARGE_FILE_SIZE:
+            self._submit([(source, dest, size)])
+            return
+        self.batch.append((source, dest, size))
+        if len(self.batch) >= SMALL_FILE_BATCH:
+            self._submit(self.batch)
+            self.batch = []
+
+    def _submit(self, batch: list[tuple[str, str, int]]) -> None:
+        self.in_flight.add(self.pool.submit(self.copy_batch, batch))
+        if len(self.in_flight) >= self.workers * 4:
+            done, self.in_flight = wait(self.in_flight, return_when=FIRST_COMPLETED)
+            self._collect(done)
+
+    def _collect(self, done: set[Future]) -> None:
+        for future in done:
+            copied_files, copied, batch_errors = future.result()
+            self.stats.add(len(copied_files), copied)
+            self.errors.extend(batch_errors)
+            for source, dest, method in copied_files:
+                self.stats.add_method(method)
+                if self.on_copied is not None:
+                    self.on_copied(source, dest, method)
+
+    def finish(self) -> CopyStats:
+        if self.batch:
+            self._submit(self.batch)
+            self.batch = []
+        self._collect(wait(self.in_flight).done)
+        self.in_flight = set()
+        # Directory times have to be set after their contents stop changing
+        for source_dir, target_dir in reversed(self.directories):
+            try:
+                shutil.copystat(source_dir, target_dir)
+            except OSError as e:
+                self.errors.append((source_dir, target_dir, str(e)))
+        if self.errors:
+            raise shutil.Error(self.errors)
+        return self.stats.finish()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from os import PathLike
+
+from src.services.pools import DEFAULT_IO_WORKERS
+from src.services.walker import walk
+
+
+DEFAULT_DELETE_WORKERS: int = DEFAULT_IO_WORKERS
+# unlink is a single syscall, so files are handed out in batches to amortise the pool overhead
+DELETE_BATCH: int = 256
+
+
+class DeleteStats:
+    def __init__(self):
+        self.entries: int = 0
+        self.started: float = time.perf_counter()
+        self.seconds: float = 0.0
+
+    def finish(self) -> "DeleteStats":
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    @property
+    def rate(self) -> float:
+        return self.entries / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.entries} entries in {self.seconds:.2f}s ({self.rate:.0f} entries/s)"
+
+
+def unlink_batch(batch: list[str]) -> tuple[int, list[tuple[str, str]]]:
+    removed: int = 0
+    errors: list[tuple[str, str]] = []
+    for path in batch:
+        try:
+            os.unlink(path)
+            removed += 1
+        except OSError as e:
+            errors.append((path, str(e)))
+    return removed, errors
+
+
+class ParallelDeleter:
+    def __init__(self, workers: int = DEFAULT_DELETE_WORKERS):
+        self.workers = workers
+
+    def remove_tree(self, root: PathLike[str] | str) -> DeleteStats:
+        root = os.fspath(root)
+        stats = DeleteStats()
+        errors: list[tuple[str, str]] = []
+        # Top-down order, reversed later so every directory is removed after its children
+        directories: list[str] = [root]
+        in_flight: set[Future] = set()
+        batch: list[str] = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # An unlistable directory is reported, and its rmdir fails after it
+            for entry in walk(root, include_dirs=True, onerror=lambda e: errors.append((e.filename, str(e)))):
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                    continue
+                batch.append(entry.path)
+                if len(batch) < DELETE_BATCH:
+                    continue
+                in_flight.add(pool.submit(unlink_batch, batch))
+                batch = []
+                if len(in_flight) >= self.workers * 4:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._collect(done, stats, errors)
+            if batch:
+                in_flight.add(pool.submit(unlink_batch, batch))
+            self._collect(wait(in_flight).done, stats, errors)
+        for directory in reversed(directories):
+            try:
+                os.rmdir(directory)
+                stats.entries += 1
+            except OSError as e:
+                errors.append((directory, str(e)))
+        if errors:
+            raise shutil.Error(errors)
+        return stats.finish()
+
+    @staticmethod
+    def _collect(done: set[Future], stats: DeleteStats, errors: list[tuple[str, str]]) -> None:
+        for future in done:
+            removed, batch_errors = future.result()
+            stats.entries += removed
+            errors.extend(batch_errors)
@@ -0,0 +1,51 @@
+import heapq
+import tempfile
+from typing import BinaryIO
+from typing import Generator
+from typing import Iterable
+
+
+SORT_BUFFER_SIZE: int = 50_000
+READ_SIZE: int = 64 * 1024
+# File names can hold anything but NUL, so NUL is the only safe separator for spilled runs
+SEPARATOR: bytes = b"\0"
+
+
+def external_sort(
+    items: Iterable[str],
+    buffer_size: int = SORT_BUFFER_SIZE
+) -> Generator[str]:
+    runs: list[BinaryIO] = []
+    buffer: list[str] = []
+    try:
+        for item in items:
+            buffer.append(item)
+            if len(buffer) >= buffer_size:
+                runs.append(_spill(buffer))
+                buffer = []
+        buffer.sort()
+        if not runs:
+            yield from buffer
+            return
+        yield from heapq.merge(buffer, *(_read_run(run) for run in runs))
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _spill(buffer: list[str]) -> BinaryIO:
+    buffer.sort()
+    run: BinaryIO = tempfile.TemporaryFile()
+    for item in buffer:
+        run.write(item.encode("utf-8", errors="surrogateescape") + SEPARATOR)
+    run.seek(0)
+    return run
+
+
+def _read_run(run: BinaryIO) -> Generator[str]:
+    tail: bytes = b""
+    while chunk := run.read(READ_SIZE):
+        items: list[bytes] = (tail + chunk).split(SEPARATOR)
+        tail = items.pop()
+        for item in items:
+            yield item.decode("utf-8", errors="surrogateescape")
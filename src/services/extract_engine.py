@@ -0,0 +1,311 @@
+import os
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Sequence
+
+from src.errors import WrongFormatError
+from src.services.archive_reader import open_tar_stream
+from src.services.pools import DEFAULT_IO_WORKERS
+
+
+DEFAULT_EXTRACT_WORKERS: int = DEFAULT_IO_WORKERS
+EXTRACT_CHUNK_SIZE: int = 1024 * 1024
+# Zip members are handed out in batches, so small files don't cost a task each
+ZIP_BATCH_ENTRIES: int = 128
+ZIP_BATCH_BYTES: int = 16 * 1024 * 1024
+
+
+class ExtractStats:
+    def __init__(self):
+        self.files: int = 0
+        self.bytes: int = 0
+        self.skipped: int = 0
+        self.started: float = time.perf_counter()
+        self.seconds: float = 0.0
+
+    def finish(self) -> "ExtractStats":
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    @property
+    def rate(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} files, {self.bytes} bytes in {self.seconds:.2f}s "
+            f"({self.rate / 1024 / 1024:.1f} MiB/s), {self.skipped} members filtered out"
+        )
+
+
+class MemberFilter:
+    """
+    Include/exclude globs for archive members. A glob matches the member
+    path, one of its leading directories or the name of any component, so
+    a directory glob takes in everything under it.
+    """
+
+    def __init__(self, include: Sequence[str] = (), exclude: Sequence[str] = ()):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+
+    def allows(self, name: str) -> bool:
+        if self.include and not any(_matches(name, glob) for glob in self.include):
+            return False
+        return not any(_matches(name, glob) for glob in self.exclude)
+
+
+def _matches(name: str, glob: str) -> bool:
+    glob = glob.rstrip("/")
+    parts: list[str] = name.rstrip("/").split("/")
+    if any(fnmatch(part, glob) for part in parts):
+        return True
+    return any(fnmatch("/".join(parts[:i]), glob) for i in range(2, len(parts) + 1))
+
+
+def extract_zip(
+    archive: Path,
+    dest: Path,
+    members: MemberFilter | None = None,
+    workers: int = DEFAULT_EXTRACT_WORKERS
+) -> ExtractStats:
+    """
+    The central directory gives every member's offset, so batches of members
+    are decompressed concurrently, each worker reading through its own
+    handle on the archive.
+    """
+    stats = ExtractStats()
+    members = members or MemberFilter()
+    wanted: list[zipfile.ZipInfo] = []
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if members.allows(info.filename):
+                    wanted.append(info)
+                else:
+                    stats.skipped += 1
+    except zipfile.BadZipFile as e:
+        raise WrongFormatError(f"Can't extract {archive}: {e}") from e
+    # In archive order, so each worker reads its part of the archive front to back
+    wanted.sort(key=lambda info: info.header_offset)
+    # zipfile creates missing parents itself, but two workers racing on one parent would collide
+    parents: set[str] = {os.path.dirname(_zip_target(dest, info.filename)) for info in wanted}
+    for parent in sorted(parents):
+        os.makedirs(parent, exist_ok=True)
+    batches: list[list[zipfile.ZipInfo]] = []
+    batch: list[zipfile.ZipInfo] = []
+    batch_bytes: int = 0
+    for info in wanted:
+        batch.append(info)
+        batch_bytes += info.compress_size
+        if len(batch) >= ZIP_BATCH_ENTRIES or batch_bytes >= ZIP_BATCH_BYTES:
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+    if batch:
+        batches.append(batch)
+    handles = threading.local()
+    opened: list[zipfile.ZipFile] = []
+
+    def extract_batch(batch: list[zipfile.ZipInfo]) -> tuple[int, int]:
+        zf: zipfile.ZipFile | None = getattr(handles, "zf", None)
+        if zf is None:
+            zf = handles.zf = zipfile.ZipFile(archive)
+            opened.append(zf)
+        files: int = 0
+        size: int = 0
+        for info in batch:
+            # zipfile drops absolute paths and .. components from the target
+            zf.extract(info, dest)
+            if not info.is_dir():
+                files += 1
+                size += info.file_size
+        return files, size
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for files, size in pool.map(extract_batch, batches):
+                stats.files += files
+                stats.bytes += size
+    finally:
+        for zf in opened:
+            zf.close()
+    return stats.finish()
+
+
+def _zip_target(dest: Path, name: str) -> str:
+    # The path ZipFile.extract writes a member to: absolute parts, ., .. and empty components dropped
+    parts: list[str] = [part for part in name.split("/") if part not in ("", ".", "..")]
+    return os.path.join(dest, *parts)
+
+
+class _WriteBehind:
+    """
+    Writes file data on a thread pool while the caller keeps decompressing.
+    Chunks land with pwrite at their offset, so they can complete in any
+    order, and a file is finished off (mode, mtime, close) by whichever of
+    its writes completes last. The number of chunks in flight is bounded,
+    which bounds memory.
+    """
+
+    def __init__(self, workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(workers * 4)
+        self._lock = threading.Lock()
+        self.errors: list[BaseException] = []
+
+    def open(self, path: str, member: tarfile.TarInfo) -> "_PendingFile":
+        return _PendingFile(self, os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), member)
+
+    def submit(self, pending: "_PendingFile", chunk: bytes, offset: int) -> None:
+        self._slots.acquire()
+        with self._lock:
+            pending.writes += 1
+        future: Future = self._pool.submit(os.pwrite, pending.fd, chunk, offset)
+        future.add_done_callback(pending.written)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+class _PendingFile:
+    def __init__(self, owner: _WriteBehind, fd: int, member: tarfile.TarInfo):
+        self.owner = owner
+        self.fd = fd
+        self.member = member
+        self.writes: int = 0
+        self.sealed: bool = False
+
+    def written(self, future: Future) -> None:
+        self.owner._slots.release()
+        if future.exception() is not None:
+            self.owner.errors.append(future.exception())
+        with self.owner._lock:
+            self.writes -= 1
+            done: bool = self.sealed and self.writes == 0
+        if done:
+            self._finish()
+
+    def seal(self) -> None:
+        with self.owner._lock:
+            self.sealed = True
+            done: bool = self.writes == 0
+        if done:
+            self._finish()
+
+    def _finish(self) -> None:
+        try:
+            if self.member.mode is not None:
+                os.fchmod(self.fd, self.member.mode)
+            os.utime(self.fd, (self.member.mtime, self.member.mtime))
+        except OSError as e:
+            self.owner.errors.append(e)
+        finally:
+            os.close(self.fd)
+
+
+def extract_tar(
+    archive: Path,
+    dest: Path,
+    members: MemberFilter | None = None,
+    workers: int = DEFAULT_EXTRACT_WORKERS
+) -> ExtractStats:
+    """
+    One streaming pass over a compressed tar. The main thread decompresses
+    and hands file data to a write-behind pool; members left out by the
+    filter are read past without touching the disk.
+    """
+    stats = ExtractStats()
+    members = members or MemberFilter()
+    dest_path: str = os.path.realpath(dest)
+    created: set[str] = set()
+    writer = _WriteBehind(workers)
+    directories: list[tarfile.TarInfo] = []
+    extracted: set[str] = set()
+    # Hard links whose target the filter left out, by target name
+    deferred: dict[str, list[tarfile.TarInfo]] = {}
+    try:
+        with open_tar_stream(archive) as tar:
+            for member in tar:
+                if not members.allows(member.name):
+                    stats.skipped += 1
+                    continue
+                # Same checks as extractall(filter="data"): no absolute paths, no escaping dest
+                member = tarfile.data_filter(member, dest_path)
+                target: str = os.path.join(dest_path, member.name)
+                parent: str = os.path.dirname(target)
+                if parent not in created:
+                    os.makedirs(parent, exist_ok=True)
+                    created.add(parent)
+                if member.isreg():
+                    pending: _PendingFile = writer.open(target, member)
+                    source = tar.extractfile(member)
+                    offset: int = 0
+                    try:
+                        while chunk := source.read(EXTRACT_CHUNK_SIZE):
+                            writer.submit(pending, chunk, offset)
+                            offset += len(chunk)
+                    finally:
+                        pending.seal()
+                    stats.files += 1
+                    stats.bytes += offset
+                    extracted.add(member.name)
+                elif member.islnk() and member.linkname not in extracted:
+                    # The stream can't go back for the target's data, a second pass fetches it
+                    deferred.setdefault(member.linkname, []).append(member)
+                elif member.isdir():
+                    os.makedirs(target, exist_ok=True)
+                    created.add(target)
+                    directories.append(member)
+                else:
+                    tar.extract(member, dest_path, set_attrs=False, filter="data")
+        writer.close()
+        if deferred:
+            _extract_link_targets(archive, dest_path, deferred, stats)
+        # Like extractall, directory attributes go last so writing into them doesn't undo them
+        for member in sorted(directories, key=lambda member: member.name, reverse=True):
+            target = os.path.join(dest_path, member.name)
+            if member.mode is not None:
+                os.chmod(target, member.mode)
+            os.utime(target, (member.mtime, member.mtime))
+    except tarfile.FilterError as e:
+        raise PermissionError(f"Refusing to extract {e.tarinfo.name}: {e}") from e
+    except tarfile.TarError as e:
+        raise WrongFormatError(f"Can't extract {archive}: {e}") from e
+    finally:
+        writer.close()
+    if writer.errors:
+        raise writer.errors[0]
+    return stats.finish()
+
+
+def _extract_link_targets(
+    archive: Path,
+    dest_path: str,
+    deferred: dict[str, list[tarfile.TarInfo]],
+    stats: ExtractStats
+) -> None:
+    """
+    A second pass for hard links whose target the filter left out: the
+    target's data goes under the first link's name and the other links to
+    the same target point at it.
+    """
+    with open_tar_stream(archive) as tar:
+        for member in tar:
+            if not member.isreg() or member.name not in deferred:
+                continue
+            first, *others = deferred.pop(member.name)
+            tar.extract(member.replace(name=first.name, deep=False), dest_path, filter="data")
+            stats.files += 1
+            stats.bytes += member.size
+            for link in others:
+                tar.extract(link.replace(linkname=first.name, deep=False), dest_path, set_attrs=False, filter="data")
+            if not deferred:
+                return
+    for target, links in deferred.items():
+        raise FileNotFoundError(f"Can't extract hard link {links[0].name}, its target {target} is not in the archive")
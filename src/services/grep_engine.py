@@ -0,0 +1,163 @@
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import BinaryIO
+from typing import Callable
+from typing import Generator
+from typing import Iterator
+
+from src.enums.archive_format import ArchiveFormat
+from src.enums.binary_files import BinaryFiles
+from src.services.archive_reader import iter_member_streams
+from src.services.codec_registry import format_from_name
+from src.services.matcher import Matcher
+from src.services.matcher import compile_matcher
+
+
+CHUNK_SIZE: int = 1024 * 1024
+BINARY_SNIFF_SIZE: int = 8192
+
+
+def iter_stream_blocks(
+    stream: BinaryIO,
+    chunk_size: int = CHUNK_SIZE,
+    head: bytes = b""
+) -> Generator[bytes]:
+    # Pieces of an unfinished line are joined once its newline arrives, so a long line costs one copy
+    pieces: list[bytes] = [head]
+    while chunk := stream.read(chunk_size):
+        cut: int = chunk.rfind(b"\n")
+        if cut == -1:
+            pieces.append(chunk)
+            continue
+        pieces.append(chunk[:cut + 1])
+        yield b"".join(pieces)
+        pieces = [chunk[cut + 1:]]
+    tail: bytes = b"".join(pieces)
+    if tail:
+        yield tail
+
+
+def is_binary_block(block: bytes) -> bool:
+    return b"\0" in block[:BINARY_SNIFF_SIZE]
+
+
+def scan_file(
+    file: Path,
+    matcher: Matcher,
+    binary_files: BinaryFiles = BinaryFiles.binary
+) -> Generator[str]:
+    with file.open("rb") as f:
+        yield from scan_stream(file.name, f, matcher, binary_files)
+
+
+def scan_archive(
+    archive: Path,
+    archive_format: ArchiveFormat,
+    matcher: Matcher,
+    binary_files: BinaryFiles = BinaryFiles.binary
+) -> Generator[str]:
+    # Members are read as streams straight out of the archive, nothing is extracted
+    for name, stream in iter_member_streams(archive, archive_format):
+        yield from scan_stream(f"{archive.name}!{name}", stream, matcher, binary_files)
+
+
+def scan_target(
+    file: Path,
+    matcher: Matcher,
+    binary_files: BinaryFiles = BinaryFiles.binary,
+    archives: bool = False
+) -> Generator[str]:
+    archive_format: ArchiveFormat | None = format_from_name(file) if archives else None
+    if archive_format is not None:
+        yield from scan_archive(file, archive_format, matcher, binary_files)
+    else:
+        yield from scan_file(file, matcher, binary_files)
+
+
+def scan_stream(
+    name: str,
+    stream: BinaryIO,
+    matcher: Matcher,
+    binary_files: BinaryFiles = BinaryFiles.binary
+) -> Generator[str]:
+    # Sniffed before splitting into lines, a binary file may have no newline to split at
+    head: bytes = stream.read(BINARY_SNIFF_SIZE)
+    blocks: Generator[bytes] = iter_stream_blocks(stream, head=head)
+    with closing(blocks):
+        if binary_files != BinaryFiles.text and is_binary_block(head):
+            if binary_files == BinaryFiles.binary:
+                yield from _scan_binary_file(name, blocks, matcher)
+            return
+        lines_before: int = 0
+        for block in blocks:
+            for index, line in matcher.search_block(block):
+                yield f"{name}: {lines_before + index + 1}:{line}\n"
+            lines_before += block.count(b"\n")
+
+
+def _scan_binary_file(
+    name: str,
+    blocks: Iterator[bytes],
+    matcher: Matcher
+) -> Generator[str]:
+    for block in blocks:
+        if next(matcher.search_block(block), None) is not None:
+            yield f"Binary file {name} matches\n"
+            return
+
+
+def collect_matches(
+    file: Path,
+    pattern: str,
+    ignorecase: bool,
+    binary_files: BinaryFiles,
+    archives: bool = False
+) -> list[str] | None:
+    try:
+        return list(scan_target(file, compile_matcher(pattern, ignorecase), binary_files, archives))
+    except Exception:
+        return None
+
+
+def parallel_search(
+    files: Iterator[Path],
+    pattern: str,
+    ignorecase: bool,
+    jobs: int,
+    binary_files: BinaryFiles = BinaryFiles.binary,
+    on_error: Callable[[Path], None] | None = None,
+    archives: bool = False
+) -> Generator[str]:
+    window: int = jobs * 4
+    pending: deque[tuple[Path, Future]] = deque()
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        try:
+            for file in files:
+                pending.append((file, executor.submit(collect_matches, file, pattern, ignorecase, binary_files, archives)))
+                if len(pending) >= window:
+                    yield from _drain_one(pending, on_error)
+        except Exception:
+            while pending:
+                yield from _drain_one(pending, on_error)
+            raise
+        while pending:
+            yield from _drain_one(pending, on_error)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _drain_one(
+    pending: deque[tuple[Path, Future]],
+    on_error: Callable[[Path], None] | None
+) -> Generator[str]:
+    file, future = pending.popleft()
+    matches: list[str] | None = future.result()
+    if matches is None:
+        if on_error is not None:
+            on_error(file)
+        return
+    yield from matches
@@ -0,0 +1,107 @@
+import heapq
+import math
+from collections import Counter
+
+
+SEARCH_LIMIT: int = 20
+# Share of the query trigrams a command needs before it counts as a fuzzy match
+FUZZY_THRESHOLD: float = 0.6
+# Entries this far back get half the recency weight of the newest one
+RECENCY_HALF_LIFE: int = 1000
+
+
+def trigrams(text: str) -> set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class HistorySearchIndex:
+    """
+    Trigram index over the distinct commands of a history.
+
+    Every distinct command is stored once with how often it was run and
+    the number of its latest entry, which is what results are ranked by.
+    """
+
+    def __init__(self):
+        self.commands: list[str] = []
+        self.counts: list[int] = []
+        self.last_seen: list[int] = []
+        self.last_number: int = 0
+        self._ids: dict[str, int] = {}
+        self._postings: dict[str, set[int]] = {}
+
+    def add(self, number: int, command: str) -> None:
+        if number <= self.last_number:
+            return
+        self.last_number = number
+        command_id: int | None = self._ids.get(command)
+        if command_id is not None:
+            self.counts[command_id] += 1
+            self.last_seen[command_id] = number
+            return
+        command_id = len(self.commands)
+        self._ids[command] = command_id
+        self.commands.append(command)
+        self.counts.append(1)
+        self.last_seen.append(number)
+        postings: dict[str, set[int]] = self._postings
+        for gram in trigrams(command):
+            posting: set[int] | None = postings.get(gram)
+            if posting is None:
+                postings[gram] = {command_id}
+            else:
+                posting.add(command_id)
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[tuple[int, str]]:
+        query = query.lower()
+        grams: set[str] = trigrams(query)
+        candidates: list[int]
+        if not grams:
+            # Too short for a trigram, the distinct commands are few enough to scan
+            candidates = [command_id for command_id, command in enumerate(self.commands) if query in command.lower()]
+        else:
+            candidates = self._substring_candidates(query, grams)
+            if len(candidates) < limit:
+                candidates += self._fuzzy_candidates(grams, set(candidates), limit - len(candidates))
+        best: list[int] = heapq.nlargest(
+            limit, candidates, key=lambda command_id: self._rank(command_id, self._quality(query, grams, command_id))
+        )
+        return [(self.last_seen[command_id], self.commands[command_id]) for command_id in best]
+
+    def _substring_candidates(self, query: str, grams: set[str]) -> list[int]:
+        postings: list[set[int]] = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        common: set[int] = postings[0].intersection(*postings[1:])
+        return [command_id for command_id in common if query in self.commands[command_id].lower()]
+
+    def _fuzzy_candidates(self, grams: set[str], exclude: set[int], wanted: int) -> list[int]:
+        hits: Counter[int] = Counter()
+        for gram in grams:
+            hits.update(self._postings.get(gram, ()))
+        levels: dict[int, list[int]] = {}
+        for command_id, count in hits.items():
+            levels.setdefault(count, []).append(command_id)
+        candidates: list[int] = []
+        needed: int = math.ceil(len(grams) * FUZZY_THRESHOLD)
+        # Best overlap first, a level that overflows what is wanted is cut down to its most recent commands
+        for count in sorted(levels, reverse=True):
+            if count < needed or len(candidates) >= wanted:
+                break
+            level: list[int] = [command_id for command_id in levels[count] if command_id not in exclude]
+            if len(candidates) + len(level) > wanted * 4:
+                level = heapq.nlargest(wanted * 4, level, key=self.last_seen.__getitem__)
+            candidates += level
+        return candidates
+
+    def _quality(self, query: str, grams: set[str], command_id: int) -> float:
+        command: str = self.commands[command_id].lower()
+        if command.startswith(query):
+            return 3.0
+        if query in command:
+            return 2.0
+        return len(grams & trigrams(command)) / len(grams) if grams else 0.0
+
+    def _rank(self, command_id: int, quality: float) -> float:
+        age: int = self.last_number - self.last_seen[command_id]
+        recency: float = 0.5 ** (age / RECENCY_HALF_LIFE)
+        return quality * (1 + math.log1p(self.counts[command_id])) * (0.5 + recency)
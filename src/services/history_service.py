@@ -1,12 +1,54 @@
+import fcntl
+import os
+import struct
+import time
+from contextlib import contextmanager
 from os import getcwd
 from pathlib import Path
+from typing import BinaryIO
+from typing import Generator
+from typing import Iterator
+
+from src.services.history_search import SEARCH_LIMIT
+from src.services.history_search import HistorySearchIndex
+
+
+HISTORY_MAX_BYTES: int = 4 * 1024 * 1024
+HISTORY_KEEP_ENTRIES: int = 10_000
+READ_SIZE: int = 64 * 1024
+# Sessions flush every batch right away but fsync at most this often
+FSYNC_INTERVAL: float = 1.0
+# The sidecar index holds the end offset of every entry, entry k spans [end(k - 1), end(k))
+OFFSET: struct.Struct = struct.Struct("<Q")
+
 
 class HistoryService:
     def __init__(
         self,
-        history_file: Path = Path(f"{getcwd()}/src/.history")
+        history_file: Path | None = None,
+        max_bytes: int = HISTORY_MAX_BYTES,
+        keep_entries: int = HISTORY_KEEP_ENTRIES,
+        flush_every: int = 1,
+        fsync_interval: float = FSYNC_INTERVAL
         ):
-        self.history_file = history_file
+        # Resolved per instance rather than at import, so it follows the working directory
+        self.history_file = history_file if history_file is not None else Path(getcwd()) / "src" / ".history"
+        self.index_file = self.history_file.with_name(self.history_file.name + ".idx")
+        # Compaction replaces the history file, so sessions lock a file that is never replaced
+        self.lock_file = self.history_file.with_name(self.history_file.name + ".lock")
+        self.max_bytes = max_bytes
+        self.keep_entries = keep_entries
+        self.flush_every = flush_every
+        self.fsync_interval = fsync_interval
+        self._writer: int | None = None
+        self._reader: BinaryIO | None = None
+        self._index: BinaryIO | None = None
+        self._lock: BinaryIO | None = None
+        self._lock_depth: int = 0
+        self._pending: list[bytes] = []
+        self._last_fsync: float = 0.0
+        self._unsynced: bool = False
+        self._search_index: HistorySearchIndex | None = None
 
     def get_history_file(self) -> None:
         try:
@@ -19,10 +61,7 @@ class HistoryService:
         self
     ) -> list[tuple[int, str]]:
         try:
-            if self.history_file.exists():
-                history: list[tuple[int, str]] = [(line, command) for line, command in enumerate(self.history_file.read_text(encoding="utf-8").splitlines(), 1)]
-                return history
-            return []
+            return list(self.iter_history())
         except Exception:
             raise FileNotFoundError("Could not load history")
 
@@ -31,8 +70,195 @@ class HistoryService:
             cmd: str
     ):
         try:
-            if self.history_file.exists():
-                with self.history_file.open("a", encoding="utf-8") as h:
-                    h.write(cmd + "\n")
+            if self._writer is None and not self.history_file.exists():
+                return
+            self._pending.append(cmd.encode("utf-8", errors="surrogateescape") + b"\n")
+            if len(self._pending) >= self.flush_every:
+                self.flush()
         except Exception:
             raise FileNotFoundError("Could not append command to history")
+
+    def flush(self) -> None:
+        """
+        Append the pending commands in one write under the session lock, so
+        entries from concurrent sessions never interleave mid-line.
+        """
+        if not self._pending:
+            return
+        with self._locked():
+            writer: int = self._writer_fd()
+            data: memoryview = memoryview(b"".join(self._pending))
+            while data:
+                data = data[os.write(writer, data):]
+            self._pending.clear()
+            self._unsynced = True
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+            if os.fstat(writer).st_size > self.max_bytes:
+                self.compact()
+
+    def close(self) -> None:
+        self.flush()
+        if self._unsynced:
+            self._fsync()
+        if self._writer is not None:
+            os.close(self._writer)
+        for handle in (self._reader, self._index, self._lock):
+            if handle is not None:
+                handle.close()
+        self._writer = None
+        self._reader = self._index = self._lock = None
+
+    def count(self) -> int:
+        if not self._sync():
+            return 0
+        return self._entries()
+
+    def entry(self, number: int) -> str:
+        if not self._sync() or not 1 <= number <= self._entries():
+            raise IndexError(f"No history entry {number}")
+        start: int = self._end(number - 1)
+        return self._read(start, self._end(number) - start)[:-1].decode("utf-8", errors="surrogateescape")
+
+    def tail(self, last: int) -> list[tuple[int, str]]:
+        if not self._sync():
+            return []
+        first: int = max(self._entries() - last, 0) + 1
+        return list(self.iter_history(first))
+
+    def iter_history(self, first: int = 1) -> Generator[tuple[int, str]]:
+        if not self._sync():
+            return
+        count: int = self._entries()
+        if first > count:
+            return
+        start: int = self._end(first - 1)
+        number: int = first
+        for line in self._iter_lines(start, self._end(count)):
+            yield number, line
+            number += 1
+
+    def search(self, text: str) -> Generator[tuple[int, str]]:
+        for number, command in self.iter_history():
+            if text in command:
+                yield number, command
+
+    def search_ranked(self, query: str, limit: int = SEARCH_LIMIT) -> list[tuple[int, str]]:
+        # Built on first use, afterwards only entries appended since the last search are added
+        if self._search_index is None or self.count() < self._search_index.last_number:
+            self._search_index = HistorySearchIndex()
+        for number, command in self.iter_history(self._search_index.last_number + 1):
+            self._search_index.add(number, command)
+        return self._search_index.search(query, limit)
+
+    def compact(self) -> None:
+        with self._locked():
+            if not self._sync() or self._entries() <= self.keep_entries:
+                return
+            start: int = self._end(self._entries() - self.keep_entries)
+            end: int = self._end(self._entries())
+            compacted: Path = self.history_file.with_name(self.history_file.name + ".compact")
+            with compacted.open("wb") as out:
+                for position in range(start, end, READ_SIZE):
+                    out.write(self._read(position, min(READ_SIZE, end - position)))
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(compacted, self.history_file)
+            self.index_file.unlink(missing_ok=True)
+            # Entry numbers start over after compaction
+            self._search_index = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # flock is per open file, so nested sections only lock and unlock at the outermost one
+        if self._lock is None:
+            self._lock = self.lock_file.open("ab")
+        if self._lock_depth == 0:
+            fcntl.flock(self._lock.fileno(), fcntl.LOCK_EX)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock.fileno(), fcntl.LOCK_UN)
+
+    def _writer_fd(self) -> int:
+        # Another session may have compacted the history into a new file since the last write
+        if self._writer is not None and os.fstat(self._writer).st_ino != self.history_file.stat().st_ino:
+            self._fsync()
+            os.close(self._writer)
+            self._writer = None
+        if self._writer is None:
+            self._writer = os.open(self.history_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._writer
+
+    def _fsync(self) -> None:
+        if self._writer is not None:
+            os.fsync(self._writer)
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+
+    def _sync(self) -> bool:
+        """
+        Bring the sidecar index up to the end of the history file, scanning
+        only the bytes appended since it was last written.
+        """
+        if not self.history_file.exists():
+            return False
+        self.flush()
+        with self._locked():
+            return self._sync_locked()
+
+    def _sync_locked(self) -> bool:
+        if self._reader is not None and os.fstat(self._reader.fileno()).st_ino != self.history_file.stat().st_ino:
+            # Compacted into a new file, the index was rebuilt along with it
+            self._reader.close()
+            self._index.close()
+            self._reader = self._index = None
+        if self._reader is None:
+            self._reader = self.history_file.open("rb")
+        if self._index is None:
+            self._index = self.index_file.open("a+b")
+        size: int = os.fstat(self._reader.fileno()).st_size
+        indexed: int = self._end(self._entries())
+        if indexed > size or (indexed and self._read(indexed - 1, 1) != b"\n"):
+            # The history was truncated or rewritten behind our back
+            self._index.truncate(0)
+            indexed = 0
+        if indexed < size:
+            self._index_from(indexed, size)
+        return True
+
+    def _index_from(self, position: int, size: int) -> None:
+        while position < size:
+            chunk: bytes = self._read(position, min(READ_SIZE, size - position))
+            ends: list[bytes] = []
+            newline: int = chunk.find(b"\n")
+            while newline != -1:
+                ends.append(OFFSET.pack(position + newline + 1))
+                newline = chunk.find(b"\n", newline + 1)
+            self._index.write(b"".join(ends))
+            position += len(chunk)
+        self._index.flush()
+
+    def _entries(self) -> int:
+        return os.fstat(self._index.fileno()).st_size // OFFSET.size
+
+    def _end(self, number: int) -> int:
+        if number <= 0:
+            return 0
+        self._index.seek((number - 1) * OFFSET.size)
+        return OFFSET.unpack(self._index.read(OFFSET.size))[0]
+
+    def _read(self, position: int, length: int) -> bytes:
+        self._reader.seek(position)
+        return self._reader.read(length)
+
+    def _iter_lines(self, start: int, end: int) -> Generator[str]:
+        tail: bytes = b""
+        for position in range(start, end, READ_SIZE):
+            lines: list[bytes] = (tail + self._read(position, min(READ_SIZE, end - position))).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line.decode("utf-8", errors="surrogateescape")
@@ -1,13 +1,25 @@
+import atexit
 import logging
+from functools import cache
 from logging import config
 from src.common.config import LOGGING_CONFIG
 from src.services.history_service import HistoryService
 from src.services.linux_console import LinuxConsoleService
+from src.services.trash import Trash
+from src.services.undo_journal import UndoJournal
 
+@cache
 def init_services() -> LinuxConsoleService:
     config.dictConfig(LOGGING_CONFIG)
     logger = logging.getLogger(__name__)
     history = HistoryService()
-    console_service = LinuxConsoleService(logger=logger, history_service=history)
+    # Flushes what is pending and fsyncs the last batch when the shell exits
+    atexit.register(history.close)
+    console_service = LinuxConsoleService(
+        logger=logger,
+        history_service=history,
+        trash=Trash(),
+        journal=UndoJournal()
+    )
     console_service._history.get_history_file()
     return console_service
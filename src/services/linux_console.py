@@ -1,31 +1,105 @@
+import errno
 import os
 import re
 import stat
 import shutil
-import shlex
+import sqlite3
+import sys
+from collections import deque
 from datetime import datetime
+from functools import cache
+from functools import partial
 from grp import getgrgid
 from logging import Logger
+from os import DirEntry
 from os import PathLike
 from os import stat_result
 from pwd import getpwuid
 from pathlib import Path
+from typing import Callable
 from typing import Generator
+from typing import Iterator
 from typing import Literal
 from typing import Sequence
 
+from src.enums.binary_files import BinaryFiles
 from src.enums.file_mode import FileReadMode
+from src.enums.reflink_mode import ReflinkMode
 from src.enums.archive_format import ArchiveFormat
 from src.enums.archive_format import ExtensionName
+from src.errors import CodecUnavailableError
+from src.errors import JournalEntryGoneError
 from src.errors import WrongFormatError
+from src.services.archive_reader import iter_tar_entries
+from src.services.archive_reader import iter_zip_entries
 from src.services.base import OSConsoleServiceBase
+from src.services.codec_registry import Codec
+from src.services.codec_registry import codec_for
+from src.services.codec_registry import detect_format
+from src.services.codec_registry import format_from_name
+from src.services.copy_engine import DEFAULT_COPY_WORKERS
+from src.services.copy_engine import CopyStats
+from src.services.copy_engine import ParallelCopier
+from src.services.delete_engine import DEFAULT_DELETE_WORKERS
+from src.services.delete_engine import DeleteStats
+from src.services.delete_engine import ParallelDeleter
+from src.services.external_sort import external_sort
+from src.services.extract_engine import DEFAULT_EXTRACT_WORKERS
+from src.services.extract_engine import ExtractStats
+from src.services.extract_engine import MemberFilter
+from src.services.extract_engine import extract_tar
+from src.services.extract_engine import extract_zip
+from src.services.pack_engine import STDOUT
+from src.services.pack_engine import PackStats
+from src.services.pack_engine import pack_tar
+from src.services.pack_engine import pack_zip
+from src.services.parallel_compress import DEFAULT_COMPRESS_LEVEL
+from src.services.parallel_compress import DEFAULT_COMPRESS_WORKERS
+from src.services.resumable_copy import CHECKPOINT_SUFFIX
+from src.services.resumable_copy import resumable_copy
+from src.services.grep_engine import parallel_search
+from src.services.grep_engine import scan_target
+from src.services.matcher import Matcher
+from src.services.matcher import compile_matcher
+from src.services.trash import Trash
+from src.services.trigram_index import INDEX_FILENAME
+from src.services.trigram_index import IndexStats
+from src.services.trigram_index import TrigramIndex
+from src.services.undo_journal import UndoJournal
+from src.services.walker import IgnoreRules
+from src.services.walker import walk
+from src.services.history_search import SEARCH_LIMIT
 from src.services.history_service import HistoryService
 
 
+@cache
+def user_name(uid: int) -> str:
+    try:
+        return getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+@cache
+def group_name(gid: int) -> str:
+    try:
+        return getgrgid(gid).gr_name
+    except KeyError:
+        return str(gid)
+
+
 class LinuxConsoleService(OSConsoleServiceBase):
-    def __init__(self, logger: Logger, history_service: HistoryService):
+    def __init__(
+        self,
+        logger: Logger,
+        history_service: HistoryService,
+        trash: Trash | None = None,
+        journal: UndoJournal | None = None
+    ):
         self._logger = logger
         self._history = history_service
+        self._trash = trash
+        self._journal = journal
 
 
     def ls(self,
@@ -33,6 +107,15 @@ class LinuxConsoleService(OSConsoleServiceBase):
             all_files: bool,
             long_form: bool
     ) -> list[str]:
+        return list(self.iter_ls(path, all_files, long_form))
+
+    def iter_ls(
+        self,
+        path: PathLike[str] | str,
+        all_files: bool,
+        long_form: bool,
+        sort: bool = False
+    ) -> Iterator[str]:
         path = Path(path)
         if not path.exists():
             self._logger.error(f"Folder not found: {path}")
@@ -41,22 +124,54 @@ class LinuxConsoleService(OSConsoleServiceBase):
             self._logger.error(f"You entered {path} is not a directory")
             raise NotADirectoryError(f"{path} is not a directory")
         self._logger.info(f"Listing {path.absolute()}")
-        directory_contents: list[str] = []
-        for entry in path.iterdir():
-            if not all_files and entry.name.startswith("."):
-                continue
-            if long_form:
-                entry_info: stat_result = os.stat(entry.absolute())
-                permissions: str = stat.filemode(entry_info.st_mode)
-                nlinks: int = entry_info.st_nlink
-                owner: str = getpwuid(entry_info.st_uid).pw_name
-                group: str = getgrgid(entry_info.st_gid).gr_name
-                size: int = entry_info.st_size
-                mod_date: str = datetime.fromtimestamp(entry_info.st_mtime).strftime("%b %d %H:%M")
-                directory_contents.append(f"{permissions} {nlinks} {owner} {group} {size} {mod_date} {entry.name}\n")
-            else:
-                directory_contents.append(entry.name + "\n")
-        return directory_contents
+        if sort:
+            return self._iter_sorted_listing(path, all_files, long_form)
+        return self._iter_listing(path, all_files, long_form)
+
+    def _iter_listing(
+        self,
+        path: Path,
+        all_files: bool,
+        long_form: bool
+    ) -> Generator[str]:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not all_files and entry.name.startswith("."):
+                    continue
+                if long_form:
+                    yield self._format_long_entry(entry.name, entry.stat())
+                else:
+                    yield entry.name + "\n"
+
+    def _iter_sorted_listing(
+        self,
+        path: Path,
+        all_files: bool,
+        long_form: bool
+    ) -> Generator[str]:
+        with os.scandir(path) as entries:
+            names: Iterator[str] = external_sort(
+                entry.name for entry in entries if all_files or not entry.name.startswith(".")
+            )
+            # Only the names are buffered or spilled; each entry is stat-ed right before it is printed
+            for name in names:
+                if long_form:
+                    yield self._format_long_entry(name, os.stat(path / name))
+                else:
+                    yield name + "\n"
+
+    @staticmethod
+    def _format_long_entry(
+        name: str,
+        entry_info: stat_result
+    ) -> str:
+        permissions: str = stat.filemode(entry_info.st_mode)
+        nlinks: int = entry_info.st_nlink
+        owner: str = user_name(entry_info.st_uid)
+        group: str = group_name(entry_info.st_gid)
+        size: int = entry_info.st_size
+        mod_date: str = datetime.fromtimestamp(entry_info.st_mtime).strftime("%b %d %H:%M")
+        return f"{permissions} {nlinks} {owner} {group} {size} {mod_date} {name}\n"
 
     def cd(
         self,
@@ -77,25 +192,135 @@ class LinuxConsoleService(OSConsoleServiceBase):
     def cp(
         self,
         recursive: bool,
-        source: PathLike[str] | str,
-        dest: PathLike[str] | str
+        source: PathLike[str] | str | Sequence[PathLike[str] | str],
+        dest: PathLike[str] | str,
+        jobs: int = DEFAULT_COPY_WORKERS,
+        resumable: bool = False,
+        verify: bool = False,
+        reflink: ReflinkMode = ReflinkMode.never,
+        link: bool = False
     ) -> None:
-        source = Path(source)
-        dest = Path(dest)
-        if not source.exists():
-            self._logger.error("Folder not found")
-            raise FileNotFoundError(f"{source} does not exist")
-        if source.is_dir() and dest.is_file():
-            self._logger.error("Can't copy dir to file")
-            raise IsADirectoryError("")
-        if source.is_dir() and not recursive:
-            self._logger.error("Can't copy dir with recursive=False")
-            raise IsADirectoryError(f"Can't copy {source}, -r unspecified. Ommiting...")
+        sources: list[Path] = [Path(source)] if isinstance(source, (str, PathLike)) else [Path(s) for s in source]
+        # A clone or a link is not worth checkpointing, so those modes take precedence
+        checkpointed: bool = resumable and not link and reflink == ReflinkMode.never
+        plan: list[tuple[Path, Path, os.stat_result]] = self._plan_copy(recursive, sources, Path(dest), checkpointed)
+        replaced: list[list[str]] = []
+        kept_all: bool = True
+        if self._journal is not None:
+            for _, target, _ in plan:
+                if not os.path.lexists(target):
+                    continue
+                if checkpointed and os.path.exists(f"{target}{CHECKPOINT_SUFFIX}"):
+                    # A copy this command was interrupted in, it resumes rather than being replaced
+                    continue
+                # What the copy overwrites goes to the trash first, so undo can bring it back
+                trashed: Path | None = self._trash.move_to_trash(target) if self._trash is not None else None
+                if trashed is None:
+                    kept_all = False
+                else:
+                    replaced.append([str(target.absolute()), str(trashed)])
         self._logger.info("Starting to copy...")
-        if recursive and source.is_dir():
-            shutil.copytree(source, dest)
-        else:
-            shutil.copy(source, dest)
+        try:
+            self._copy_planned(plan, dest, jobs, checkpointed, verify, reflink, link)
+        finally:
+            copies: list[list[str]] = [
+                [str(source.absolute()), str(target.absolute())]
+                for source, target, _ in plan
+                if os.path.lexists(target)
+            ]
+            if copies or replaced:
+                self._journal_record({"op": "cp", "copies": copies, "replaced": replaced})
+            if not kept_all:
+                # Undo must stop here rather than skip to an older change
+                self._journal_record({"op": "barrier", "reason": f"cp overwrote files in {dest} with no trash to keep them"})
+
+    def _copy_planned(
+        self,
+        plan: list[tuple[Path, Path, os.stat_result]],
+        dest: PathLike[str] | str,
+        jobs: int,
+        resumable: bool,
+        verify: bool,
+        reflink: ReflinkMode,
+        link: bool
+    ) -> None:
+        if resumable:
+            # Checkpointed copies go one file at a time, the plan holds no directories then
+            for file_source, file_dest, _ in plan:
+                copied: int = resumable_copy(file_source, file_dest, verify=verify, on_progress=self._logger.info)
+                self._logger.info(f"Copied {file_source} to {file_dest}: {copied} bytes written")
+            return
+        sharing_data: bool = link or reflink != ReflinkMode.never
+        copier = ParallelCopier(
+            jobs,
+            reflink,
+            link,
+            on_copied=self._log_copy_method if sharing_data else None
+        )
+        # The stats taken while planning tell the copier which sources are trees and how big files are
+        stats: CopyStats = copier.copy_many(
+            [(source, target) for source, target, _ in plan],
+            [source_stat for _, _, source_stat in plan]
+        )
+        self._logger.info(f"Copied {len(plan)} source(s) to {dest}: {stats}")
+
+    def _log_copy_method(self, source: str, dest: str, method: str) -> None:
+        self._logger.info(f"{source} -> {dest}: {method}")
+
+    def _plan_copy(
+        self,
+        recursive: bool,
+        sources: list[Path],
+        dest: Path,
+        resumable: bool = False
+    ) -> list[tuple[Path, Path, os.stat_result]]:
+        try:
+            dest_stat: os.stat_result | None = os.stat(dest)
+        except FileNotFoundError:
+            dest_stat = None
+        dest_is_dir: bool = dest_stat is not None and stat.S_ISDIR(dest_stat.st_mode)
+        if len(sources) > 1 and not dest_is_dir:
+            self._logger.error(f"Target {dest} is not a directory")
+            raise NotADirectoryError(f"Target {dest} is not a directory")
+        plan: list[tuple[Path, Path, os.stat_result]] = []
+        targets: set[Path] = set()
+        for source in sources:
+            try:
+                source_stat: os.stat_result = os.stat(source)
+            except FileNotFoundError:
+                self._logger.error("Folder not found")
+                raise FileNotFoundError(f"{source} does not exist")
+            source_is_dir: bool = stat.S_ISDIR(source_stat.st_mode)
+            if source_is_dir and dest_stat is not None and stat.S_ISREG(dest_stat.st_mode):
+                self._logger.error("Can't copy dir to file")
+                raise IsADirectoryError("")
+            if source_is_dir and not recursive:
+                self._logger.error("Can't copy dir with recursive=False")
+                raise IsADirectoryError(f"Can't copy {source}, -r unspecified. Ommiting...")
+            if source_is_dir and resumable:
+                # A rerun would stop at the directory it already created, so there is nothing to resume
+                self._logger.error("Can't copy a directory with resumable=True")
+                raise IsADirectoryError(f"--resumable copies single files, {source} is a directory")
+            target: Path = dest / source.name if dest_is_dir else dest
+            if target.absolute() in targets:
+                self._logger.error(f"{source} would overwrite a file copied just before it")
+                raise FileExistsError(f"Will not overwrite just-created {target} with {source}")
+            try:
+                target_stat: os.stat_result | None = dest_stat if target == dest else os.stat(target)
+            except FileNotFoundError:
+                target_stat = None
+            if source_is_dir and target_stat is not None:
+                self._logger.error(f"{target} already exists")
+                raise FileExistsError(f"{target} already exists")
+            if source_is_dir and target.absolute().is_relative_to(source.absolute()):
+                self._logger.error("Can't copy a directory into itself")
+                raise OSError(f"Can't copy {source} into itself, {target}")
+            if not source_is_dir and target_stat is not None and os.path.samestat(source_stat, target_stat):
+                self._logger.error("Source and destination are the same file")
+                raise shutil.SameFileError(f"{source} and {target} are the same file")
+            targets.add(target.absolute())
+            plan.append((source, target, source_stat))
+        return plan
 
     def cat(
         self,
@@ -130,62 +355,142 @@ class LinuxConsoleService(OSConsoleServiceBase):
         if not source.exists():
             self._logger.error("Directory not found Can't move")
             raise FileNotFoundError(f"{source} does not exist")
+        # Same resolution as shutil.move, so the journal knows where the source ended up
+        target: Path = dest / source.name if dest.is_dir() else dest
         try:
             shutil.move(source, dest)
             self._logger.info("Moving...")
         except PermissionError:
             self._logger.error("Permission denied")
             raise PermissionError("Permission denied")
+        self._journal_record({"op": "mv", "moves": [[str(source.absolute()), str(target.absolute())]]})
 
     def rm(
         self,
         recursive: bool,
-        path: PathLike[str] | str
+        path: PathLike[str] | str | Sequence[PathLike[str] | str],
+        jobs: int = DEFAULT_DELETE_WORKERS,
+        permanent: bool = False
     ) -> None:
-        path = Path(path)
+        paths: list[Path] = [Path(path)] if isinstance(path, (str, PathLike)) else [Path(p) for p in path]
+        moves: list[list[str]] = []
+        errors: list[OSError] = []
+        # Like rm(1), a path that can't be removed doesn't stop the others
+        for each in paths:
+            try:
+                trashed: Path | None = self._rm_one(recursive, each, jobs, permanent)
+            except OSError as e:
+                errors.append(e)
+                continue
+            if trashed is not None:
+                moves.append([str(each.absolute()), str(trashed)])
+        # One entry for the whole command, so one undo brings every path back
+        if moves:
+            self._journal_record({"op": "rm", "moves": moves})
+        if len(errors) == 1:
+            raise errors[0]
+        if errors:
+            raise OSError("\n".join(str(e) for e in errors))
+
+    def _rm_one(
+        self,
+        recursive: bool,
+        path: Path,
+        jobs: int,
+        permanent: bool
+    ) -> Path | None:
         if not path.exists():
             self._logger.error("Path does not exist")
             raise FileNotFoundError("Can't remove file that does not exist")
         if path.absolute() == Path("/") or path.absolute() == Path("..").absolute():
             self._logger.error("Path is either a root or parent directory")
             raise PermissionError("Can't delete root or parent directory")
+        if path.is_dir() and not recursive:
+            self._logger.error("Cannot remove a directory with recursive=false")
+            raise IsADirectoryError(f"Can't delete {path} -r is required")
+        if self._trash is not None and not permanent:
+            try:
+                trashed: Path | None = self._trash.move_to_trash(path)
+            except OSError as e:
+                self._logger.error(f"Can't move {path} to trash: {e.strerror}")
+                raise
+            if trashed is not None:
+                self._logger.info(f"Moved {path} to trash: {trashed}")
+                return trashed
+            self._logger.warning(f"No trash available for {path}, removing permanently")
         if path.is_dir():
-            if not recursive:
-                self._logger.error("Cannot remove a directory with recursive=false")
-                raise IsADirectoryError(f"Can't delete {path} -r is required")
             self._logger.info("removing...")
-            shutil.rmtree(path)
+            if path.is_symlink():
+                # Only the link goes away, never the directory it points to
+                os.remove(path)
+                return None
+            stats: DeleteStats = ParallelDeleter(jobs).remove_tree(path)
+            self._logger.info(f"Removed {path}: {stats}")
         else:
             self._logger.info("removing...")
             os.remove(path)
+        return None
 
     def pack(
         self,
         folder: PathLike[str] | str,
         archive_name: PathLike[str] | str,
-        archive_format: Literal[ArchiveFormat.gztar, ArchiveFormat.zipfile]
-    ) -> None:
+        archive_format: ArchiveFormat,
+        level: int | None = None,
+        jobs: int = DEFAULT_COMPRESS_WORKERS
+    ) -> PackStats:
         folder = Path(folder)
-        archive_name = Path(archive_name)
         if not folder.exists():
             self._logger.error("folder does not exist")
             raise FileNotFoundError(f"You entered {folder} an unexisting directory")
         if not folder.is_dir():
             self._logger.error("folder is not a directory. Archivation unavailable")
             raise NotADirectoryError(f"{folder} is not a directory")
-        if archive_name.exists():
-            self._logger.error(f"{archive_name.name} already exists")
-            raise FileExistsError(f"{archive_name.name} exists. Cant't archive")
+        if archive_format == ArchiveFormat.zipfile:
+            pack_archive: Callable[..., PackStats] = pack_zip
+            extensions: tuple[str, ...] = (ExtensionName.zipfile,)
+            level = DEFAULT_COMPRESS_LEVEL if level is None else min(level, 9)
+        else:
+            codec: Codec = self._codec(archive_format)
+            pack_archive = partial(pack_tar, codec=codec)
+            extensions = codec.extensions
+            level = codec.level(level)
+        if str(archive_name) == STDOUT:
+            if sys.stdout.isatty():
+                self._logger.error("Refusing to write archive data to a terminal")
+                raise OSError(errno.ENOTTY, "Refusing to write archive data to a terminal, redirect or pipe stdout")
+            self._logger.info("Archiving a directory")
+            stats: PackStats = pack_archive(folder, sys.stdout.buffer, level, jobs)
+            self._logger.debug(f"Packed {folder} to stdout: {stats}")
+            return stats
+        # Written exactly where asked, the format's extension is only added when missing
+        output: Path = Path(archive_name)
+        if not output.name.endswith(extensions):
+            output = output.with_name(output.name + extensions[0])
+        if output.exists():
+            self._logger.error(f"{output.name} already exists")
+            raise FileExistsError(f"{output.name} exists. Cant't archive")
+        if not output.parent.is_dir():
+            self._logger.error(f"Destination directory {output.parent} does not exist")
+            raise FileNotFoundError(f"{output.parent} does not exist")
         self._logger.info("Archiving a directory")
-        archive_name = Path(os.path.splitext(archive_name)[0])
-        shutil.make_archive(base_name=archive_name.name, base_dir=str(folder), format=archive_format)
+        with output.open("xb") as out:
+            try:
+                stats = pack_archive(folder, out, level, jobs)
+            except BaseException:
+                output.unlink(missing_ok=True)
+                raise
+        self._logger.debug(f"Packed {folder} into {output}: {stats}")
+        return stats
 
     def unpack(
         self,
         archive: PathLike[str] | str,
         dest: PathLike[str] | str,
-        archive_format: Literal[ArchiveFormat.gztar, ArchiveFormat.zipfile]
-    ) -> None:
+        archive_format: ArchiveFormat,
+        members: MemberFilter | None = None,
+        jobs: int = DEFAULT_EXTRACT_WORKERS
+    ) -> ExtractStats:
         archive = Path(archive)
         dest = Path(dest)
         if not archive.exists():
@@ -194,62 +499,246 @@ class LinuxConsoleService(OSConsoleServiceBase):
         if not dest.exists():
             self._logger.error("Destination does not exist")
             raise FileNotFoundError(f"{dest} does not exist")
-        match archive_format:
-            case ArchiveFormat.gztar:
-                extension: str = ExtensionName.gztar
-            case ArchiveFormat.zipfile:
-                extension = ExtensionName.zipfile
-        if not str(archive).endswith(extension) or not archive.is_file():
-            self._logger.error("Invalid format")
+        detected: ArchiveFormat | None = self._detect_archive(archive, archive_format)
+        if detected is None:
             raise WrongFormatError(f"Can't unpack {archive}")
         self._logger.info("Unpacking archive")
-        shutil.unpack_archive(archive, dest, archive_format)
+        extract: Callable[..., ExtractStats] = extract_zip if detected == ArchiveFormat.zipfile else extract_tar
+        try:
+            stats: ExtractStats = extract(archive, dest, members, jobs)
+        except OSError as e:
+            self._logger.error(f"Unpacking {archive} failed: {e}")
+            raise
+        self._logger.debug(f"Unpacked {detected.value} archive {archive} into {dest}: {stats}")
+        return stats
+
+    def list_archive(
+        self,
+        archive: PathLike[str] | str,
+        archive_format: ArchiveFormat,
+        long_form: bool = False
+    ) -> Generator[str]:
+        archive = Path(archive)
+        if not archive.exists():
+            self._logger.error("Archive does not exist")
+            raise FileNotFoundError(f"{archive} does not exist")
+        detected: ArchiveFormat | None = self._detect_archive(archive, archive_format)
+        if detected is None:
+            raise WrongFormatError(f"Can't list {archive}")
+        self._logger.info(f"Listing archive {archive}")
+        if detected == ArchiveFormat.zipfile:
+            return self._iter_zip_listing(archive)
+        return self._iter_tar_listing(archive, long_form)
+
+    def _detect_archive(
+        self,
+        archive: Path,
+        archive_format: ArchiveFormat
+    ) -> ArchiveFormat | None:
+        """
+        The format is read from the archive's magic bytes, whatever its name.
+        The command still decides between the zip and the tar family, any tar
+        codec is accepted where a tar is expected.
+        """
+        detected: ArchiveFormat | None = detect_format(archive) if archive.is_file() else None
+        if detected is None or (detected == ArchiveFormat.zipfile) != (archive_format == ArchiveFormat.zipfile):
+            self._logger.error("Invalid format")
+            return None
+        if detected != ArchiveFormat.zipfile:
+            self._codec(detected)
+        return detected
+
+    def _codec(
+        self,
+        archive_format: ArchiveFormat
+    ) -> Codec:
+        try:
+            return codec_for(archive_format)
+        except CodecUnavailableError as e:
+            self._logger.error(str(e))
+            raise
+
+    @staticmethod
+    def _iter_tar_listing(
+        archive: Path,
+        long_form: bool
+    ) -> Generator[str]:
+        # Like tar -t and tar -tv
+        for member in iter_tar_entries(archive):
+            name: str = member.name + "/" if member.isdir() else member.name
+            if not long_form:
+                yield name + "\n"
+                continue
+            file_type: int = stat.S_IFDIR if member.isdir() else stat.S_IFLNK if member.issym() else stat.S_IFREG
+            owner: str = f"{member.uname or member.uid}/{member.gname or member.gid}"
+            mod_date: str = datetime.fromtimestamp(member.mtime).strftime("%Y-%m-%d %H:%M")
+            link: str = f" -> {member.linkname}" if member.issym() else ""
+            yield f"{stat.filemode(file_type | member.mode)} {owner} {member.size:>9} {mod_date} {name}{link}\n"
+
+    @staticmethod
+    def _iter_zip_listing(
+        archive: Path
+    ) -> Generator[str]:
+        # Like unzip -l
+        yield "  Length      Date    Time    Name\n"
+        yield "---------  ---------- -----   ----\n"
+        total: int = 0
+        files: int = 0
+        for info in iter_zip_entries(archive):
+            year, month, day, hour, minute = info.date_time[:5]
+            yield f"{info.file_size:>9}  {year:04}-{month:02}-{day:02} {hour:02}:{minute:02}   {info.filename}\n"
+            total += info.file_size
+            files += 1
+        yield "---------                     -------\n"
+        yield f"{total:>9}                     {files} file{'' if files == 1 else 's'}\n"
 
     def grep(
         self,
         recursive: bool,
         ignorecase: bool,
         pattern: str,
-        files: Sequence[PathLike[str] | str]
+        files: Sequence[PathLike[str] | str],
+        jobs: int = 1,
+        binary_files: BinaryFiles = BinaryFiles.binary,
+        rules: IgnoreRules | None = None,
+        archives: bool = False
     ) -> Generator[str]:
+        pattern = pattern.strip("\"")
+        try:
+            matcher: Matcher = compile_matcher(pattern, ignorecase)
+        except re.error as e:
+            self._logger.error(f"Invalid pattern: {e}")
+            raise
+        targets: Iterator[Path] = self._iter_grep_targets(recursive, files, rules or IgnoreRules(), matcher, archives)
+        if jobs > 1:
+            self._logger.info(f"Searching with {jobs} workers")
+            yield from parallel_search(
+                targets, pattern, ignorecase, jobs, binary_files, on_error=self._on_search_error, archives=archives
+            )
+            return
+        for file in targets:
+            yield from self.search_in_file(file, matcher, binary_files, archives)
+
+    def _iter_grep_targets(
+        self,
+        recursive: bool,
+        files: Sequence[PathLike[str] | str],
+        rules: IgnoreRules,
+        matcher: Matcher,
+        archives: bool = False
+    ) -> Generator[Path]:
         for file in files:
-            try:
-                file = Path(file)
-                pattern = pattern.strip("\"")
-                if not file.exists():
-                    self._logger.error("File does not exist")
-                    raise FileNotFoundError(f"{file} does not exist")
-                if not recursive and file.is_dir():
-                    self._logger.error("-r unspecified and file is a directory")
-                    raise IsADirectoryError(f"{file} is a directory")
-                if file.is_dir():
-                    for child_file in file.rglob("*"):
-                        if child_file.is_file():
-                            yield from self.search_in_file(child_file, pattern, ignorecase)
-                if file.is_file():
-                    yield from self.search_in_file(file, pattern, ignorecase)
-            except Exception as e:
-                raise e
+            file = Path(file)
+            if not file.exists():
+                self._logger.error("File does not exist")
+                raise FileNotFoundError(f"{file} does not exist")
+            if not recursive and file.is_dir():
+                self._logger.error("-r unspecified and file is a directory")
+                raise IsADirectoryError(f"{file} is a directory")
+            if file.is_dir():
+                is_candidate: Callable[[DirEntry[str]], bool] | None = self._index_filter(file, matcher)
+                for entry in walk(file, rules, onerror=self._skip_unreadable):
+                    if entry.name.startswith(INDEX_FILENAME) or not entry.is_file():
+                        continue
+                    # The index only knows an archive's compressed bytes, its members have to be read
+                    if is_candidate is None or is_candidate(entry) or (archives and format_from_name(Path(entry.path))):
+                        yield Path(entry.path)
+            if file.is_file() and rules.allows_file(file.name):
+                yield file
+
+    def _skip_unreadable(
+        self,
+        error: OSError
+    ) -> None:
+        # A search goes on past directories it can't list, like grep -r
+        self._logger.warning(f"Skipping {error.filename}: {error.strerror}")
+
+    def _index_filter(
+        self,
+        directory: Path,
+        matcher: Matcher
+    ) -> Callable[[DirEntry[str]], bool] | None:
+        if matcher.literal is None:
+            return None
+        index: TrigramIndex | None = TrigramIndex.locate(directory)
+        if index is None:
+            return None
+        try:
+            candidates: set[str] | None = index.candidates(matcher.literal)
+            if candidates is None:
+                return None
+            states: dict[str, tuple[int, int]] = index.file_states()
+        except sqlite3.Error as e:
+            self._logger.error(f"Trigram index at {index.root} is unusable: {e}")
+            return None
+        finally:
+            index.close()
+        self._logger.info(f"Using trigram index at {index.root}: {len(candidates)} candidate files")
+
+        def is_candidate(entry: DirEntry[str]) -> bool:
+            path: str = index.relative(entry.path)
+            if path in candidates or path not in states:
+                return True
+            entry_stat: stat_result = entry.stat()
+            return (entry_stat.st_mtime_ns, entry_stat.st_size) != states[path]
+
+        return is_candidate
 
     def search_in_file(
         self,
         file: Path,
-        pattern: str,
-        ignorecase: bool
+        matcher: Matcher,
+        binary_files: BinaryFiles = BinaryFiles.binary,
+        archives: bool = False
     ) -> Generator[str]:
         try:
-            flags: int = re.IGNORECASE if ignorecase else 0
-            compiled_pattern: re.Pattern = re.compile(pattern, flags)
-            file_contents: str = file.read_text(encoding="utf-8", errors="ignore")
-            for line_num, line in enumerate(file_contents.splitlines(), 1):
-                if compiled_pattern.search(line):
-                    yield f"{file.name}: {line_num}:{line}\n"
+            yield from scan_target(file, matcher, binary_files, archives)
         except Exception:
-            self._logger.error("An error occured. Skipping...")
+            self._on_search_error(file)
+
+    def _on_search_error(self, file: Path) -> None:
+        self._logger.error("An error occured. Skipping...")
+
+    def build_index(
+        self,
+        directory: PathLike[str] | str
+    ) -> IndexStats:
+        directory = Path(directory)
+        if not directory.exists():
+            self._logger.error(f"Folder not found: {directory}")
+            raise FileNotFoundError(f"{directory} does not exist")
+        if not directory.is_dir():
+            self._logger.error(f"You entered {directory} is not a directory")
+            raise NotADirectoryError(f"{directory} is not a directory")
+        self._logger.info(f"Building trigram index of {directory.absolute()}")
+        index = TrigramIndex(directory)
+        try:
+            stats: IndexStats = index.build()
+        except sqlite3.Error as e:
+            self._logger.error(f"Could not build index: {e}")
+            raise OSError(f"Could not build index of {directory}: {e}")
+        finally:
+            index.close()
+        self._logger.info(f"Index of {directory} updated: {stats}")
+        return stats
 
-    def history(self) -> list[str]:
+    def history(
+        self,
+        last: int | None = None,
+        find: str | None = None,
+        search: str | None = None
+    ) -> list[str]:
         try:
-            history: list[tuple[int, str]] = self._history.get_history()
+            history: list[tuple[int, str]]
+            if search is not None:
+                history = self._history.search_ranked(search, last or SEARCH_LIMIT)
+            elif find is not None:
+                # Streamed through a bounded deque, so only the kept matches are in memory
+                history = list(deque(self._history.search(find), maxlen=last))
+            elif last is not None:
+                history = self._history.tail(last)
+            else:
+                history = self._history.get_history()
             self._logger.info("Listing history...")
             return [f"{num}: {command}\n" for num, command in history]
         except Exception as e:
@@ -257,52 +746,103 @@ class LinuxConsoleService(OSConsoleServiceBase):
             raise
 
     def undo(self) -> None:
+        if self._journal is None:
+            self._logger.error("Undo journal is disabled")
+            raise FileNotFoundError("Nothing to undo")
+        entry: dict | None = self._journal.pop_undo()
+        if entry is None:
+            self._logger.info("Nothing to undo")
+            return
         try:
-            history: list[tuple[int, str]] = self._history.get_history()
-            for _, command in reversed(history):
-                match command:
-                    case command.startswith("cp"):
-                        self.undo_cp(command)
-                        return
-                    case command.startswith("mv"):
-                        self.undo_mv(command)
-                        return
-                    case command.startswith("rm"):
-                        self.undo_rm(command)
-                        return
-        except OSError as e:
-            raise e
-
-    def undo_mv(
-        self,
-        command: str
-    ) -> None:
-        try:
-            splitted_command: list[str] = shlex.split(command)
-            self.mv(splitted_command[-1], splitted_command[-2])
+            self._replay(entry, reverse=True)
+        except JournalEntryGoneError as e:
+            # Nothing left to put back, keeping the entry would block everything before it
+            self._logger.warning(f"Dropped {entry['op']} from the undo journal: {e}")
+            raise
         except OSError:
-            self._logger.error("Permission denied")
+            self._journal.push_undo(entry)
             raise
+        self._journal.push_redo(entry)
+        self._logger.info(f"Undid {entry['op']}")
 
-    def undo_cp(
-        self,
-        command: str
-    ) -> None:
+    def redo(self) -> None:
+        if self._journal is None:
+            self._logger.error("Undo journal is disabled")
+            raise FileNotFoundError("Nothing to redo")
+        entry: dict | None = self._journal.pop_redo()
+        if entry is None:
+            self._logger.info("Nothing to redo")
+            return
         try:
-            splitted_command: list[str] = shlex.split(command)
-            dest: Path = Path(splitted_command[-1])
-            sources: list[Path] = [Path(path) for path in splitted_command[1:] if path != "-r"]
-            if dest.is_dir():
-                for source in sources:
-                    copied_dir_path: Path = dest / source.name
-                    self.rm(True, copied_dir_path)
-            if dest.is_file():
-                self.rm(False, dest)
+            self._replay(entry, reverse=False)
+        except JournalEntryGoneError as e:
+            self._logger.warning(f"Dropped {entry['op']} from the redo journal: {e}")
+            raise
         except OSError:
+            self._journal.push_redo(entry)
             raise
+        self._journal.push_undo(entry)
+        self._logger.info(f"Redid {entry['op']}")
+
+    def _journal_record(self, entry: dict) -> None:
+        if self._journal is not None:
+            self._journal.record(entry)
 
-    def undo_rm(
+    def _replay(self, entry: dict, reverse: bool) -> None:
+        match entry:
+            case {"op": "mv" | "rm", "moves": moves}:
+                self._replay_moves(moves, reverse)
+            case {"op": "cp", "copies": copies} if reverse:
+                for target, _ in self._still_present([(target, source) for source, target in reversed(copies)]):
+                    self._discard(Path(target))
+                self._replay_moves(entry.get("replaced", []), reverse, required=False)
+            case {"op": "cp", "copies": copies}:
+                self._replay_moves(entry.get("replaced", []), reverse, required=False)
+                ParallelCopier().copy_many([(Path(source), Path(target)) for source, target in self._still_present(copies)])
+            case {"op": "barrier", "reason": reason}:
+                self._logger.error(f"Can't undo past: {reason}")
+                raise PermissionError(f"Can't undo past: {reason}")
+            case _:
+                self._logger.error(f"Unknown journal entry: {entry}")
+                raise ValueError(f"Can't replay {entry}")
+
+    def _replay_moves(
         self,
-        command: str
+        moves: list[tuple[str, str]],
+        reverse: bool,
+        required: bool = True
     ) -> None:
-        pass
+        # mv, rm and cp's overwritten files (into the trash) are all renames, undoing one swaps the ends
+        pairs: list[tuple[str, str]] = [(dst, src) for src, dst in reversed(moves)] if reverse else moves
+        for move_from, move_to in self._still_present(pairs, required):
+            if os.path.lexists(move_to):
+                self._logger.error(f"{move_to} already exists")
+                raise FileExistsError(f"Can't move {move_from} back, {move_to} exists")
+            shutil.move(move_from, move_to)
+
+    def _still_present(
+        self,
+        pairs: list[tuple[str, str]],
+        required: bool = True
+    ) -> list[tuple[str, str]]:
+        """
+        The pairs whose first path, the one replay takes from, still exists.
+        A trash entry may have been purged or a copy removed by hand since.
+        """
+        present: list[tuple[str, str]] = []
+        for pair in pairs:
+            if os.path.lexists(pair[0]):
+                present.append(pair)
+            else:
+                self._logger.warning(f"{pair[0]} is gone, skipping it")
+        if required and pairs and not present:
+            raise JournalEntryGoneError(f"{pairs[0][0]} is gone, nothing to replay")
+        return present
+
+    def _discard(self, path: Path) -> None:
+        if self._trash is not None and self._trash.move_to_trash(path) is not None:
+            return
+        if path.is_dir() and not path.is_symlink():
+            ParallelDeleter().remove_tree(path)
+        else:
+            os.remove(path)
@@ -0,0 +1,77 @@
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Generator
+
+
+REGEX_METACHARACTERS: frozenset[str] = frozenset(".^$*+?{}[]\\|()")
+PATTERN_CACHE_SIZE: int = 32
+
+
+def decode_line(raw_line: bytes) -> str:
+    return raw_line.decode("utf-8", errors="ignore").removesuffix("\r")
+
+
+def split_block(block: bytes) -> list[str]:
+    lines: list[str] = block.decode("utf-8", errors="ignore").split("\n")
+    if block.endswith(b"\n"):
+        lines.pop()
+    return [line.removesuffix("\r") for line in lines]
+
+
+class Matcher(ABC):
+    literal: bytes | None = None
+
+    @abstractmethod
+    def search_block(self, block: bytes) -> Generator[tuple[int, str]]:
+        ...
+
+
+class RegexMatcher(Matcher):
+    def __init__(self, pattern: str, ignorecase: bool):
+        flags: int = re.IGNORECASE if ignorecase else 0
+        self._compiled: re.Pattern = re.compile(pattern, flags)
+
+    def search_block(self, block: bytes) -> Generator[tuple[int, str]]:
+        search = self._compiled.search
+        for index, line in enumerate(split_block(block)):
+            if search(line):
+                yield index, line
+
+
+class LiteralMatcher(Matcher):
+    def __init__(self, pattern: str, ignorecase: bool):
+        self._ignorecase = ignorecase
+        self.literal = pattern.encode()
+        self._needle: bytes = pattern.lower().encode() if ignorecase else pattern.encode()
+
+    def search_block(self, block: bytes) -> Generator[tuple[int, str]]:
+        haystack: bytes = block.lower() if self._ignorecase else block
+        index: int = 0
+        counted_to: int = 0
+        pos: int = haystack.find(self._needle)
+        while pos != -1:
+            start: int = block.rfind(b"\n", 0, pos) + 1
+            end: int = block.find(b"\n", pos)
+            if end == -1:
+                end = len(block)
+            index += block.count(b"\n", counted_to, start)
+            counted_to = start
+            yield index, decode_line(block[start:end])
+            pos = haystack.find(self._needle, end + 1)
+
+
+def is_literal(pattern: str, ignorecase: bool) -> bool:
+    if not pattern or "\n" in pattern:
+        return False
+    if ignorecase and not pattern.isascii():
+        # bytes.lower() only folds ASCII, leave unicode case folding to re
+        return False
+    return REGEX_METACHARACTERS.isdisjoint(pattern)
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_matcher(pattern: str, ignorecase: bool) -> Matcher:
+    if is_literal(pattern, ignorecase):
+        return LiteralMatcher(pattern, ignorecase)
+    return RegexMatcher(pattern, ignorecase)
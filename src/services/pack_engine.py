@@ -0,0 +1,134 @@
+import io
+import os
+import stat
+import tarfile
+import time
+from pathlib import Path
+from typing import BinaryIO
+from typing import Iterator
+
+from src.enums.archive_format import ArchiveFormat
+from src.services.codec_registry import CODECS
+from src.services.codec_registry import Codec
+from src.services.parallel_compress import DEFAULT_COMPRESS_LEVEL
+from src.services.parallel_compress import DEFAULT_COMPRESS_WORKERS
+from src.services.zip_writer import ParallelZipWriter
+
+
+# Archive name that streams the archive to stdout
+STDOUT: str = "-"
+# Source files are read in chunks this large, never as a whole
+READ_BUFFER_SIZE: int = 1024 * 1024
+
+
+class PackStats:
+    def __init__(self):
+        self.files: int = 0
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+        self.started: float = time.perf_counter()
+        self.seconds: float = 0.0
+
+    def finish(self, bytes_in: int, bytes_out: int) -> "PackStats":
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    @property
+    def rate(self) -> float:
+        return self.bytes_in / self.seconds if self.seconds else 0.0
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} files, {self.bytes_in} -> {self.bytes_out} bytes ({self.ratio:.1%}) "
+            f"in {self.seconds:.2f}s ({self.rate / 1024 / 1024:.1f} MiB/s)"
+        )
+
+
+def pack_tar(
+    folder: Path,
+    out: BinaryIO,
+    level: int | None = None,
+    workers: int = DEFAULT_COMPRESS_WORKERS,
+    codec: Codec = CODECS[ArchiveFormat.gztar]
+) -> PackStats:
+    """
+    Stream a tar of the folder through the codec's parallel block writer.
+    The members are laid out like make_archive lays them out, under the
+    folder path itself.
+    """
+    stats = PackStats()
+    base: str = os.path.normpath(folder)
+    with codec.writer(out, level, workers) as compressed:
+        with tarfile.open(fileobj=compressed, mode="w|", copybufsize=READ_BUFFER_SIZE) as tar:
+            tar.add(base, arcname=base, recursive=False)
+            for path, is_dir in walk_tree(base, output_identity(out)):
+                tar.add(path, arcname=path, recursive=False)
+                if not is_dir and os.path.isfile(path):
+                    stats.files += 1
+                # Only reading needs the member list, writing it out would grow with the tree
+                tar.members.clear()
+    return stats.finish(compressed.bytes_in, compressed.bytes_out)
+
+
+def pack_zip(
+    folder: Path,
+    out: BinaryIO,
+    level: int = DEFAULT_COMPRESS_LEVEL,
+    workers: int = DEFAULT_COMPRESS_WORKERS
+) -> PackStats:
+    stats = PackStats()
+    base: str = os.path.normpath(folder)
+    with ParallelZipWriter(out, level, workers, READ_BUFFER_SIZE) as zf:
+        if base != os.curdir:
+            zf.add_dir(base, base)
+        # Same entries as make_archive: directories included, only regular files
+        for path, is_dir in walk_tree(base, output_identity(out)):
+            if is_dir:
+                zf.add_dir(path, path)
+            elif os.path.isfile(path):
+                zf.add_file(path, path)
+                stats.files += 1
+    return stats.finish(zf.bytes_in, zf.bytes_out)
+
+
+def walk_tree(base: str, skip: tuple[int, int] | None = None) -> Iterator[tuple[str, bool]]:
+    """
+    Yield (path, is_dir) for everything under base in make_archive's order,
+    leaving out the file identified by skip, the archive being written.
+    A directory that can't be listed fails the pack rather than leaving
+    a hole in the archive.
+    """
+    for dirpath, dirnames, filenames in os.walk(base, onerror=_raise):
+        dirnames.sort()
+        for name in dirnames:
+            yield os.path.normpath(os.path.join(dirpath, name)), True
+        for name in sorted(filenames):
+            path: str = os.path.normpath(os.path.join(dirpath, name))
+            if skip is not None:
+                try:
+                    st: os.stat_result = os.stat(path)
+                except OSError:
+                    pass
+                else:
+                    if (st.st_dev, st.st_ino) == skip:
+                        continue
+            yield path, False
+
+
+def _raise(error: OSError) -> None:
+    raise error
+
+
+def output_identity(out: BinaryIO) -> tuple[int, int] | None:
+    # Packing into the folder being packed must not read back its own growing output
+    try:
+        st: os.stat_result = os.fstat(out.fileno())
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    return (st.st_dev, st.st_ino) if stat.S_ISREG(st.st_mode) else None
@@ -0,0 +1,143 @@
+import gzip
+import os
+import zlib
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO
+from typing import Callable
+from typing import Self
+
+
+DEFAULT_COMPRESS_WORKERS: int = os.cpu_count() or 1
+DEFAULT_COMPRESS_LEVEL: int = 6
+COMPRESS_BLOCK_SIZE: int = 1024 * 1024
+# Deflate can refer back 32 KiB, so that much of the previous block primes the next one
+DICTIONARY_SIZE: int = 32 * 1024
+
+
+def gzip_member(block: bytes, level: int) -> bytes:
+    return gzip.compress(block, compresslevel=level, mtime=0)
+
+
+def deflate_block(block: bytes, level: int, dictionary: bytes, last: bool) -> bytes:
+    """
+    Raw deflate one block of a stream. Blocks end on a sync flush (the last
+    one finishes the stream), so compressed blocks concatenate into a single
+    valid deflate stream, the same way pigz splits its work.
+    """
+    compressor = (
+        zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+        if dictionary
+        else zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    )
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class CountingWriter:
+    def __init__(self, out: BinaryIO):
+        self.out = out
+        self.written: int = 0
+
+    def write(self, data: bytes) -> int:
+        self.out.write(data)
+        self.written += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self.out.flush()
+
+
+class OrderedPoolWriter:
+    """
+    Base for writers that compress on a thread pool but must write results
+    in submission order. At most a couple of tasks per worker are queued
+    ahead of the output, which bounds memory.
+    """
+
+    def __init__(self, out: BinaryIO, workers: int = DEFAULT_COMPRESS_WORKERS):
+        self.out = CountingWriter(out)
+        self.workers = workers
+        self._pending: deque[Future] = deque()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+
+    @property
+    def bytes_out(self) -> int:
+        return self.out.written
+
+    def _queue(self, future: Future) -> None:
+        self._pending.append(future)
+        # Bounded read-ahead, memory stays at a few blocks per worker
+        while len(self._pending) >= self.workers * 2:
+            self._emit(self._pending.popleft().result())
+
+    def _drain(self) -> None:
+        while self._pending:
+            self._emit(self._pending.popleft().result())
+
+    def _emit(self, result) -> None:
+        self.out.write(result)
+
+    def close(self) -> None:
+        try:
+            self._drain()
+            self.out.flush()
+        finally:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._shutdown()
+
+
+class ParallelBlockWriter(OrderedPoolWriter):
+    """
+    File-like writer that compresses fixed-size blocks on a thread pool and
+    writes each one as a separate member, in order. The codecs release the
+    GIL while they compress, so blocks really compress in parallel, and
+    every codec used here reads concatenated members back to back.
+    """
+
+    def __init__(
+        self,
+        out: BinaryIO,
+        compress_block: Callable[[bytes], bytes],
+        workers: int = DEFAULT_COMPRESS_WORKERS,
+        block_size: int = COMPRESS_BLOCK_SIZE
+    ):
+        super().__init__(out, workers)
+        self.compress_block = compress_block
+        self.block_size = block_size
+        self.bytes_in: int = 0
+        self._buffer = bytearray()
+        self._members: int = 0
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self.bytes_in += len(data)
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[:self.block_size]))
+            del self._buffer[:self.block_size]
+        return len(data)
+
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        # An empty input still has to come out as one (empty) member
+        if self._buffer or not self._members:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        super().close()
+
+    def _submit(self, block: bytes) -> None:
+        self._queue(self._pool.submit(self.compress_block, block))
+        self._members += 1
@@ -0,0 +1,5 @@
+import os
+
+
+# Threads mostly wait on syscalls, so there are a few more than cores (the ThreadPoolExecutor default)
+DEFAULT_IO_WORKERS: int = min(32, (os.cpu_count() or 1) + 4)
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from os import PathLike
+from typing import Callable
+
+
+CHECKPOINT_SUFFIX: str = ".cp-checkpoint"
+RESUMABLE_CHUNK_SIZE: int = 64 * 1024 * 1024
+PROGRESS_INTERVAL: float = 2.0
+
+
+class CopyProgress:
+    def __init__(self, total: int, done: int = 0, interval: float = PROGRESS_INTERVAL):
+        self.total = total
+        self.done = done
+        self.interval = interval
+        self.started: float = time.perf_counter()
+        # Bytes that were already there on resume do not count towards throughput
+        self._resumed_from: int = done
+        self._last_report: float = self.started
+
+    def advance(self, copied: int) -> str | None:
+        self.done += copied
+        now: float = time.perf_counter()
+        if now - self._last_report < self.interval and self.done < self.total:
+            return None
+        self._last_report = now
+        return str(self)
+
+    @property
+    def transferred(self) -> int:
+        return self.done - self._resumed_from
+
+    @property
+    def rate(self) -> float:
+        seconds: float = time.perf_counter() - self.started
+        return self.transferred / seconds if seconds else 0.0
+
+    @property
+    def eta(self) -> float:
+        return (self.total - self.done) / self.rate if self.rate else 0.0
+
+    def __str__(self) -> str:
+        percent: float = self.done / self.total * 100 if self.total else 100.0
+        return (
+            f"{self.done / 2**20:.1f}/{self.total / 2**20:.1f} MiB ({percent:.0f}%), "
+            f"{self.rate / 2**20:.1f} MiB/s, ETA {self.eta:.0f}s"
+        )
+
+
+class Checkpoint:
+    def __init__(self, path: str, source: str, size: int, mtime_ns: int, chunk_size: int):
+        self.path = path
+        self.source = source
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.chunk_size = chunk_size
+        self.offset: int = 0
+        self.checksums: list[str] = []
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint | None":
+        try:
+            with open(path, encoding="utf-8") as f:
+                data: dict = json.load(f)
+            checkpoint = cls(path, data["source"], data["size"], data["mtime_ns"], data["chunk_size"])
+            checkpoint.offset = data["offset"]
+            checkpoint.checksums = data["checksums"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return checkpoint
+
+    def matches(self, other: "Checkpoint") -> bool:
+        return (self.source, self.size, self.mtime_ns, self.chunk_size) == (
+            other.source, other.size, other.mtime_ns, other.chunk_size
+        )
+
+    def save(self) -> None:
+        # Written aside and renamed so a crash never leaves a half-written checkpoint
+        temporary: str = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({
+                "source": self.source,
+                "size": self.size,
+                "mtime_ns": self.mtime_ns,
+                "chunk_size": self.chunk_size,
+                "offset": self.offset,
+                "checksums": self.checksums,
+            }, f)
+        os.replace(temporary, self.path)
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def resumable_copy(
+    source: PathLike[str] | str,
+    dest: PathLike[str] | str,
+    chunk_size: int = RESUMABLE_CHUNK_SIZE,
+    verify: bool = False,
+    on_progress: Callable[[str], None] | None = None
+) -> int:
+    """
+    Copy SOURCE to DEST chunk by chunk, checkpointing after every chunk so
+    an interrupted copy picks up at the last checkpoint. Returns the number
+    of bytes copied by this call.
+    """
+    source, dest = os.fspath(source), os.fspath(dest)
+    source_stat: os.stat_result = os.stat(source)
+    checkpoint = Checkpoint(
+        dest + CHECKPOINT_SUFFIX,
+        os.path.abspath(source),
+        source_stat.st_size,
+        source_stat.st_mtime_ns,
+        chunk_size,
+    )
+    previous: Checkpoint | None = Checkpoint.load(checkpoint.path)
+    if previous is not None and previous.matches(checkpoint) and _copied_prefix_intact(dest, previous, verify):
+        checkpoint = previous
+    else:
+        checkpoint.save()
+
+    progress = CopyProgress(checkpoint.size, checkpoint.offset)
+    with open(source, "rb") as fsrc, open(dest, "r+b" if checkpoint.offset else "w+b") as fdst:
+        # Anything past the checkpoint was written after the last fsync and can't be trusted
+        fdst.truncate(checkpoint.offset)
+        fsrc.seek(checkpoint.offset)
+        fdst.seek(checkpoint.offset)
+        while chunk := fsrc.read(chunk_size):
+            fdst.write(chunk)
+            if verify:
+                checkpoint.checksums.append(_checksum_written(fdst, chunk, checkpoint.offset))
+            fdst.flush()
+            os.fsync(fdst.fileno())
+            checkpoint.offset += len(chunk)
+            checkpoint.save()
+            message: str | None = progress.advance(len(chunk))
+            if message is not None and on_progress is not None:
+                on_progress(f"{dest}: {message}")
+    shutil.copystat(source, dest)
+    checkpoint.remove()
+    return progress.transferred
+
+
+def _checksum_written(fdst, chunk: bytes, offset: int) -> str:
+    expected: str = hashlib.sha256(chunk).hexdigest()
+    fdst.flush()
+    written: str = hashlib.sha256(os.pread(fdst.fileno(), len(chunk), offset)).hexdigest()
+    if written != expected:
+        raise OSError(f"Checksum mismatch at offset {offset} of {fdst.name}")
+    return expected
+
+
+def _copied_prefix_intact(dest: str, checkpoint: Checkpoint, verify: bool) -> bool:
+    try:
+        if os.stat(dest).st_size < checkpoint.offset:
+            return False
+        if not verify:
+            return True
+        # A copy started without verification has nothing to check the prefix against
+        if len(checkpoint.checksums) != checkpoint.offset // checkpoint.chunk_size:
+            return False
+        with open(dest, "rb") as f:
+            for expected in checkpoint.checksums:
+                if hashlib.sha256(f.read(checkpoint.chunk_size)).hexdigest() != expected:
+                    return False
+    except OSError:
+        return False
+    return True
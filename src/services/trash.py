@@ -0,0 +1,210 @@
+import errno
+import json
+import os
+import shutil
+import threading
+import time
+from os import PathLike
+from pathlib import Path
+
+from src.services.delete_engine import ParallelDeleter
+from src.services.walker import skip_unreadable
+from src.services.walker import walk
+
+
+TRASH_DIR: Path = Path.home() / ".local" / "share" / "console-app" / "trash"
+TRASH_MAX_BYTES: int = 1024 * 1024 * 1024
+TRASH_MAX_AGE: float = 7 * 24 * 60 * 60
+# Per session, the size of each entry, measured once after it is trashed
+SIZES_NAME: str = ".sizes"
+# rename(2) can't leave the filesystem, and a mount may not let us create a trash at all
+TRASH_FALLBACK_ERRNOS: frozenset[int] = frozenset({errno.EXDEV, errno.EACCES, errno.EPERM, errno.EROFS})
+
+
+def mount_point(path: Path) -> Path:
+    device: int = os.lstat(path).st_dev
+    for parent in path.parents:
+        if os.lstat(parent).st_dev != device:
+            return path
+        path = parent
+    return path
+
+
+def contains(directory: Path, path: Path) -> bool:
+    real_directory: str = os.path.realpath(directory)
+    return os.path.commonpath([real_directory, os.path.realpath(path)]) == real_directory
+
+
+def disk_usage(path: Path) -> int:
+    if path.is_symlink() or not path.is_dir():
+        return os.lstat(path).st_size
+    return sum(entry.stat(follow_symlinks=False).st_size for entry in walk(path, onerror=skip_unreadable))
+
+
+class Trash:
+    """
+    Session trash: rm renames paths into it, undo renames them back from
+    the entry path the undo journal recorded.
+
+    Each shell session gets its own directory, named after its start time so
+    sessions sort chronologically. Trash on another filesystem than TRASH_DIR
+    lives at the root of that mount, since rename can't cross filesystems.
+    """
+
+    def __init__(
+        self,
+        root: PathLike[str] | str = TRASH_DIR,
+        max_bytes: int = TRASH_MAX_BYTES,
+        max_age: float = TRASH_MAX_AGE
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.session: str = f"{time.time_ns()}-{os.getpid()}"
+        self._counter: int = 0
+        self._used_roots: set[Path] = set()
+        self._lock = threading.Lock()
+        self._purge_lock = threading.Lock()
+        self._purger: threading.Thread | None = None
+        self._purge_pending: bool = False
+
+    def roots_for(self, path: Path) -> list[Path]:
+        mount_trash: Path = mount_point(path.parent) / f".console-trash-{os.getuid()}"
+        return [self.root] if mount_trash == self.root else [self.root, mount_trash]
+
+    def move_to_trash(self, path: PathLike[str] | str) -> Path | None:
+        path = Path(path).absolute()
+        containing: Path | None = None
+        for root in self.roots_for(path):
+            if contains(path, root):
+                # rename(2) can't move a directory inside itself
+                containing = root
+                continue
+            session_dir: Path = root / self.session
+            with self._lock:
+                self._counter += 1
+                entry: Path = session_dir / f"{self._counter:06d}-{path.name}"
+            try:
+                session_dir.mkdir(parents=True, exist_ok=True)
+                os.rename(path, entry)
+            except OSError as e:
+                if e.errno not in TRASH_FALLBACK_ERRNOS:
+                    raise
+                continue
+            self._used_roots.add(root)
+            self.start_purge()
+            return entry
+        if containing is not None:
+            raise OSError(errno.EINVAL, f"{path} holds the trash {containing}, remove it with --permanent")
+        return None
+
+    def start_purge(self) -> None:
+        # After every rm, folded into the running purge if there is one;
+        # a daemon thread never holds up exiting the shell
+        with self._lock:
+            self._purge_pending = True
+            if self._purger is not None:
+                return
+            self._purger = threading.Thread(target=self._purge_while_pending, name="trash-purge", daemon=True)
+            self._purger.start()
+
+    def _purge_while_pending(self) -> None:
+        while True:
+            with self._lock:
+                if not self._purge_pending:
+                    self._purger = None
+                    return
+                self._purge_pending = False
+            self.purge()
+
+    def purge(self) -> None:
+        with self._purge_lock:
+            for root in {self.root, *self._used_roots}:
+                try:
+                    self._purge_root(root)
+                except OSError:
+                    continue
+
+    def _purge_root(self, root: Path) -> None:
+        if not root.is_dir():
+            return
+        now: float = time.time()
+        kept: list[tuple[Path, int]] = []
+        # What this session removed stays undoable, it only counts towards the cap.
+        # Later sessions belong to shells still running, which trim them themselves.
+        current: int = 0
+        for session_dir in root.iterdir():
+            if session_dir.name > self.session:
+                continue
+            try:
+                entries: list[Path] = [entry for entry in session_dir.iterdir() if entry.name != SIZES_NAME]
+            except OSError:
+                continue
+            for entry, size in self._entry_sizes(session_dir, entries).items():
+                if session_dir.name == self.session:
+                    current += size
+                    continue
+                try:
+                    # rename updates ctime, so it tells when the entry went into the trash
+                    if now - os.lstat(entry).st_ctime > self.max_age:
+                        self._remove(entry)
+                    else:
+                        kept.append((entry, size))
+                except OSError:
+                    continue
+            if session_dir.name != self.session and not any(
+                os.path.lexists(entry) for entry in entries
+            ):
+                shutil.rmtree(session_dir, ignore_errors=True)
+        total: int = current + sum(size for _, size in kept)
+        # Session names and entry counters sort in the order things were trashed
+        for entry, size in sorted(kept):
+            if total <= self.max_bytes:
+                break
+            try:
+                self._remove(entry)
+            except OSError:
+                # Another shell's purge may have got there first
+                if os.path.lexists(entry):
+                    continue
+            total -= size
+
+    @staticmethod
+    def _entry_sizes(session_dir: Path, entries: list[Path]) -> dict[Path, int]:
+        """
+        Sizes from the session's sidecar. Only entries trashed since the
+        last purge are walked, and their sizes are appended to it.
+        """
+        recorded: dict[str, int] = {}
+        try:
+            with open(session_dir / SIZES_NAME, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        name, size = json.loads(line)
+                    except ValueError:
+                        continue
+                    recorded[name] = size
+        except OSError:
+            pass
+        sizes: dict[Path, int] = {}
+        measured: list[str] = []
+        for entry in entries:
+            size: int | None = recorded.get(entry.name)
+            if size is None:
+                try:
+                    size = disk_usage(entry)
+                except OSError:
+                    continue
+                measured.append(json.dumps([entry.name, size]) + "\n")
+            sizes[entry] = size
+        if measured:
+            with open(session_dir / SIZES_NAME, "a", encoding="utf-8") as f:
+                f.writelines(measured)
+        return sizes
+
+    @staticmethod
+    def _remove(entry: Path) -> None:
+        if entry.is_dir() and not entry.is_symlink():
+            ParallelDeleter().remove_tree(entry)
+        else:
+            os.unlink(entry)
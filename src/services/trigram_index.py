@@ -0,0 +1,158 @@
+import os
+import sqlite3
+from os import PathLike
+from pathlib import Path
+from typing import Iterable
+
+from src.services.walker import IgnoreRules
+from src.services.walker import skip_unreadable
+from src.services.walker import walk
+
+
+INDEX_FILENAME: str = ".grep_index.sqlite"
+MAX_INDEXED_SIZE: int = 16 * 1024 * 1024
+READ_SIZE: int = 1024 * 1024
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    indexed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trigrams (
+    trigram INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trigrams_by_file ON trigrams (file_id);
+"""
+
+
+def extract_trigrams(data: bytes) -> set[int]:
+    data = data.lower()
+    # Deduplicate the byte slices first, int conversion only runs on the unique ones
+    return set(map(int.from_bytes, {data[i:i + 3] for i in range(len(data) - 2)}))
+
+
+def file_trigrams(path: str) -> set[int]:
+    trigrams: set[int] = set()
+    with open(path, "rb") as f:
+        overlap: bytes = b""
+        while chunk := f.read(READ_SIZE):
+            trigrams |= extract_trigrams(overlap + chunk)
+            overlap = chunk[-2:]
+    return trigrams
+
+
+class IndexStats:
+    def __init__(self):
+        self.added: int = 0
+        self.updated: int = 0
+        self.removed: int = 0
+        self.unchanged: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.added} added, {self.updated} updated, {self.removed} removed, {self.unchanged} unchanged"
+
+
+class TrigramIndex:
+    def __init__(self, root: PathLike[str] | str):
+        self.root = Path(root).absolute()
+        self.db_path = self.root / INDEX_FILENAME
+        self._connection: sqlite3.Connection | None = None
+
+    @classmethod
+    def locate(cls, directory: PathLike[str] | str) -> "TrigramIndex | None":
+        directory = Path(directory).absolute()
+        for candidate in (directory, *directory.parents):
+            if (candidate / INDEX_FILENAME).is_file():
+                return cls(candidate)
+        return None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.db_path)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def relative(self, path: str) -> str:
+        return os.path.relpath(path, self.root)
+
+    def build(self, rules: IgnoreRules | None = None) -> IndexStats:
+        stats = IndexStats()
+        known: dict[str, tuple[int, int, int]] = {
+            path: (file_id, mtime_ns, size)
+            for file_id, path, mtime_ns, size in self.connection.execute(
+                "SELECT id, path, mtime_ns, size FROM files"
+            )
+        }
+        with self.connection:
+            for entry in walk(self.root, rules, onerror=skip_unreadable):
+                if entry.name.startswith(INDEX_FILENAME) or not entry.is_file():
+                    continue
+                path: str = self.relative(entry.path)
+                entry_stat: os.stat_result = entry.stat()
+                previous: tuple[int, int, int] | None = known.pop(path, None)
+                if previous is not None:
+                    if previous[1:] == (entry_stat.st_mtime_ns, entry_stat.st_size):
+                        stats.unchanged += 1
+                        continue
+                    self._forget(previous[0])
+                    stats.updated += 1
+                else:
+                    stats.added += 1
+                try:
+                    self._add(entry.path, path, entry_stat)
+                except OSError:
+                    continue
+            for file_id, _, _ in known.values():
+                self._forget(file_id)
+                stats.removed += 1
+        return stats
+
+    def _add(self, full_path: str, path: str, entry_stat: os.stat_result) -> None:
+        indexed: bool = entry_stat.st_size <= MAX_INDEXED_SIZE
+        trigrams: set[int] = file_trigrams(full_path) if indexed else set()
+        cursor: sqlite3.Cursor = self.connection.execute(
+            "INSERT INTO files (path, mtime_ns, size, indexed) VALUES (?, ?, ?, ?)",
+            (path, entry_stat.st_mtime_ns, entry_stat.st_size, int(indexed)),
+        )
+        self.connection.executemany(
+            "INSERT INTO trigrams (trigram, file_id) VALUES (?, ?)",
+            ((trigram, cursor.lastrowid) for trigram in trigrams),
+        )
+
+    def _forget(self, file_id: int) -> None:
+        self.connection.execute("DELETE FROM trigrams WHERE file_id = ?", (file_id,))
+        self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def file_states(self) -> dict[str, tuple[int, int]]:
+        return {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.connection.execute("SELECT path, mtime_ns, size FROM files")
+        }
+
+    def candidates(self, needle: bytes) -> set[str] | None:
+        trigrams: list[int] = sorted(extract_trigrams(needle))
+        if not trigrams:
+            return None
+        placeholders: str = ", ".join("?" * len(trigrams))
+        rows: Iterable[tuple[str]] = self.connection.execute(
+            f"""
+            SELECT path FROM files WHERE indexed = 0
+            UNION
+            SELECT files.path FROM trigrams JOIN files ON files.id = trigrams.file_id
+            WHERE trigrams.trigram IN ({placeholders})
+            GROUP BY trigrams.file_id HAVING COUNT(*) = ?
+            """,
+            (*trigrams, len(trigrams)),
+        )
+        return {path for (path,) in rows}
@@ -0,0 +1,76 @@
+import json
+import os
+from os import getcwd
+from pathlib import Path
+
+
+READ_BACK_SIZE: int = 4096
+
+
+class UndoJournal:
+    """
+    Append-only JSON-lines log of what mutating commands changed.
+
+    Entries hold resolved absolute paths, so undo never has to re-parse the
+    command text. Undo pops the last line of the journal onto the redo file
+    and redo does the reverse; popping only reads and truncates the tail.
+    """
+
+    def __init__(
+        self,
+        journal_file: Path = Path(f"{getcwd()}/src/.undo_journal")
+    ):
+        self.journal_file = journal_file
+        self.redo_file = journal_file.with_name(journal_file.name + ".redo")
+
+    def record(self, entry: dict) -> None:
+        self._push(self.journal_file, entry)
+        # A new change starts a new branch, whatever was undone before can't be redone on top of it
+        if self.redo_file.exists():
+            self.redo_file.write_bytes(b"")
+
+    def pop_undo(self) -> dict | None:
+        return self._pop(self.journal_file)
+
+    def pop_redo(self) -> dict | None:
+        return self._pop(self.redo_file)
+
+    def push_undo(self, entry: dict) -> None:
+        self._push(self.journal_file, entry)
+
+    def push_redo(self, entry: dict) -> None:
+        self._push(self.redo_file, entry)
+
+    @staticmethod
+    def _push(path: Path, entry: dict) -> None:
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    @staticmethod
+    def _pop(path: Path) -> dict | None:
+        try:
+            f = path.open("r+b")
+        except FileNotFoundError:
+            return None
+        with f:
+            while (end := f.seek(0, os.SEEK_END)) > 0:
+                # Read backwards from the end until the newline in front of the last entry
+                start: int = end
+                tail: bytes = b""
+                while start > 0:
+                    step: int = min(READ_BACK_SIZE, start)
+                    start -= step
+                    f.seek(start)
+                    tail = f.read(step) + tail
+                    newline: int = tail.rfind(b"\n", 0, len(tail) - 1)
+                    if newline != -1:
+                        start += newline + 1
+                        tail = tail[newline + 1:]
+                        break
+                f.truncate(start)
+                try:
+                    return json.loads(tail)
+                except ValueError:
+                    # A write torn by a crash, drop it and take the entry before
+                    continue
+        return None
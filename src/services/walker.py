@@ -0,0 +1,181 @@
+import os
+import re
+from fnmatch import fnmatch
+from os import DirEntry
+from os import PathLike
+from typing import Callable
+from typing import Generator
+from typing import Sequence
+
+
+GITIGNORE_NAME: str = ".gitignore"
+
+
+class GitignoreRule:
+    def __init__(self, pattern: str):
+        self.negated: bool = pattern.startswith("!")
+        if self.negated:
+            pattern = pattern[1:]
+        self.dir_only: bool = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # A slash anywhere but the end anchors the pattern to the .gitignore directory
+        self.anchored: bool = "/" in pattern
+        self._regex: re.Pattern = re.compile(_translate_glob(pattern.lstrip("/")))
+
+    def matches(self, relative_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.anchored:
+            return self._regex.fullmatch(relative_path) is not None
+        return self._regex.fullmatch(relative_path.rsplit("/", 1)[-1]) is not None
+
+
+class Gitignore:
+    def __init__(self, base: str, rules: list[GitignoreRule]):
+        self.base = base
+        self.rules = rules
+
+    @classmethod
+    def load(cls, directory: str) -> "Gitignore | None":
+        try:
+            with open(os.path.join(directory, GITIGNORE_NAME), encoding="utf-8", errors="ignore") as f:
+                lines: list[str] = f.read().splitlines()
+        except OSError:
+            return None
+        rules: list[GitignoreRule] = [
+            GitignoreRule(line.strip())
+            for line in lines
+            if line.strip() and not line.startswith("#")
+        ]
+        return cls(directory, rules) if rules else None
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool | None:
+        relative_path: str = os.path.relpath(path, self.base).replace(os.sep, "/")
+        verdict: bool | None = None
+        for rule in self.rules:
+            if rule.matches(relative_path, is_dir):
+                verdict = not rule.negated
+        return verdict
+
+
+class IgnoreRules:
+    def __init__(
+        self,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        exclude_dirs: Sequence[str] = (),
+        use_gitignore: bool = False
+    ):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.exclude_dirs = tuple(exclude_dirs)
+        self.use_gitignore = use_gitignore
+
+    def allows_file(self, name: str) -> bool:
+        if self.include and not any(fnmatch(name, glob) for glob in self.include):
+            return False
+        return not any(fnmatch(name, glob) for glob in self.exclude)
+
+    def allows_dir(self, name: str) -> bool:
+        return not any(fnmatch(name, glob) for glob in self.exclude_dirs)
+
+
+def skip_unreadable(error: OSError) -> None:
+    # For walks that may pass over what they can't list, like a search
+    pass
+
+
+def walk(
+    root: PathLike[str] | str,
+    rules: IgnoreRules | None = None,
+    topdown: bool = True,
+    include_dirs: bool = False,
+    follow_symlinks: bool = False,
+    onerror: Callable[[OSError], None] | None = None
+) -> Generator[DirEntry[str]]:
+    """
+    A directory that can't be listed raises, unless onerror is given: it
+    is then called with the error and the walk goes on without it.
+    """
+    yield from _walk(os.fspath(root), rules or IgnoreRules(), topdown, include_dirs, follow_symlinks, onerror, [])
+
+
+def _walk(
+    directory: str,
+    rules: IgnoreRules,
+    topdown: bool,
+    include_dirs: bool,
+    follow_symlinks: bool,
+    onerror: Callable[[OSError], None] | None,
+    gitignores: list[Gitignore]
+) -> Generator[DirEntry[str]]:
+    try:
+        with os.scandir(directory) as it:
+            entries: list[DirEntry[str]] = list(it)
+    except OSError as e:
+        if onerror is None:
+            raise
+        onerror(e)
+        return
+    if rules.use_gitignore and any(entry.name == GITIGNORE_NAME for entry in entries):
+        gitignore: Gitignore | None = Gitignore.load(directory)
+        if gitignore is not None:
+            gitignores = gitignores + [gitignore]
+    for entry in entries:
+        is_dir: bool = entry.is_dir(follow_symlinks=follow_symlinks)
+        if is_dir and not rules.allows_dir(entry.name):
+            continue
+        if not is_dir and not rules.allows_file(entry.name):
+            continue
+        if gitignores and _is_gitignored(gitignores, entry.path, is_dir):
+            continue
+        if not is_dir:
+            yield entry
+            continue
+        if include_dirs and topdown:
+            yield entry
+        yield from _walk(entry.path, rules, topdown, include_dirs, follow_symlinks, onerror, gitignores)
+        if include_dirs and not topdown:
+            yield entry
+
+
+def _is_gitignored(gitignores: list[Gitignore], path: str, is_dir: bool) -> bool:
+    ignored: bool = False
+    for gitignore in gitignores:
+        verdict: bool | None = gitignore.is_ignored(path, is_dir)
+        if verdict is not None:
+            ignored = verdict
+    return ignored
+
+
+def _translate_glob(pattern: str) -> str:
+    regex: str = ""
+    i: int = 0
+    while i < len(pattern):
+        char: str = pattern[i]
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end: int = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                char_class: str = pattern[i + 1:end]
+                if char_class.startswith("!"):
+                    char_class = "^" + char_class[1:]
+                regex += "[" + char_class + "]"
+                i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex
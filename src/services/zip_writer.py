@@ -0,0 +1,174 @@
+import struct
+import zlib
+from concurrent.futures import Future
+from typing import BinaryIO
+from zipfile import ZIP64_LIMIT
+from zipfile import ZIP_DEFLATED
+from zipfile import ZIP_STORED
+from zipfile import ZipInfo
+
+from src.services.parallel_compress import COMPRESS_BLOCK_SIZE
+from src.services.parallel_compress import DEFAULT_COMPRESS_LEVEL
+from src.services.parallel_compress import DEFAULT_COMPRESS_WORKERS
+from src.services.parallel_compress import DICTIONARY_SIZE
+from src.services.parallel_compress import OrderedPoolWriter
+from src.services.parallel_compress import deflate_block
+
+
+# Record layouts from the zip APPNOTE, the same ones zipfile uses
+DATA_DESCRIPTOR_FLAG: int = 0x08
+UTF8_FLAG: int = 0x800
+ZIP64_VERSION: int = 45
+DEFAULT_VERSION: int = 20
+CENTRAL_DIRECTORY: struct.Struct = struct.Struct("<4s4B4HL2L5H2L")
+DATA_DESCRIPTOR: struct.Struct = struct.Struct("<4sLLL")
+DATA_DESCRIPTOR64: struct.Struct = struct.Struct("<4sLQQ")
+END_OF_CENTRAL_DIRECTORY: struct.Struct = struct.Struct("<4s4H2LH")
+ZIP64_END_OF_CENTRAL_DIRECTORY: struct.Struct = struct.Struct("<4sQ2H2L4Q")
+ZIP64_LOCATOR: struct.Struct = struct.Struct("<4sLQL")
+
+
+class ParallelZipWriter(OrderedPoolWriter):
+    """
+    Zip writer for streams: entries are deflated on a thread pool and
+    written strictly in order, each followed by a data descriptor, so the
+    output never has to be seeked. Large files are split into blocks that
+    deflate concurrently into one stream per entry.
+    """
+
+    def __init__(
+        self,
+        out: BinaryIO,
+        level: int = DEFAULT_COMPRESS_LEVEL,
+        workers: int = DEFAULT_COMPRESS_WORKERS,
+        block_size: int = COMPRESS_BLOCK_SIZE
+    ):
+        super().__init__(out, workers)
+        self.level = level
+        self.block_size = block_size
+        self.bytes_in: int = 0
+        self._entries: list[ZipInfo] = []
+        # ZipInfo has slots, so the entries written with zip64 records are tracked by name
+        self._zip64: set[str] = set()
+
+    def add_dir(self, path: str, arcname: str) -> None:
+        zinfo: ZipInfo = ZipInfo.from_file(path, arcname)
+        zinfo.compress_type = ZIP_STORED
+        zinfo.CRC = zinfo.compress_size = zinfo.file_size = 0
+        future: Future = Future()
+        future.set_result(_Block(zinfo, b"", first=True, last=True))
+        self._queue(future)
+
+    def add_file(self, path: str, arcname: str) -> None:
+        zinfo: ZipInfo = ZipInfo.from_file(path, arcname)
+        zinfo.compress_type = ZIP_DEFLATED
+        zinfo.flag_bits |= DATA_DESCRIPTOR_FLAG
+        zinfo.CRC = zinfo.compress_size = 0
+        # Same margin zipfile allows for deflate growing incompressible data
+        if zinfo.file_size * 1.05 > ZIP64_LIMIT:
+            self._zip64.add(zinfo.filename)
+        crc: int = 0
+        size: int = 0
+        dictionary: bytes = b""
+        first: bool = True
+        with open(path, "rb") as f:
+            block: bytes = f.read(self.block_size)
+            while True:
+                following: bytes = f.read(self.block_size) if block else b""
+                last: bool = not following
+                crc = zlib.crc32(block, crc)
+                size += len(block)
+                if last:
+                    # The descriptor goes out after the last block, by then the totals are known
+                    zinfo.CRC = crc
+                    zinfo.file_size = size
+                self._queue(self._pool.submit(self._deflate, zinfo, block, dictionary, first, last))
+                if last:
+                    break
+                first = False
+                dictionary = block[-DICTIONARY_SIZE:]
+                block = following
+        self.bytes_in += size
+
+    def close(self) -> None:
+        try:
+            self._drain()
+            self._write_central_directory()
+            self.out.flush()
+        finally:
+            self._shutdown()
+
+    def _deflate(self, zinfo: ZipInfo, block: bytes, dictionary: bytes, first: bool, last: bool) -> "_Block":
+        return _Block(zinfo, deflate_block(block, self.level, dictionary, last), first, last)
+
+    def _emit(self, block: "_Block") -> None:
+        # Header before an entry's first block and descriptor after its last, all in submission order
+        zinfo: ZipInfo = block.zinfo
+        zip64: bool = zinfo.filename in self._zip64
+        if block.first:
+            zinfo.header_offset = self.out.written
+            self.out.write(zinfo.FileHeader(zip64))
+        zinfo.compress_size += len(block.data)
+        self.out.write(block.data)
+        if not block.last:
+            return
+        if zinfo.flag_bits & DATA_DESCRIPTOR_FLAG:
+            layout: struct.Struct = DATA_DESCRIPTOR64 if zip64 else DATA_DESCRIPTOR
+            self.out.write(layout.pack(b"PK\x07\x08", zinfo.CRC, zinfo.compress_size, zinfo.file_size))
+        self._entries.append(zinfo)
+
+    def _write_central_directory(self) -> None:
+        start: int = self.out.written
+        for zinfo in self._entries:
+            self.out.write(_central_directory_record(zinfo))
+        size: int = self.out.written - start
+        count: int = len(self._entries)
+        if count > 0xFFFF or size > ZIP64_LIMIT or start > ZIP64_LIMIT:
+            zip64_end: int = self.out.written
+            self.out.write(ZIP64_END_OF_CENTRAL_DIRECTORY.pack(
+                b"PK\x06\x06", ZIP64_END_OF_CENTRAL_DIRECTORY.size - 12,
+                ZIP64_VERSION, ZIP64_VERSION, 0, 0, count, count, size, start
+            ))
+            self.out.write(ZIP64_LOCATOR.pack(b"PK\x06\x07", 0, zip64_end, 1))
+            count, size, start = min(count, 0xFFFF), min(size, 0xFFFFFFFF), min(start, 0xFFFFFFFF)
+        self.out.write(END_OF_CENTRAL_DIRECTORY.pack(b"PK\x05\x06", 0, 0, count, count, size, start, 0))
+
+
+class _Block:
+    def __init__(self, zinfo: ZipInfo, data: bytes, first: bool, last: bool):
+        self.zinfo = zinfo
+        self.data = data
+        self.first = first
+        self.last = last
+
+
+def _central_directory_record(zinfo: ZipInfo) -> bytes:
+    file_size: int = zinfo.file_size
+    compress_size: int = zinfo.compress_size
+    header_offset: int = zinfo.header_offset
+    extra: list[int] = []
+    if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+        extra += [file_size, compress_size]
+        file_size = compress_size = 0xFFFFFFFF
+    if header_offset > ZIP64_LIMIT:
+        extra.append(header_offset)
+        header_offset = 0xFFFFFFFF
+    extra_data: bytes = zinfo.extra
+    if extra:
+        extra_data = struct.pack(f"<HH{len(extra)}Q", 1, 8 * len(extra), *extra) + extra_data
+    version: int = ZIP64_VERSION if extra else DEFAULT_VERSION
+    try:
+        filename: bytes = zinfo.filename.encode("ascii")
+        flag_bits: int = zinfo.flag_bits
+    except UnicodeEncodeError:
+        filename = zinfo.filename.encode("utf-8")
+        flag_bits = zinfo.flag_bits | UTF8_FLAG
+    dt: tuple[int, ...] = zinfo.date_time
+    dosdate: int = (dt[0] - 1980) << 9 | dt[1] << 5 | dt[2]
+    dostime: int = dt[3] << 11 | dt[4] << 5 | (dt[5] // 2)
+    return CENTRAL_DIRECTORY.pack(
+        b"PK\x01\x02", max(version, zinfo.create_version), zinfo.create_system,
+        max(version, zinfo.extract_version), zinfo.reserved, flag_bits, zinfo.compress_type,
+        dostime, dosdate, zinfo.CRC, compress_size, file_size, len(filename), len(extra_data),
+        len(zinfo.comment), 0, zinfo.internal_attr, zinfo.external_attr, header_offset
+    ) + filename + extra_data + zinfo.comment
@@ -16,6 +16,15 @@ def service(mock_logger, mock_history_service):
     from src.services.linux_console import LinuxConsoleService
     return LinuxConsoleService(mock_logger, mock_history_service)
 
+@pytest.fixture
+def undo_service(mock_logger, mock_history_service, tmp_path):
+    from src.services.linux_console import LinuxConsoleService
+    from src.services.trash import Trash
+    from src.services.undo_journal import UndoJournal
+    return LinuxConsoleService(
+        mock_logger, mock_history_service, Trash(tmp_path / "trash"), UndoJournal(tmp_path / "journal")
+    )
+
 @pytest.fixture
 def fs(fs):
     fs.create_dir("/home/user")
@@ -0,0 +1,82 @@
+import io
+import os
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from src.enums.archive_format import ArchiveFormat
+from src.errors import CodecUnavailableError
+from src.services.codec_registry import CODECS
+from src.services.codec_registry import codec_for
+from src.services.codec_registry import detect_format
+from src.services.codec_registry import format_from_name
+
+
+AVAILABLE: list[ArchiveFormat] = [fmt for fmt, codec in CODECS.items() if codec.requires is None]
+MISSING: list[ArchiveFormat] = [fmt for fmt, codec in CODECS.items() if codec.requires is not None]
+
+
+class TestCodecs:
+
+    @pytest.mark.parametrize("archive_format", AVAILABLE)
+    def test_blocks_read_back_as_one_stream(self, archive_format: ArchiveFormat):
+        codec = codec_for(archive_format)
+        data: bytes = os.urandom(40_000) + b"abc" * 100_000
+        out = io.BytesIO()
+        with codec.writer(out, workers=4) as writer:
+            writer.write(data)
+        assert writer.bytes_out == len(out.getvalue())
+        with codec.reader(io.BytesIO(out.getvalue())) as stream:
+            assert stream.read() == data
+
+    @pytest.mark.parametrize("archive_format", AVAILABLE)
+    def test_tar_round_trip(self, archive_format: ArchiveFormat, tmp_path: Path):
+        codec = codec_for(archive_format)
+        archive: Path = tmp_path / f"data{codec.extensions[0]}"
+        with archive.open("wb") as raw, codec.writer(raw, level=1) as compressed:
+            with tarfile.open(fileobj=compressed, mode="w|") as tar:
+                member = tarfile.TarInfo("a.txt")
+                member.size = 5
+                tar.addfile(member, io.BytesIO(b"alpha"))
+        assert detect_format(archive) == archive_format
+        with archive.open("rb") as raw, codec.reader(raw) as stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+            assert tar.extractfile(tar.next()).read() == b"alpha"
+
+    def test_level_is_clamped(self):
+        codec = codec_for(ArchiveFormat.bztar)
+        assert codec.level(None) == codec.default_level
+        assert codec.level(0) == 1
+        assert codec.level(22) == 9
+
+    @pytest.mark.parametrize("archive_format", MISSING)
+    def test_missing_module(self, archive_format: ArchiveFormat):
+        with pytest.raises(CodecUnavailableError):
+            codec_for(archive_format)
+
+    def test_zip_has_no_tar_codec(self):
+        with pytest.raises(CodecUnavailableError):
+            codec_for(ArchiveFormat.zipfile)
+
+
+class TestFormatDetection:
+
+    def test_format_from_name(self):
+        assert format_from_name("backup.tar.gz") == ArchiveFormat.gztar
+        assert format_from_name("backup.TGZ") == ArchiveFormat.gztar
+        assert format_from_name("backup.tar.xz") == ArchiveFormat.xztar
+        assert format_from_name("backup.tbz2") == ArchiveFormat.bztar
+        assert format_from_name("backup.tar.zst") == ArchiveFormat.zstdtar
+        assert format_from_name("backup.zip") == ArchiveFormat.zipfile
+        assert format_from_name("backup.tar") is None
+
+    def test_detect_format_ignores_name(self, tmp_path: Path):
+        misnamed: Path = tmp_path / "backup.zip"
+        misnamed.write_bytes(b"\xfd7zXZ\x00\x00\x04")
+        assert detect_format(misnamed) == ArchiveFormat.xztar
+        (tmp_path / "plain.tar.gz").write_text("not compressed")
+        assert detect_format(tmp_path / "plain.tar.gz") is None
+
+    def test_detect_format_of_missing_or_directory(self, tmp_path: Path):
+        assert detect_format(tmp_path) is None
+        assert detect_format(tmp_path / "missing") is None
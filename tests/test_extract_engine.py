@@ -0,0 +1,172 @@
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.errors import WrongFormatError
+from src.services import extract_engine
+from src.services.extract_engine import MemberFilter
+from src.services.extract_engine import extract_tar
+from src.services.extract_engine import extract_zip
+from src.services.pack_engine import pack_tar
+from src.services.pack_engine import pack_zip
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    root = tmp_path / "src" / "data"
+    (root / "logs" / "old").mkdir(parents=True)
+    (root / "a.txt").write_text("alpha")
+    (root / "logs" / "1.log").write_text("one")
+    (root / "logs" / "old" / "0.log").write_text("zero")
+    # Bigger than a compression block, so the gzip has several members
+    (root / "big.bin").write_bytes(os.urandom(1_500_000))
+    (root / "run.sh").write_text("#!/bin/sh\n")
+    (root / "run.sh").chmod(0o755)
+    os.utime(root / "a.txt", (1_600_000_000, 1_600_000_000))
+    return root
+
+
+def pack(tree: Path, archive: Path) -> Path:
+    # Relative member names, the way a user packs a folder from its parent
+    cwd: str = os.getcwd()
+    os.chdir(tree.parent)
+    try:
+        with archive.open("wb") as out:
+            (pack_tar if archive.name.endswith(".tar.gz") else pack_zip)(Path(tree.name), out)
+    finally:
+        os.chdir(cwd)
+    return archive
+
+
+def files_under(root: Path) -> dict[str, bytes]:
+    return {str(path.relative_to(root)): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+class TestMemberFilter:
+
+    def test_no_globs_allow_everything(self):
+        assert MemberFilter().allows("data/a.txt")
+
+    def test_globs_match_path_name_or_directory(self):
+        assert MemberFilter(["data/a.txt"]).allows("data/a.txt")
+        assert MemberFilter(["*.log"]).allows("data/logs/old/0.log")
+        assert MemberFilter(["data/logs"]).allows("data/logs/old/0.log")
+        assert not MemberFilter(["data/logs"]).allows("data/a.txt")
+
+    def test_exclude_wins(self):
+        members = MemberFilter(["data/logs"], ["old"])
+        assert members.allows("data/logs/1.log")
+        assert not members.allows("data/logs/old/0.log")
+
+
+class TestExtractTar:
+
+    def test_round_trip(self, tree: Path, tmp_path: Path, monkeypatch):
+        # Several chunks per file, so writes complete out of order
+        monkeypatch.setattr(extract_engine, "EXTRACT_CHUNK_SIZE", 16 * 1024)
+        archive: Path = pack(tree, tmp_path / "data.tar.gz")
+        dest: Path = tmp_path / "out"
+        dest.mkdir()
+        stats = extract_tar(archive, dest, workers=4)
+        assert files_under(dest / "data") == files_under(tree)
+        assert stats.files == 5
+        assert os.stat(dest / "data" / "run.sh").st_mode & 0o777 == 0o755
+        assert os.stat(dest / "data" / "a.txt").st_mtime == 1_600_000_000
+
+    def test_selective(self, tree: Path, tmp_path: Path):
+        archive: Path = pack(tree, tmp_path / "data.tar.gz")
+        dest: Path = tmp_path / "out"
+        dest.mkdir()
+        stats = extract_tar(archive, dest, MemberFilter(["data/logs/old/0.log"]))
+        assert files_under(dest) == {"data/logs/old/0.log": b"zero"}
+        assert stats.files == 1
+        assert stats.skipped > 0
+
+    def test_hard_links(self, tmp_path: Path):
+        root: Path = tmp_path / "data"
+        root.mkdir()
+        (root / "a.txt").write_text("alpha")
+        os.link(root / "a.txt", root / "b.txt")
+        os.link(root / "a.txt", root / "c.txt")
+        archive: Path = pack(root, tmp_path / "data.tar.gz")
+        whole: Path = tmp_path / "whole"
+        whole.mkdir()
+        extract_tar(archive, whole)
+        assert os.stat(whole / "data" / "c.txt").st_ino == os.stat(whole / "data" / "a.txt").st_ino
+        # The target is filtered out, its data comes from a second pass
+        links: Path = tmp_path / "links"
+        links.mkdir()
+        stats = extract_tar(archive, links, MemberFilter(["b.txt", "c.txt"]))
+        assert files_under(links) == {"data/b.txt": b"alpha", "data/c.txt": b"alpha"}
+        assert os.stat(links / "data" / "c.txt").st_ino == os.stat(links / "data" / "b.txt").st_ino
+        assert stats.files == 1
+
+    def test_hard_link_without_target(self, tmp_path: Path):
+        archive: Path = tmp_path / "dangling.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            member = tarfile.TarInfo("b.txt")
+            member.type = tarfile.LNKTYPE
+            member.linkname = "a.txt"
+            tar.addfile(member)
+        dest: Path = tmp_path / "out"
+        dest.mkdir()
+        with pytest.raises(FileNotFoundError, match="hard link b.txt"):
+            extract_tar(archive, dest)
+
+    def test_refuses_paths_outside_dest(self, tmp_path: Path):
+        archive: Path = tmp_path / "evil.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            member = tarfile.TarInfo("../escaped.txt")
+            member.size = 4
+            tar.addfile(member, io.BytesIO(b"evil"))
+        dest: Path = tmp_path / "out"
+        dest.mkdir()
+        with pytest.raises(PermissionError):
+            extract_tar(archive, dest)
+        assert not (tmp_path / "escaped.txt").exists()
+
+    def test_corrupt_archive(self, tmp_path: Path):
+        archive: Path = tmp_path / "broken.tar.gz"
+        archive.write_bytes(b"not a tar at all")
+        with pytest.raises(WrongFormatError):
+            extract_tar(archive, tmp_path)
+
+
+class TestExtractZip:
+
+    def test_round_trip(self, tree: Path, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr(extract_engine, "ZIP_BATCH_ENTRIES", 2)
+        archive: Path = pack(tree, tmp_path / "data.zip")
+        dest: Path = tmp_path / "out"
+        dest.mkdir()
+        stats = extract_zip(archive, dest, workers=4)
+        assert files_under(dest / "data") == files_under(tree)
+        assert stats.files == 5
+        assert stats.bytes == sum(len(data) for data in files_under(tree).values())
+
+    def test_selective(self, tree: Path, tmp_path: Path):
+        archive: Path = pack(tree, tmp_path / "data.zip")
+        dest: Path = tmp_path / "out"
+        dest.mkdir()
+        extract_zip(archive, dest, MemberFilter(exclude=["logs", "big.bin"]))
+        assert set(files_under(dest)) == {"data/a.txt", "data/run.sh"}
+
+    def test_strips_paths_outside_dest(self, tmp_path: Path):
+        archive: Path = tmp_path / "evil.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("../../escaped.txt", "evil")
+        dest: Path = tmp_path / "out"
+        dest.mkdir()
+        extract_zip(archive, dest)
+        assert (dest / "escaped.txt").read_text() == "evil"
+        assert not (tmp_path / "escaped.txt").exists()
+
+    def test_corrupt_archive(self, tmp_path: Path):
+        archive: Path = tmp_path / "broken.zip"
+        archive.write_bytes(b"PK but not really")
+        with pytest.raises(WrongFormatError):
+            extract_zip(archive, tmp_path)
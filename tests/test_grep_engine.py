@@ -0,0 +1,94 @@
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+
+from src.enums.archive_format import ArchiveFormat
+from src.enums.binary_files import BinaryFiles
+from src.errors import WrongFormatError
+from src.services.grep_engine import BINARY_SNIFF_SIZE
+from src.services.grep_engine import CHUNK_SIZE
+from src.services.grep_engine import scan_archive
+from src.services.grep_engine import scan_file
+from src.services.grep_engine import scan_stream
+from src.services.grep_engine import scan_target
+from src.services.matcher import LiteralMatcher
+from src.services.matcher import RegexMatcher
+from src.services.matcher import compile_matcher
+
+
+class TestGrepEngine:
+
+    def test_scan_stream_across_chunk_boundaries(self):
+        # The second line straddles the sniffed head and the first chunk
+        data = b"first line\r\n" + b"x" * BINARY_SNIFF_SIZE + b" needle\r\n\nlast needle without newline"
+        matches = list(scan_stream("log.txt", io.BytesIO(data), compile_matcher("needle", False)))
+        assert matches == [
+            f"log.txt: 2:{'x' * BINARY_SNIFF_SIZE} needle\n",
+            "log.txt: 4:last needle without newline\n",
+        ]
+
+    def test_scan_target_long_line_larger_than_chunk(self, fs: FakeFilesystem):
+        fs.create_file("/log.txt", contents="x" * (CHUNK_SIZE * 2) + "needle\nend needle\n")
+        matches = list(scan_target(Path("/log.txt"), compile_matcher("needle", False)))
+        assert len(matches) == 2
+        assert matches[0].startswith("log.txt: 1:xxx") and matches[0].endswith("needle\n")
+        assert matches[1] == "log.txt: 2:end needle\n"
+
+    def test_binary_sniff_reads_only_the_head(self):
+        stream = io.BytesIO(b"\0" * 10_000_000)
+        assert list(scan_stream("blob.bin", stream, compile_matcher("x", False), BinaryFiles.without_match)) == []
+        assert stream.tell() == BINARY_SNIFF_SIZE
+
+    def test_binary_without_newline_matches(self):
+        stream = io.BytesIO(b"\0" * 100_000 + b"needle" + b"\0" * 100_000)
+        assert list(scan_stream("blob.bin", stream, compile_matcher("needle", False))) == [
+            "Binary file blob.bin matches\n"
+        ]
+
+    def test_literal_pattern_uses_fast_path(self):
+        assert isinstance(compile_matcher("needle", False), LiteralMatcher)
+        assert isinstance(compile_matcher("need.e", False), RegexMatcher)
+        assert isinstance(compile_matcher("nееdle", True), RegexMatcher)
+
+    def test_compile_matcher_is_cached(self):
+        assert compile_matcher("Poka", True) is compile_matcher("Poka", True)
+
+    def test_literal_matcher_reports_line_indexes(self):
+        block = b"alpha\nBeta needle\ngamma\nneedle NEEDLE\nlast"
+        matches = list(compile_matcher("needle", True).search_block(block))
+        assert matches == [(1, "Beta needle"), (3, "needle NEEDLE")]
+
+    def test_literal_and_regex_agree(self, fs: FakeFilesystem):
+        fs.create_file("/log.txt", contents="a-b\naxb\r\nA-B\r\n" * 3)
+        literal = list(scan_file(Path("/log.txt"), compile_matcher("a-b", True)))
+        regex = list(scan_file(Path("/log.txt"), compile_matcher("a[-]b", True)))
+        assert literal == regex
+        assert literal[1] == "log.txt: 3:A-B\n"
+
+    def test_scan_archive_members(self, tmp_path: Path):
+        with tarfile.open(tmp_path / "logs.tar.gz", "w:gz") as tar:
+            for name, data in (("logs/a.log", b"ok\nneedle here\n"), ("logs/b.bin", b"\0needle")):
+                member = tarfile.TarInfo(name)
+                member.size = len(data)
+                tar.addfile(member, io.BytesIO(data))
+        matches = list(scan_archive(tmp_path / "logs.tar.gz", ArchiveFormat.gztar, compile_matcher("needle", False)))
+        assert matches == ["logs.tar.gz!logs/a.log: 2:needle here\n", "Binary file logs.tar.gz!logs/b.bin matches\n"]
+
+    def test_scan_target_reads_archives_only_when_asked(self, tmp_path: Path):
+        with zipfile.ZipFile(tmp_path / "docs.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("docs/", "")
+            zf.writestr("docs/readme.txt", "needle\n" * 3)
+        matcher = compile_matcher("needle", False)
+        assert list(scan_target(tmp_path / "docs.zip", matcher, archives=True)) == [
+            f"docs.zip!docs/readme.txt: {line}:needle\n" for line in (1, 2, 3)
+        ]
+        assert list(scan_target(tmp_path / "docs.zip", matcher)) == []
+
+    def test_scan_corrupt_archive(self, tmp_path: Path):
+        (tmp_path / "broken.tar.gz").write_bytes(b"\x1f\x8b broken")
+        with pytest.raises(WrongFormatError):
+            list(scan_archive(tmp_path / "broken.tar.gz", ArchiveFormat.gztar, compile_matcher("x", False)))
@@ -1,3 +1,7 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 from src.services.history_service import HistoryService
 
 
@@ -37,3 +41,71 @@ class TestHistoryService:
 
         history = service.get_history()
         assert len(history) == 4
+
+    def test_tail_and_entry_use_the_index(self, fs):
+        fs.create_file("/h/.history", contents="".join(f"cmd {i}\n" for i in range(1, 101)))
+        service = HistoryService(Path("/h/.history"))
+
+        assert service.tail(3) == [(98, "cmd 98"), (99, "cmd 99"), (100, "cmd 100")]
+        assert service.entry(42) == "cmd 42"
+        assert os.path.getsize("/h/.history.idx") == 100 * 8
+
+        service.append_command_to_history("cmd 101")
+        assert service.tail(1) == [(101, "cmd 101")]
+        assert service.count() == 101
+
+    def test_search_streams_matches(self, fs):
+        fs.create_file("/h/.history", contents="ls\ncp a b\nls -la\ncat x\n")
+        service = HistoryService(Path("/h/.history"))
+        assert list(service.search("ls")) == [(1, "ls"), (3, "ls -la")]
+
+    def test_compaction_keeps_latest_entries(self, fs):
+        fs.create_file("/h/.history")
+        service = HistoryService(Path("/h/.history"), max_bytes=200, keep_entries=5)
+        for i in range(40):
+            service.append_command_to_history(f"command {i}")
+
+        history = service.get_history()
+        assert os.path.getsize("/h/.history") <= 200
+        assert history[-1] == (len(history), "command 39")
+        assert len(history) <= 5 + 200 // len("command 00\n")
+
+    def test_index_rebuilt_after_external_rewrite(self, fs):
+        fs.create_file("/h/.history", contents="a\nb\nc\n")
+        service = HistoryService(Path("/h/.history"))
+        assert service.count() == 3
+        service.close()
+        with open("/h/.history", "w") as f:
+            f.write("x\n")
+        assert service.get_history() == [(1, "x")]
+
+    def test_concurrent_sessions_do_not_interleave(self, tmp_path):
+        history_file = tmp_path / ".history"
+        history_file.touch()
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(_log_session, [history_file] * 4, range(4)))
+
+        lines = history_file.read_text().splitlines()
+        assert len(lines) == 4 * 500
+        assert all(line.startswith("session ") and line.endswith(" " + "x" * 200) for line in lines)
+        assert HistoryService(history_file).count() == 4 * 500
+
+    def test_compaction_by_another_session_is_followed(self, tmp_path):
+        history_file = tmp_path / ".history"
+        history_file.touch()
+        first = HistoryService(history_file, max_bytes=10_000, keep_entries=2)
+        second = HistoryService(history_file, max_bytes=10_000, keep_entries=2)
+        first.append_command_to_history("one")
+        second.append_command_to_history("two")
+        assert first.count() == 2
+        second.max_bytes = 0
+        second.append_command_to_history("three")
+        first.append_command_to_history("four")
+        assert first.get_history() == [(1, "two"), (2, "three"), (3, "four")]
+
+
+def _log_session(history_file, session: int) -> None:
+    service = HistoryService(history_file, flush_every=8)
+    for i in range(500):
+        service.append_command_to_history(f"session {session} command {i} " + "x" * 200)
+    service.close()
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from src.services.history_search import HistorySearchIndex
+from src.services.history_service import HistoryService
+
+
+class TestHistorySearch:
+
+    def test_ranks_frequent_and_recent_first(self):
+        index = HistorySearchIndex()
+        commands = ["git status", "grep -r needle src", "git stash", "git status", "git status", "git stash pop"]
+        for number, command in enumerate(commands, 1):
+            index.add(number, command)
+        results = index.search("git st")
+        assert results[0] == (5, "git status")
+        assert {command for _, command in results} == {"git status", "git stash", "git stash pop"}
+
+    def test_fuzzy_match_tolerates_typos(self):
+        index = HistorySearchIndex()
+        index.add(1, "tar DiscreteMath DoNotTouch.tar.gz")
+        index.add(2, "ls -la")
+        assert index.search("DiscretMath") == [(1, "tar DiscreteMath DoNotTouch.tar.gz")]
+
+    def test_short_query_scans_commands(self):
+        index = HistorySearchIndex()
+        index.add(1, "ls")
+        index.add(2, "cd /tmp")
+        assert index.search("ls") == [(1, "ls")]
+
+    def test_index_catches_up_with_appends(self, fs):
+        fs.create_file("/h/.history", contents="ls\ncp a b\n")
+        service = HistoryService(Path("/h/.history"))
+        assert service.search_ranked("cp a") == [(2, "cp a b")]
+        service.append_command_to_history("cp a c")
+        assert service.search_ranked("cp a") == [(3, "cp a c"), (2, "cp a b")]
@@ -0,0 +1,16 @@
+from src.services.init_services import init_services
+
+
+class TestInitServices:
+
+    def test_init_services_is_a_singleton(self, mocker):
+        dict_config = mocker.patch("src.services.init_services.config.dictConfig")
+        mocker.patch("src.services.init_services.HistoryService")
+        init_services.cache_clear()
+
+        first = init_services()
+        second = init_services()
+
+        assert first is second
+        dict_config.assert_called_once()
+        init_services.cache_clear()
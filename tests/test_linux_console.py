@@ -1,10 +1,26 @@
+import errno
+import io
 import os
+import shutil
+import tarfile
+import zipfile
 import pytest
 from pyfakefs.fake_filesystem import FakeFilesystem
 
+from src.enums.binary_files import BinaryFiles
 from src.enums.file_mode import FileReadMode
 from src.enums.archive_format import ArchiveFormat
+from src.enums.reflink_mode import ReflinkMode
+from src.errors import CodecUnavailableError
+from src.errors import JournalEntryGoneError
+from src.errors import WrongFormatError
+from src.services import codec_registry
+from src.services.external_sort import external_sort
+from src.services.extract_engine import MemberFilter
 from src.services.linux_console import LinuxConsoleService
+from src.services.linux_console import user_name
+from src.services.undo_journal import UndoJournal
+from src.services.walker import IgnoreRules
 
 
 class TestLinuxConsoleService:
@@ -189,6 +205,59 @@ class TestLinuxConsoleService:
         service.pack("/data", "/archive.zip", ArchiveFormat.zipfile)
         service._logger.info.assert_called_with("Archiving a directory")
 
+    def test_pack_gztar_writes_archive(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/data/file1.txt", contents="test")
+        stats = service.pack("/data", "/backup.tar.gz", ArchiveFormat.gztar, level=1, jobs=2)
+        with tarfile.open("/backup.tar.gz") as tar:
+            assert tar.extractfile("data/file1.txt").read() == b"test"
+        assert stats.files == 1
+
+    def test_pack_xztar_adds_its_extension(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/data/file1.txt", contents="test")
+        service.pack("/data", "/backup", ArchiveFormat.xztar)
+        with tarfile.open("/backup.tar.xz") as tar:
+            assert tar.extractfile("data/file1.txt").read() == b"test"
+
+    def test_pack_unavailable_codec(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        if codec_registry.lz4_frame is not None:
+            pytest.skip("lz4 is installed")
+        fs.create_dir("/data")
+        with pytest.raises(CodecUnavailableError):
+            service.pack("/data", "/backup.tar.lz4", ArchiveFormat.lz4tar)
+        assert not os.path.exists("/backup.tar.lz4")
+
+    def test_pack_writes_to_destination_path(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/data/file1.txt", contents="test")
+        fs.create_dir("/backups")
+        service.pack("/data", "/backups/nightly", ArchiveFormat.zipfile)
+        with zipfile.ZipFile("/backups/nightly.zip") as archive:
+            assert archive.read("data/file1.txt") == b"test"
+
+    def test_pack_existing_output_is_kept(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/data/file1.txt", contents="test")
+        fs.create_file("/other/archive.zip", contents="old")
+        with pytest.raises(FileExistsError):
+            service.pack("/data", "/other/archive", ArchiveFormat.zipfile)
+        assert open("/other/archive.zip").read() == "old"
+
+    def test_pack_missing_destination_directory(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/data/file1.txt", contents="test")
+        with pytest.raises(FileNotFoundError):
+            service.pack("/data", "/nowhere/archive.zip", ArchiveFormat.zipfile)
+        service._logger.error.assert_called_with("Destination directory /nowhere does not exist")
+
+    def test_pack_into_packed_folder_skips_itself(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/data/file1.txt", contents="test")
+        service.pack("/data", "/data/self.zip", ArchiveFormat.zipfile)
+        with zipfile.ZipFile("/data/self.zip") as archive:
+            assert archive.namelist() == ["data/", "data/file1.txt"]
+
+    def test_pack_to_stdout(self, service: LinuxConsoleService, fs: FakeFilesystem, capsysbinary):
+        fs.create_file("/data/file1.txt", contents="test")
+        service.pack("/data", "-", ArchiveFormat.gztar)
+        with tarfile.open(fileobj=io.BytesIO(capsysbinary.readouterr().out)) as tar:
+            assert tar.extractfile("data/file1.txt").read() == b"test"
+
     def test_pack_nonexistent_directory(self, service: LinuxConsoleService, fs: FakeFilesystem):
         with pytest.raises(FileNotFoundError):
             service.pack("/doesnotexist", "/archive.zip", ArchiveFormat.zipfile)
@@ -218,6 +287,70 @@ class TestLinuxConsoleService:
             service.unpack("/archive.zip", "/nonexistent", ArchiveFormat.zipfile)
         service._logger.error.assert_called_with("Destination does not exist")
 
+    def test_unpack_selected_members(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "keep.txt").write_text("keep")
+        (tmp_path / "data" / "skip.txt").write_text("skip")
+        with tarfile.open(tmp_path / "data.tar.gz", "w:gz") as tar:
+            tar.add(tmp_path / "data", arcname="data")
+        (tmp_path / "out").mkdir()
+        stats = service.unpack(
+            tmp_path / "data.tar.gz", tmp_path / "out", ArchiveFormat.gztar, MemberFilter(["keep.txt"]), jobs=2
+        )
+        assert (tmp_path / "out" / "data" / "keep.txt").read_text() == "keep"
+        assert not (tmp_path / "out" / "data" / "skip.txt").exists()
+        assert stats.files == 1
+
+    def test_unpack_corrupt_archive(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "broken.zip").write_bytes(b"PK\x03\x04garbage")
+        with pytest.raises(WrongFormatError):
+            service.unpack(tmp_path / "broken.zip", tmp_path, ArchiveFormat.zipfile)
+        assert service._logger.error.call_args[0][0].startswith("Unpacking")
+
+    def test_unpack_detects_format_from_content(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "a.txt").write_text("alpha")
+        with tarfile.open(tmp_path / "misnamed.tar.gz", "w:bz2") as tar:
+            tar.add(tmp_path / "data", arcname="data")
+        (tmp_path / "out").mkdir()
+        service.unpack(tmp_path / "misnamed.tar.gz", tmp_path / "out", ArchiveFormat.gztar)
+        assert (tmp_path / "out" / "data" / "a.txt").read_text() == "alpha"
+        with pytest.raises(WrongFormatError):
+            service.unpack(tmp_path / "misnamed.tar.gz", tmp_path / "out", ArchiveFormat.zipfile)
+        service._logger.error.assert_called_with("Invalid format")
+
+    def test_list_tar_archive(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "a.txt").write_text("alpha")
+        with tarfile.open(tmp_path / "data.tar.gz", "w:gz") as tar:
+            tar.add(tmp_path / "data", arcname="data")
+        assert list(service.list_archive(tmp_path / "data.tar.gz", ArchiveFormat.gztar)) == ["data/\n", "data/a.txt\n"]
+        long_listing = list(service.list_archive(tmp_path / "data.tar.gz", ArchiveFormat.gztar, long_form=True))
+        permissions, owner, size, *_, name = long_listing[1].split()
+        assert (permissions[:3], size, name) == ("-rw", "5", "data/a.txt")
+
+    def test_list_zip_archive(self, service: LinuxConsoleService, tmp_path):
+        with zipfile.ZipFile(tmp_path / "data.zip", "w") as zf:
+            zf.writestr(zipfile.ZipInfo("data/a.txt", (2026, 1, 2, 3, 4, 5)), "alpha")
+            zf.writestr(zipfile.ZipInfo("data/b.txt", (2026, 1, 2, 3, 4, 5)), "be")
+        listing = list(service.list_archive(tmp_path / "data.zip", ArchiveFormat.zipfile))
+        assert listing[2] == "        5  2026-01-02 03:04   data/a.txt\n"
+        assert listing[-1] == "        7                     2 files\n"
+
+    def test_list_archive_wrong_format(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "data.zip").write_bytes(b"")
+        with pytest.raises(WrongFormatError):
+            service.list_archive(tmp_path / "data.zip", ArchiveFormat.gztar)
+        service._logger.error.assert_called_with("Invalid format")
+
+    def test_grep_inside_archives(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "notes.txt").write_text("needle outside\n")
+        with zipfile.ZipFile(tmp_path / "backup.zip", "w") as zf:
+            zf.writestr("backup/notes.txt", "hay\nneedle inside\n")
+        found = sorted(service.grep(True, False, "needle", [tmp_path], archives=True))
+        assert found == ["backup.zip!backup/notes.txt: 2:needle inside\n", "notes.txt: 1:needle outside\n"]
+        assert sorted(service.grep(True, False, "needle", [tmp_path], jobs=2, archives=True)) == found
+
     def test_history_success(self, service: LinuxConsoleService, fs: FakeFilesystem):
         service._history.get_history.return_value = [
             (1, "ls /home"),
@@ -227,3 +360,276 @@ class TestLinuxConsoleService:
         assert len(result) == 2
         assert "1: ls /home" in result[0]
         service._logger.info.assert_called_with("Listing history...")
+
+    def test_history_last_matches(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        service._history.search.return_value = iter([(1, "ls"), (4, "ls -a"), (9, "ls -l")])
+        result = service.history(last=2, find="ls")
+        assert result == ["4: ls -a\n", "9: ls -l\n"]
+
+    def test_grep_parallel_matches_sequential(self, service: LinuxConsoleService, tmp_path):
+        for i in range(12):
+            (tmp_path / f"file{i}.txt").write_text(f"needle {i}\nhay\nneedle again {i}\n")
+        sequential = list(service.grep(True, False, "needle", [tmp_path]))
+        parallel = list(service.grep(True, False, "needle", [tmp_path], jobs=3))
+        assert len(parallel) == 24
+        assert parallel == sequential
+
+    def test_grep_binary_file_reported(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/dir/image.bin", contents=b"\x89PNG\x00\x00needle\x00")
+        fs.create_file("/dir/notes.txt", contents="needle\n")
+        results = list(service.grep(True, False, "needle", ["/dir"]))
+        assert sorted(results) == ["Binary file image.bin matches\n", "notes.txt: 1:needle\n"]
+
+    def test_grep_binary_file_skipped(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/dir/image.bin", contents=b"\x00needle")
+        results = list(service.grep(True, False, "needle", ["/dir"], binary_files=BinaryFiles.without_match))
+        assert results == []
+
+    def test_grep_include_exclude(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/dir/a.py", contents="needle")
+        fs.create_file("/dir/b.txt", contents="needle")
+        fs.create_file("/dir/sub/c.py", contents="needle")
+        results = list(service.grep(True, False, "needle", ["/dir"], rules=IgnoreRules(include=["*.py"], exclude=["c.*"])))
+        assert results == ["a.py: 1:needle\n"]
+
+    def test_ls_long_form_caches_owner_lookups(self, service: LinuxConsoleService, fs: FakeFilesystem, mocker):
+        fs.create_file("/test/a.txt", contents="12345")
+        fs.create_file("/test/b.txt")
+        user_name.cache_clear()
+        getpwuid = mocker.patch("src.services.linux_console.getpwuid")
+        getpwuid.return_value.pw_name = "arthas"
+
+        result = sorted(service.ls("/test", all_files=False, long_form=True), key=lambda line: line.split()[-1])
+
+        assert result[0].startswith("-rw")
+        assert " arthas " in result[0]
+        assert " 5 " in result[0] and result[0].endswith(" a.txt\n")
+        assert result[1].endswith(" b.txt\n")
+        getpwuid.assert_called_once()
+        user_name.cache_clear()
+
+    def test_iter_ls_streams_and_sorts(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        for name in ["delta", "alpha", ".hidden", "charlie", "bravo"]:
+            fs.create_file(f"/test/{name}")
+
+        listing = service.iter_ls("/test", all_files=False, long_form=False, sort=True)
+
+        assert not isinstance(listing, list)
+        assert list(listing) == ["alpha\n", "bravo\n", "charlie\n", "delta\n"]
+
+    def test_external_sort_merges_spilled_runs(self, fs: FakeFilesystem):
+        names = ["delta", "alpha", "имя", "charlie", "bravo", "new\nline"]
+        assert list(external_sort(names, buffer_size=2)) == sorted(names)
+
+    def test_iter_ls_validates_before_streaming(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        with pytest.raises(FileNotFoundError):
+            service.iter_ls("/BOJlWE6CTBO", all_files=False, long_form=False)
+
+    def test_cp_recursive_parallel_tree(self, service: LinuxConsoleService, tmp_path, mocker):
+        mocker.patch("src.services.copy_engine.LARGE_FILE_SIZE", 1024)
+        source = tmp_path / "source"
+        (source / "nested" / "deeper").mkdir(parents=True)
+        for i in range(20):
+            (source / "nested" / f"small{i}.txt").write_text(f"small {i}")
+        (source / "nested" / "deeper" / "large.bin").write_bytes(os.urandom(64 * 1024))
+        (source / "link").symlink_to("nested/small0.txt")
+
+        service.cp(True, source, tmp_path / "backup", jobs=4)
+
+        backup = tmp_path / "backup"
+        assert (backup / "nested" / "small7.txt").read_text() == "small 7"
+        assert (backup / "nested" / "deeper" / "large.bin").read_bytes() == (source / "nested" / "deeper" / "large.bin").read_bytes()
+        assert os.readlink(backup / "link") == "nested/small0.txt"
+        assert "MiB/s" in service._logger.info.call_args.args[0]
+
+    def test_cp_recursive_reports_unreadable_directory(self, service: LinuxConsoleService, tmp_path, mocker):
+        source = tmp_path / "source"
+        (source / "sub").mkdir(parents=True)
+        (source / "a.txt").write_text("a")
+        (source / "sub" / "b.txt").write_text("b")
+        scandir = os.scandir
+
+        def refuse_sub(path):
+            if os.fspath(path) == str(source / "sub"):
+                raise PermissionError(13, "Permission denied", os.fspath(path))
+            return scandir(path)
+
+        mocker.patch("os.scandir", refuse_sub)
+        with pytest.raises(shutil.Error) as error:
+            service.cp(True, source, tmp_path / "backup")
+        assert error.value.args[0][0][0] == str(source / "sub")
+        assert (tmp_path / "backup" / "a.txt").read_text() == "a"
+
+    def test_cp_many_sources_into_directory(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/a.txt", contents="a")
+        fs.create_file("/src/b.txt", contents="b")
+        fs.create_dir("/backup")
+        service.cp(True, ["/a.txt", "/src"], "/backup", jobs=2)
+        assert open("/backup/a.txt").read() == "a"
+        assert open("/backup/src/b.txt").read() == "b"
+
+    def test_cp_many_sources_rejects_conflicts_before_copying(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        fs.create_file("/one/same.txt")
+        fs.create_file("/two/same.txt")
+        fs.create_dir("/backup")
+        with pytest.raises(FileExistsError):
+            service.cp(False, ["/one/same.txt", "/two/same.txt"], "/backup")
+        assert not os.path.exists("/backup/same.txt")
+        with pytest.raises(NotADirectoryError):
+            service.cp(False, ["/one/same.txt", "/two/same.txt"], "/missing")
+
+    def test_cp_resumable_logs_progress(self, service: LinuxConsoleService, tmp_path):
+        source = tmp_path / "big.bin"
+        source.write_bytes(os.urandom(4096))
+        service.cp(False, source, tmp_path / "copy.bin", resumable=True, verify=True)
+        assert (tmp_path / "copy.bin").read_bytes() == source.read_bytes()
+        messages = [call.args[0] for call in service._logger.info.call_args_list]
+        assert any("(100%)" in message for message in messages)
+
+    def test_cp_resumable_refuses_directories(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "tree").mkdir()
+        (tmp_path / "tree" / "data.txt").write_text("data")
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "backup").mkdir()
+        with pytest.raises(IsADirectoryError, match="--resumable"):
+            service.cp(True, [tmp_path / "a.txt", tmp_path / "tree"], tmp_path / "backup", resumable=True)
+        assert list((tmp_path / "backup").iterdir()) == []
+
+    def test_cp_reflink_auto_falls_back_to_copy(self, service: LinuxConsoleService, tmp_path, mocker):
+        mocker.patch("src.services.copy_engine.fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "not supported"))
+        source = tmp_path / "data.bin"
+        source.write_bytes(os.urandom(4096))
+        service.cp(False, source, tmp_path / "clone.bin", reflink=ReflinkMode.auto)
+        assert (tmp_path / "clone.bin").read_bytes() == source.read_bytes()
+        service._logger.info.assert_any_call(f"{source} -> {tmp_path / 'clone.bin'}: copy")
+
+    def test_cp_reflink_always_fails_without_support(self, service: LinuxConsoleService, tmp_path, mocker):
+        mocker.patch("src.services.copy_engine.fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "not supported"))
+        source = tmp_path / "data.bin"
+        source.write_bytes(b"data")
+        with pytest.raises(shutil.Error):
+            service.cp(False, source, tmp_path / "clone.bin", reflink=ReflinkMode.always)
+
+    def test_cp_link_shares_inode(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "tree").mkdir()
+        (tmp_path / "tree" / "data.txt").write_text("data")
+        service.cp(True, tmp_path / "tree", tmp_path / "linked", link=True)
+        assert os.path.samefile(tmp_path / "tree" / "data.txt", tmp_path / "linked" / "data.txt")
+        assert "hardlink: 1" in service._logger.info.call_args.args[0]
+
+    def test_cp_link_falls_back_across_devices(self, service: LinuxConsoleService, tmp_path, mocker):
+        mocker.patch("src.services.copy_engine.os.link", side_effect=OSError(errno.EXDEV, "cross-device link"))
+        source = tmp_path / "data.txt"
+        source.write_text("data")
+        service.cp(False, source, tmp_path / "copy.txt", link=True)
+        assert not os.path.samefile(source, tmp_path / "copy.txt")
+        assert (tmp_path / "copy.txt").read_text() == "data"
+
+    def test_rm_recursive_parallel_tree(self, service: LinuxConsoleService, tmp_path, mocker):
+        mocker.patch("src.services.delete_engine.DELETE_BATCH", 4)
+        tree = tmp_path / "build"
+        for i in range(5):
+            (tree / f"dir{i}" / "sub").mkdir(parents=True)
+            for j in range(6):
+                (tree / f"dir{i}" / "sub" / f"{j}.o").write_text("obj")
+        outside = tmp_path / "keep"
+        outside.mkdir()
+        (outside / "important.txt").write_text("keep me")
+        (tree / "link").symlink_to(outside)
+
+        service.rm(True, tree, jobs=4)
+
+        assert not tree.exists()
+        assert (outside / "important.txt").read_text() == "keep me"
+        assert "42 entries" in service._logger.info.call_args.args[0]
+        assert "entries/s" in service._logger.info.call_args.args[0]
+
+    def test_rm_root_is_refused(self, service: LinuxConsoleService, fs: FakeFilesystem):
+        with pytest.raises(PermissionError):
+            service.rm(True, "/")
+        service._logger.error.assert_called_with("Path is either a root or parent directory")
+
+    def test_rm_to_trash_and_undo(self, undo_service: LinuxConsoleService, tmp_path):
+        tree = tmp_path / "build"
+        tree.mkdir()
+        (tree / "out.o").write_text("obj")
+
+        undo_service.rm(True, tree)
+        assert not tree.exists()
+
+        undo_service.undo()
+        assert (tree / "out.o").read_text() == "obj"
+        undo_service.redo()
+        assert not tree.exists()
+
+    def test_rm_many_paths_is_one_undo(self, undo_service: LinuxConsoleService, tmp_path):
+        for name in ("a", "b", "c"):
+            (tmp_path / name).write_text(name)
+
+        with pytest.raises(FileNotFoundError):
+            undo_service.rm(False, [tmp_path / "a", tmp_path / "missing", tmp_path / "b", tmp_path / "c"])
+        assert not any((tmp_path / name).exists() for name in ("a", "b", "c"))
+
+        undo_service.undo()
+        assert [(tmp_path / name).read_text() for name in ("a", "b", "c")] == ["a", "b", "c"]
+
+    def test_undo_drops_entry_whose_source_is_gone(self, undo_service: LinuxConsoleService, mock_logger, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        undo_service.mv(tmp_path / "a.txt", tmp_path / "b.txt")
+        undo_service.rm(False, tmp_path / "b.txt")
+        # The trash entry was purged before the undo
+        shutil.rmtree(tmp_path / "trash")
+
+        with pytest.raises(JournalEntryGoneError):
+            undo_service.undo()
+        assert mock_logger.warning.call_args.args[0].startswith("Dropped rm from the undo journal")
+        (tmp_path / "b.txt").write_text("a")
+        undo_service.undo()
+        assert (tmp_path / "a.txt").read_text() == "a"
+
+    def test_multi_level_undo_and_redo(self, undo_service: LinuxConsoleService, mock_logger, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "docs").mkdir()
+
+        undo_service.cp(False, tmp_path / "a.txt", tmp_path / "b.txt")
+        undo_service.mv(tmp_path / "b.txt", tmp_path / "docs")
+        assert (tmp_path / "docs" / "b.txt").exists()
+
+        undo_service.undo()
+        assert (tmp_path / "b.txt").exists() and not (tmp_path / "docs" / "b.txt").exists()
+        undo_service.undo()
+        assert not (tmp_path / "b.txt").exists()
+        undo_service.undo()
+        mock_logger.info.assert_called_with("Nothing to undo")
+
+        undo_service.redo()
+        assert (tmp_path / "b.txt").read_text() == "a"
+        undo_service.redo()
+        assert (tmp_path / "docs" / "b.txt").read_text() == "a"
+
+    def test_undo_cp_brings_back_overwritten_file(self, undo_service: LinuxConsoleService, tmp_path):
+        (tmp_path / "x").write_text("new")
+        (tmp_path / "y").write_text("old")
+        undo_service.mv(tmp_path / "x", tmp_path / "x2")
+        undo_service.cp(False, tmp_path / "x2", tmp_path / "y")
+        assert (tmp_path / "y").read_text() == "new"
+
+        undo_service.undo()
+        assert (tmp_path / "y").read_text() == "old"
+        assert (tmp_path / "x2").exists() and not (tmp_path / "x").exists()
+        undo_service.redo()
+        assert (tmp_path / "y").read_text() == "new"
+        undo_service.undo()
+        undo_service.undo()
+        assert (tmp_path / "x").read_text() == "new"
+
+    def test_undo_stops_at_cp_overwrite_without_trash(self, mock_logger, mock_history_service, tmp_path):
+        service = LinuxConsoleService(mock_logger, mock_history_service, None, UndoJournal(tmp_path / "journal"))
+        (tmp_path / "x").write_text("new")
+        (tmp_path / "y").write_text("old")
+        service.mv(tmp_path / "x", tmp_path / "x2")
+        service.cp(False, tmp_path / "x2", tmp_path / "y")
+
+        with pytest.raises(PermissionError, match="Can't undo past"):
+            service.undo()
+        assert (tmp_path / "x2").exists()
@@ -0,0 +1,110 @@
+import io
+import os
+import tarfile
+import threading
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from src.services.pack_engine import output_identity
+from src.services.pack_engine import pack_tar
+from src.services.pack_engine import pack_zip
+from src.services.pack_engine import walk_tree
+from src.services.zip_writer import ParallelZipWriter
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    root = tmp_path / "data"
+    (root / "sub" / "empty").mkdir(parents=True)
+    (root / "a.txt").write_text("hello\n" * 1000)
+    (root / "sub" / "b.bin").write_bytes(os.urandom(300_000))
+    (root / "sub" / "ü.txt").write_text("unicode")
+    return root
+
+
+class TestParallelZipWriter:
+
+    def test_blocks_form_one_deflate_stream(self, tmp_path: Path):
+        data: bytes = os.urandom(100_000) * 3
+        (tmp_path / "big").write_bytes(data)
+        out = io.BytesIO()
+        with ParallelZipWriter(out, workers=3, block_size=32 * 1024) as zf:
+            zf.add_file(str(tmp_path / "big"), "big")
+        with zipfile.ZipFile(out) as archive:
+            assert archive.testzip() is None
+            assert archive.read("big") == data
+            assert archive.getinfo("big").file_size == len(data)
+
+    def test_empty_archive(self):
+        out = io.BytesIO()
+        ParallelZipWriter(out).close()
+        with zipfile.ZipFile(out) as archive:
+            assert archive.namelist() == []
+
+
+class TestPackEngine:
+
+    def test_pack_gztar(self, tree: Path, tmp_path: Path):
+        out = io.BytesIO()
+        stats = pack_tar(tree, out, workers=2)
+        out.seek(0)
+        with tarfile.open(fileobj=out, mode="r:gz") as tar:
+            names: list[str] = tar.getnames()
+            base: str = str(tree).lstrip("/")
+            assert f"{base}/sub/empty" in names
+            assert tar.extractfile(f"{base}/sub/b.bin").read() == (tree / "sub" / "b.bin").read_bytes()
+        assert stats.files == 3
+        assert stats.bytes_out == len(out.getvalue())
+
+    def test_pack_zip_matches_make_archive_layout(self, tree: Path):
+        out = io.BytesIO()
+        stats = pack_zip(tree, out, workers=2)
+        base: str = str(tree).lstrip("/")
+        with zipfile.ZipFile(out) as archive:
+            assert archive.testzip() is None
+            assert archive.namelist() == [
+                f"{base}/", f"{base}/sub/", f"{base}/a.txt",
+                f"{base}/sub/empty/", f"{base}/sub/b.bin", f"{base}/sub/ü.txt"
+            ]
+            assert archive.read(f"{base}/a.txt") == b"hello\n" * 1000
+            assert archive.read(f"{base}/sub/ü.txt") == b"unicode"
+        assert stats.files == 3
+        assert stats.bytes_in == 6000 + 300_000 + 7
+
+    def test_pack_zip_level_zero_still_extracts(self, tree: Path):
+        out = io.BytesIO()
+        pack_zip(tree, out, level=0)
+        with zipfile.ZipFile(out) as archive:
+            assert archive.testzip() is None
+
+    def test_walk_tree_skips_output(self, tree: Path):
+        with open(tree / "out.tar.gz", "wb") as out:
+            paths: list[str] = [path for path, _ in walk_tree(str(tree), output_identity(out))]
+        assert str(tree / "a.txt") in paths
+        assert str(tree / "out.tar.gz") not in paths
+
+    def test_walk_tree_fails_on_unlistable_directory(self, tree: Path, monkeypatch):
+        scandir = os.scandir
+
+        def refuse_sub(path):
+            if os.fspath(path) == str(tree / "sub"):
+                raise PermissionError(13, "Permission denied", os.fspath(path))
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", refuse_sub)
+        with pytest.raises(PermissionError):
+            list(walk_tree(str(tree)))
+
+    def test_pack_gztar_to_pipe(self, tree: Path):
+        read_end, write_end = os.pipe()
+        with open(read_end, "rb") as reader, open(write_end, "wb") as writer:
+            result: list[bytes] = []
+            drain = threading.Thread(target=lambda: result.append(reader.read()))
+            drain.start()
+            pack_tar(tree, writer, workers=2)
+            writer.close()
+            drain.join()
+        with tarfile.open(fileobj=io.BytesIO(result[0]), mode="r|gz") as tar:
+            assert sum(member.isfile() for member in tar) == 3
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from src.services.resumable_copy import CHECKPOINT_SUFFIX
+from src.services.resumable_copy import CopyProgress
+from src.services.resumable_copy import resumable_copy
+
+
+class TestResumableCopy:
+
+    def test_interrupted_copy_resumes_from_checkpoint(self, tmp_path, mocker):
+        source = tmp_path / "big.bin"
+        source.write_bytes(os.urandom(10 * 1024))
+        dest = tmp_path / "copy.bin"
+        real_fsync = os.fsync
+        calls = {"count": 0}
+
+        def crash_on_fourth_chunk(fd):
+            calls["count"] += 1
+            if calls["count"] == 4:
+                raise KeyboardInterrupt
+            real_fsync(fd)
+
+        mocker.patch("src.services.resumable_copy.os.fsync", side_effect=crash_on_fourth_chunk)
+        with pytest.raises(KeyboardInterrupt):
+            resumable_copy(source, dest, chunk_size=1024, verify=True)
+        assert (tmp_path / ("copy.bin" + CHECKPOINT_SUFFIX)).exists()
+
+        mocker.stopall()
+        copied = resumable_copy(source, dest, chunk_size=1024, verify=True)
+
+        assert copied == 7 * 1024
+        assert dest.read_bytes() == source.read_bytes()
+        assert not (tmp_path / ("copy.bin" + CHECKPOINT_SUFFIX)).exists()
+
+    def test_changed_source_restarts_from_zero(self, tmp_path):
+        source = tmp_path / "big.bin"
+        source.write_bytes(b"a" * 4096)
+        dest = tmp_path / "copy.bin"
+        resumable_copy(source, dest, chunk_size=1024)
+        (tmp_path / ("copy.bin" + CHECKPOINT_SUFFIX)).write_text(
+            '{"source": "elsewhere", "size": 4096, "mtime_ns": 0, "chunk_size": 1024, "offset": 2048, "checksums": []}'
+        )
+        assert resumable_copy(source, dest, chunk_size=1024) == 4096
+
+    def test_corrupted_prefix_is_recopied_with_verify(self, tmp_path, mocker):
+        source = tmp_path / "big.bin"
+        source.write_bytes(os.urandom(4096))
+        dest = tmp_path / "copy.bin"
+        mocker.patch("src.services.resumable_copy.os.remove")
+        resumable_copy(source, dest, chunk_size=1024, verify=True)
+        with open(dest, "r+b") as f:
+            f.write(b"garbage")
+        mocker.stopall()
+        assert resumable_copy(source, dest, chunk_size=1024, verify=True) == 4096
+        assert dest.read_bytes() == source.read_bytes()
+
+    def test_progress_reports_rate_and_eta(self):
+        progress = CopyProgress(total=4 * 2**20, interval=0)
+        message = progress.advance(2**20)
+        assert message is not None
+        assert "1.0/4.0 MiB (25%)" in message
+        assert "MiB/s" in message and "ETA" in message
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+from pathlib import Path
+
+STARTUP_BUDGET_US: int = 1_500_000
+DEFERRED_MODULES: tuple[str, ...] = (
+    "src.services.linux_console",
+    "src.services.init_services",
+    "tarfile",
+    "zipfile",
+    "sqlite3",
+)
+
+
+def import_times() -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         "from src.commands.command_registrator import create_app; create_app()"],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, us, package = line.split("|")
+        cumulative[package.strip()] = int(us)
+    return cumulative
+
+
+class TestStartup:
+
+    def test_command_modules_are_not_imported_at_startup(self):
+        imported = import_times()
+        for module in DEFERRED_MODULES:
+            assert module not in imported
+
+    def test_create_app_import_budget(self):
+        imported = import_times()
+        assert imported["src.commands.command_registrator"] < STARTUP_BUDGET_US
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from src.services import trash as trash_module
+from src.services.trash import Trash
+
+
+def wait_for_purge(trash: Trash) -> None:
+    purger = trash._purger
+    if purger is not None:
+        purger.join()
+
+
+class TestTrash:
+
+    def test_move_tree(self, tmp_path):
+        trash = Trash(tmp_path / "trash")
+        tree = tmp_path / "project"
+        (tree / "src").mkdir(parents=True)
+        (tree / "src" / "main.py").write_text("print()")
+
+        entry = trash.move_to_trash(tree)
+
+        assert not tree.exists()
+        assert entry.parent.parent == tmp_path / "trash"
+        assert (entry / "src" / "main.py").read_text() == "print()"
+
+    def test_same_name_gets_separate_entries(self, tmp_path):
+        trash = Trash(tmp_path / "trash")
+        note = tmp_path / "note.txt"
+        note.write_text("first")
+        first = trash.move_to_trash(note)
+        note.write_text("second")
+        second = trash.move_to_trash(note)
+        assert (first.read_text(), second.read_text()) == ("first", "second")
+
+    def test_refuses_directory_holding_the_trash(self, tmp_path, monkeypatch):
+        home = tmp_path / "home"
+        (home / "notes").mkdir(parents=True)
+        trash = Trash(home / "trash")
+        # No mount-level trash to fall back to
+        monkeypatch.setattr(trash, "roots_for", lambda path: [trash.root])
+        with pytest.raises(OSError, match="--permanent"):
+            trash.move_to_trash(home)
+        assert (home / "notes").is_dir()
+        assert not (home / "trash").exists()
+
+    def test_purge_by_age(self, tmp_path):
+        old = Trash(tmp_path / "trash", max_age=-1)
+        (tmp_path / "old.txt").write_text("old")
+        entry = old.move_to_trash(tmp_path / "old.txt")
+        wait_for_purge(old)
+        Trash(tmp_path / "trash", max_age=-1).purge()
+        assert not os.path.lexists(entry)
+
+    def test_purge_by_size_drops_older_sessions_first(self, tmp_path):
+        entries = []
+        for name in ("a", "b"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "data.bin").write_bytes(b"x" * 100)
+            session = Trash(tmp_path / "trash", max_bytes=150)
+            entries.append(session.move_to_trash(tmp_path / name))
+            wait_for_purge(session)
+        Trash(tmp_path / "trash", max_bytes=150).purge()
+        assert not entries[0].exists()
+        assert (entries[1] / "data.bin").exists()
+
+    def test_purge_keeps_current_session(self, tmp_path):
+        trash = Trash(tmp_path / "trash", max_bytes=1000, max_age=-1)
+        (tmp_path / "huge.bin").write_bytes(b"x" * 5000)
+        entry = trash.move_to_trash(tmp_path / "huge.bin")
+        trash.purge()
+        assert entry.stat().st_size == 5000
+
+    def test_purge_runs_after_every_move(self, tmp_path, monkeypatch):
+        trash = Trash(tmp_path / "trash")
+        purges = []
+        monkeypatch.setattr(trash, "purge", lambda: purges.append(1))
+        for name in ("a", "b"):
+            (tmp_path / name).write_text(name)
+            trash.move_to_trash(tmp_path / name)
+            wait_for_purge(trash)
+        assert len(purges) == 2
+
+    def test_purge_measures_each_entry_once(self, tmp_path, monkeypatch):
+        trash = Trash(tmp_path / "trash")
+        measured = []
+        disk_usage = trash_module.disk_usage
+        monkeypatch.setattr(trash_module, "disk_usage", lambda path: measured.append(path) or disk_usage(path))
+        for name in ("a", "b", "c"):
+            (tmp_path / name).write_text(name)
+            trash.move_to_trash(tmp_path / name)
+            wait_for_purge(trash)
+        trash.purge()
+        assert sorted(path.name for path in measured) == ["000001-a", "000002-b", "000003-c"]
@@ -0,0 +1,45 @@
+import os
+
+from src.services.trigram_index import INDEX_FILENAME
+from src.services.trigram_index import TrigramIndex
+from src.services.linux_console import LinuxConsoleService
+
+
+class TestTrigramIndex:
+
+    def test_build_and_candidates(self, tmp_path):
+        (tmp_path / "a.txt").write_text("the quick brown fox")
+        (tmp_path / "b.txt").write_text("lazy dog")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "c.txt").write_text("QUICK silver")
+        index = TrigramIndex(tmp_path)
+        stats = index.build()
+        assert (stats.added, stats.updated, stats.removed) == (3, 0, 0)
+        assert index.candidates(b"quick") == {"a.txt", os.path.join("sub", "c.txt")}
+        assert index.candidates(b"dog") == {"b.txt"}
+        assert index.candidates(b"do") is None
+        index.close()
+
+    def test_build_is_incremental(self, tmp_path):
+        (tmp_path / "a.txt").write_text("alpha")
+        (tmp_path / "b.txt").write_text("beta")
+        index = TrigramIndex(tmp_path)
+        index.build()
+        (tmp_path / "a.txt").write_text("gamma ray")
+        (tmp_path / "b.txt").unlink()
+        (tmp_path / "c.txt").write_text("delta")
+        stats = index.build()
+        assert (stats.added, stats.updated, stats.removed, stats.unchanged) == (1, 1, 1, 0)
+        assert index.candidates(b"gamma") == {"a.txt"}
+        assert index.candidates(b"alpha") == set()
+        index.close()
+
+    def test_grep_uses_index_and_sees_changed_files(self, service: LinuxConsoleService, tmp_path):
+        (tmp_path / "a.txt").write_text("needle\n")
+        (tmp_path / "b.txt").write_text("hay\n")
+        service.build_index(tmp_path)
+        assert (tmp_path / INDEX_FILENAME).exists()
+        assert list(service.grep(True, False, "needle", [tmp_path])) == ["a.txt: 1:needle\n"]
+        (tmp_path / "b.txt").write_text("hay and needle\n")
+        results = sorted(service.grep(True, False, "needle", [tmp_path]))
+        assert results == ["a.txt: 1:needle\n", "b.txt: 1:hay and needle\n"]
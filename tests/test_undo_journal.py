@@ -0,0 +1,34 @@
+from src.services.undo_journal import UndoJournal
+
+
+class TestUndoJournal:
+
+    def test_pop_is_last_in_first_out(self, tmp_path):
+        journal = UndoJournal(tmp_path / "journal")
+        for i in range(3):
+            journal.record({"op": "mv", "moves": [[f"/a{i}", f"/b{i}"]]})
+        assert journal.pop_undo()["moves"] == [["/a2", "/b2"]]
+        assert journal.pop_undo()["moves"] == [["/a1", "/b1"]]
+        assert (tmp_path / "journal").read_text().count("\n") == 1
+
+    def test_pop_entry_longer_than_read_block(self, tmp_path, mocker):
+        mocker.patch("src.services.undo_journal.READ_BACK_SIZE", 8)
+        journal = UndoJournal(tmp_path / "journal")
+        journal.record({"op": "rm", "moves": [["/first", "/trash/first"]]})
+        journal.record({"op": "rm", "moves": [["/" + "x" * 100, "/trash/x"]]})
+        assert journal.pop_undo()["moves"][0][0] == "/" + "x" * 100
+        assert journal.pop_undo()["moves"][0][0] == "/first"
+        assert journal.pop_undo() is None
+
+    def test_torn_tail_is_dropped(self, tmp_path):
+        journal = UndoJournal(tmp_path / "journal")
+        journal.record({"op": "mv", "moves": [["/a", "/b"]]})
+        with open(tmp_path / "journal", "a") as f:
+            f.write('{"op": "mv", "mov')
+        assert journal.pop_undo()["moves"] == [["/a", "/b"]]
+
+    def test_new_record_clears_redo(self, tmp_path):
+        journal = UndoJournal(tmp_path / "journal")
+        journal.push_redo({"op": "mv", "moves": [["/a", "/b"]]})
+        journal.record({"op": "mv", "moves": [["/c", "/d"]]})
+        assert journal.pop_redo() is None
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
+
+from src.services.walker import IgnoreRules
+from src.services.walker import walk
+
+
+class TestWalker:
+
+    def test_walk_yields_files_only(self, fs: FakeFilesystem):
+        fs.create_file("/tree/a.txt")
+        fs.create_file("/tree/sub/b.txt")
+        fs.create_dir("/tree/empty")
+        result = sorted(entry.path for entry in walk("/tree"))
+        assert result == ["/tree/a.txt", "/tree/sub/b.txt"]
+
+    def test_walk_prunes_excluded_dirs(self, fs: FakeFilesystem):
+        fs.create_file("/tree/.git/config")
+        fs.create_file("/tree/node_modules/pkg/index.js")
+        fs.create_file("/tree/src/main.py")
+        rules = IgnoreRules(exclude_dirs=[".git", "node_modules"])
+        result = [entry.path for entry in walk("/tree", rules)]
+        assert result == ["/tree/src/main.py"]
+
+    def test_walk_bottom_up_yields_dirs_after_contents(self, fs: FakeFilesystem):
+        fs.create_file("/tree/sub/deep/file.txt")
+        result = [entry.path for entry in walk("/tree", topdown=False, include_dirs=True)]
+        assert result == ["/tree/sub/deep/file.txt", "/tree/sub/deep", "/tree/sub"]
+
+    def test_walk_honors_gitignore(self, fs: FakeFilesystem):
+        fs.create_file("/repo/.gitignore", contents="*.log\nbuild/\n/secret.txt\n!keep.log\n")
+        fs.create_file("/repo/app.log")
+        fs.create_file("/repo/keep.log")
+        fs.create_file("/repo/secret.txt")
+        fs.create_file("/repo/build/out.bin")
+        fs.create_file("/repo/docs/secret.txt")
+        fs.create_file("/repo/docs/.gitignore", contents="*.md\n")
+        fs.create_file("/repo/docs/readme.md")
+        rules = IgnoreRules(use_gitignore=True)
+        result = sorted(entry.path for entry in walk("/repo", rules))
+        assert result == ["/repo/.gitignore", "/repo/docs/.gitignore", "/repo/docs/secret.txt", "/repo/keep.log"]
+
+    def test_walk_raises_on_unlistable_directory(self, fs: FakeFilesystem, monkeypatch):
+        fs.create_file("/tree/a.txt")
+        fs.create_file("/tree/locked/b.txt")
+        scandir = os.scandir
+
+        def refuse_locked(path):
+            if os.fspath(path) == "/tree/locked":
+                raise PermissionError(13, "Permission denied", path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", refuse_locked)
+        with pytest.raises(PermissionError):
+            list(walk("/tree"))
+        errors: list[OSError] = []
+        result = [entry.path for entry in walk("/tree", onerror=errors.append)]
+        assert result == ["/tree/a.txt"]
+        assert [error.filename for error in errors] == ["/tree/locked"]